@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Binary Ninja MCP Batch Exporter
+Analyzes many binaries headlessly and exports what the MCP plugin serves to disk
+"""
+
+import argparse
+import fnmatch
+import gzip
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import threading
+import time
+from collections import deque
+from multiprocessing.connection import wait
+
+try:
+    import resource
+except ImportError:
+    resource = None  # No per-worker memory cap on Windows
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger("binaryninja-batch")
+
+# Worker exit status when the memory cap is hit, see watch_memory()
+EXIT_MEMORY_LIMIT = 75
+
+
+def find_binaries(inputs: list, pattern: str = "*") -> list:
+    """
+    Expand directories (recursively, keeping files matching pattern) and
+    manifests (one path per line, relative to the manifest, # for comments)
+    into a list of binary paths, in order and without duplicates.
+    """
+    found = []
+    for entry in inputs:
+        if os.path.isdir(entry):
+            for root, dirs, files in os.walk(entry):
+                dirs.sort()
+                found.extend(
+                    os.path.join(root, name) for name in sorted(files) if fnmatch.fnmatch(name, pattern)
+                )
+        else:
+            base = os.path.dirname(os.path.abspath(entry))
+            with open(entry, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith("#"):
+                        found.append(os.path.join(base, os.path.expanduser(line)))
+    return list(dict.fromkeys(os.path.abspath(path) for path in found))
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a file's contents, the key binaries are stored under"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ProgressLog:
+    """
+    Append-only record of finished binaries (progress.jsonl in the store),
+    read back on startup so an interrupted run resumes where it stopped.
+    The last record for a SHA-256 wins.
+    """
+    
+    def __init__(self, store: str):
+        self.path = os.path.join(store, "progress.jsonl")
+        self.records = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # A line cut short by a crash
+                    self.records[record["sha256"]] = record
+        self._file = open(self.path, "a", encoding="utf-8")
+    
+    def status(self, sha256: str) -> str:
+        record = self.records.get(sha256)
+        return record["status"] if record else None
+    
+    def record(self, **record):
+        record["finished_at"] = time.time()
+        self.records[record["sha256"]] = record
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+    
+    def close(self):
+        self._file.close()
+
+
+def watch_memory(limit_bytes: int, interval: float = 0.5):
+    """
+    Exit the worker as soon as its peak RSS passes limit_bytes. Runs on a
+    daemon thread; Binary Ninja's analysis releases the GIL, so it keeps
+    running while the core is busy.
+    """
+    scale = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is bytes on macOS, KiB elsewhere
+    while True:
+        if resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale > limit_bytes:
+            os._exit(EXIT_MEMORY_LIMIT)
+        time.sleep(interval)
+
+
+def write_jsonl(path: str, records, compress: bool = False) -> int:
+    """Write one JSON object per line; returns the number of records"""
+    count = 0
+    opener = gzip.open if compress else open
+    with opener(path, "wt", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+            count += 1
+    return count
+
+
+def export_view(bv, out_dir: str, timeout: float, hlil: bool = True) -> dict:
+    """
+    Export the plugin's view of an analyzed binary into out_dir, reusing the
+    listing, call graph and rendering code the HTTP endpoints use. Returns
+    the record counts.
+    """
+    import binaryninja_mcp_plugin as plugin
+    
+    graph = plugin.CallGraph(bv)
+    if not graph.ensure_built(timeout):
+        raise TimeoutError("Timed out building the call graph")
+    functions = plugin.collect_listing(bv, "functions")
+    
+    def function_records():
+        for func in functions:
+            yield {
+                "address": f"0x{func.start:x}",
+                "name": func.name,
+                "callers": len(graph.neighbors(func.start, "callers")),
+                "callees": len(graph.neighbors(func.start, "callees"))
+            }
+    
+    def symbol_records(kind):
+        for symbol in plugin.collect_listing(bv, kind):
+            yield {"address": f"0x{symbol.address:x}", "name": symbol.name}
+    
+    def string_records():
+        for string in plugin.collect_listing(bv, "strings"):
+            yield {"address": f"0x{string.start:x}", "value": string.value}
+    
+    def edge_records():
+        for func in functions:
+            for callee, sites in graph.neighbors(func.start, "callees").items():
+                yield {
+                    "caller": f"0x{func.start:x}",
+                    "callee": f"0x{callee:x}",
+                    "call_sites": [f"0x{site:x}" for site in sites]
+                }
+    
+    def hlil_records():
+        for func in functions:
+            try:
+                text = plugin.render_il(func)
+            except Exception as e:
+                text = f"// Decompilation failed: {str(e)}"
+            yield {"address": f"0x{func.start:x}", "name": func.name, "hlil": text}
+    
+    counts = {
+        "functions": write_jsonl(os.path.join(out_dir, "functions.jsonl"), function_records()),
+        "imports": write_jsonl(os.path.join(out_dir, "imports.jsonl"), symbol_records("imports")),
+        "exports": write_jsonl(os.path.join(out_dir, "exports.jsonl"), symbol_records("exports")),
+        "strings": write_jsonl(os.path.join(out_dir, "strings.jsonl"), string_records()),
+        "call_edges": write_jsonl(os.path.join(out_dir, "callgraph.jsonl"), edge_records())
+    }
+    if hlil:
+        counts["hlil"] = write_jsonl(os.path.join(out_dir, "hlil.jsonl.gz"), hlil_records(), compress=True)
+    return counts
+
+
+def export_binary(path: str, sha256: str, store: str, options: dict, conn):
+    """
+    Worker process: load and analyze one binary, export it to a temporary
+    directory and move that into place as <store>/<sha256>, so a directory
+    in the store is always a complete export. Sends a result dict on conn.
+    """
+    if options["memory_limit"] and resource is not None:
+        threading.Thread(target=watch_memory, args=(options["memory_limit"],), daemon=True).start()
+    
+    started = time.monotonic()
+    tmp_dir = os.path.join(store, f".tmp-{sha256}-{os.getpid()}")
+    try:
+        import binaryninja as bn
+        
+        load = getattr(bn, "load", None) or bn.open_view  # load() is the API since Binary Ninja 4.0
+        bv = load(path, update_analysis=False)
+        if bv is None:
+            raise ValueError("Binary Ninja could not open the file")
+        try:
+            bv.update_analysis_and_wait()
+            analysis_seconds = time.monotonic() - started
+            
+            os.makedirs(tmp_dir)
+            remaining = options["timeout"] - (time.monotonic() - started)
+            counts = export_view(bv, tmp_dir, remaining, hlil=options["hlil"])
+            summary = {
+                "path": path,
+                "name": os.path.basename(path),
+                "sha256": sha256,
+                "view_type": getattr(bv, "view_type", None),
+                "arch": getattr(getattr(bv, "arch", None), "name", None),
+                "platform": getattr(getattr(bv, "platform", None), "name", None),
+                "entry_point": f"0x{bv.entry_point:x}",
+                "counts": counts,
+                "analysis_seconds": round(analysis_seconds, 3),
+                "export_seconds": round(time.monotonic() - started - analysis_seconds, 3)
+            }
+            with open(os.path.join(tmp_dir, "summary.json"), "w", encoding="utf-8") as f:
+                json.dump(summary, f, indent=2)
+        finally:
+            bv.file.close()
+        
+        final_dir = os.path.join(store, sha256)
+        if os.path.exists(final_dir):
+            shutil.rmtree(final_dir)
+        os.replace(tmp_dir, final_dir)
+        conn.send({"status": "done", "counts": counts})
+    except Exception as e:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        conn.send({"status": "failed", "error": f"{type(e).__name__}: {str(e)}"})
+    finally:
+        conn.close()
+
+
+class BatchRunner:
+    """Runs export_binary for each binary in its own process, `workers` at a time"""
+    
+    def __init__(self, store: str, workers: int, timeout: float, memory_limit: int, hlil: bool = True,
+                 retry_failed: bool = False):
+        self.store = store
+        self.workers = workers
+        self.timeout = timeout  # Seconds per binary, analysis and export together
+        self.memory_limit = memory_limit  # Peak RSS per worker in bytes, 0 for none
+        self.hlil = hlil
+        self.retry_failed = retry_failed
+        # Workers start from a fresh interpreter: forking a process that has
+        # loaded Binary Ninja's core is not safe
+        self.context = multiprocessing.get_context("spawn")
+    
+    def _pending(self, paths: list, progress: ProgressLog):
+        """Yield (path, sha256) for binaries that still need exporting"""
+        seen = set()
+        for path in paths:
+            try:
+                sha256 = file_sha256(path)
+            except OSError as e:
+                logger.warning(f"Skipping {path}: {str(e)}")
+                continue
+            if sha256 in seen:
+                logger.info(f"Skipping {path}: same contents as an earlier file")
+                continue
+            seen.add(sha256)
+            status = progress.status(sha256)
+            if status == "done" and os.path.exists(os.path.join(self.store, sha256, "summary.json")):
+                continue
+            if status in ("failed", "timeout", "memory") and not self.retry_failed:
+                logger.info(f"Skipping {path}: previous attempt ended with '{status}' (use --retry-failed)")
+                continue
+            yield path, sha256
+    
+    def _start(self, path: str, sha256: str) -> dict:
+        receiver, sender = self.context.Pipe(duplex=False)
+        options = {"timeout": self.timeout, "memory_limit": self.memory_limit, "hlil": self.hlil}
+        process = self.context.Process(
+            target=export_binary,
+            args=(path, sha256, self.store, options, sender),
+            name=f"binaryninja-batch-{sha256[:12]}",
+            daemon=True
+        )
+        process.start()
+        sender.close()
+        return {
+            "path": path,
+            "sha256": sha256,
+            "process": process,
+            "conn": receiver,
+            "started": time.monotonic()
+        }
+    
+    def _finish(self, worker: dict, killed: str = None) -> dict:
+        """Reap a worker and turn how it ended into a progress record"""
+        process = worker["process"]
+        if killed:
+            process.kill()
+        process.join()
+        result = None
+        if not killed and worker["conn"].poll():
+            try:
+                result = worker["conn"].recv()
+            except EOFError:
+                pass
+        worker["conn"].close()
+        
+        if killed:
+            result = {"status": killed, "error": f"Exceeded the {self.timeout:g}s timeout"}
+        elif process.exitcode == EXIT_MEMORY_LIMIT:
+            result = {"status": "memory", "error": f"Exceeded the {self.memory_limit // (1024 * 1024)} MiB memory limit"}
+        elif result is None:
+            result = {"status": "failed", "error": f"Worker exited with status {process.exitcode}"}
+        shutil.rmtree(os.path.join(self.store, f".tmp-{worker['sha256']}-{process.pid}"), ignore_errors=True)
+        
+        result.update(
+            sha256=worker["sha256"],
+            path=worker["path"],
+            elapsed=round(time.monotonic() - worker["started"], 3)
+        )
+        return result
+    
+    def run(self, paths: list) -> dict:
+        """Export every binary in paths not already in the store; returns counts per status"""
+        os.makedirs(self.store, exist_ok=True)
+        progress = ProgressLog(self.store)
+        pending = deque(self._pending(paths, progress))
+        total = len(pending)
+        logger.info(f"{total} of {len(paths)} binaries to export with {self.workers} workers")
+        
+        running = {}
+        outcomes = {}
+        try:
+            while pending or running:
+                while pending and len(running) < self.workers:
+                    path, sha256 = pending.popleft()
+                    worker = self._start(path, sha256)
+                    running[worker["process"].sentinel] = worker
+                
+                now = time.monotonic()
+                next_deadline = min(worker["started"] + self.timeout for worker in running.values())
+                ready = wait(list(running), timeout=max(next_deadline - now, 0))
+                
+                finished = [(sentinel, None) for sentinel in ready]
+                now = time.monotonic()
+                finished += [
+                    (sentinel, "timeout")
+                    for sentinel, worker in running.items()
+                    if sentinel not in ready and now - worker["started"] > self.timeout
+                ]
+                for sentinel, killed in finished:
+                    result = self._finish(running.pop(sentinel), killed)
+                    progress.record(**result)
+                    outcomes[result["status"]] = outcomes.get(result["status"], 0) + 1
+                    done = sum(outcomes.values())
+                    message = f"[{done}/{total}] {result['status']}: {result['path']} ({result['elapsed']:.1f}s)"
+                    if result["status"] == "done":
+                        logger.info(message)
+                    else:
+                        logger.warning(f"{message} - {result['error']}")
+        finally:
+            for worker in running.values():
+                worker["process"].kill()
+            progress.close()
+        return outcomes
+
+
+def main():
+    """Main entry point for the batch exporter"""
+    parser = argparse.ArgumentParser(
+        description="Binary Ninja MCP Batch Exporter - Analyze binaries headlessly and export them to a directory"
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="Directories to scan recursively, or manifest files listing one binary path per line"
+    )
+    parser.add_argument(
+        "--output",
+        required=True,
+        help="Store directory; each binary is exported to OUTPUT/<sha256>/"
+    )
+    parser.add_argument(
+        "--pattern",
+        default="*",
+        help="File name pattern for binaries found in directories (default: *)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Binaries analyzed in parallel, one process each (default: number of cores)"
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=1800,
+        help="Seconds allowed per binary for analysis and export before its worker is killed (default: 1800)"
+    )
+    parser.add_argument(
+        "--memory-limit",
+        type=int,
+        default=8192,
+        help="Peak memory per worker in MiB before it is killed (default: 8192; 0 for none)"
+    )
+    parser.add_argument(
+        "--no-hlil",
+        action="store_true",
+        help="Skip exporting HLIL, which is usually the slowest part of the export"
+    )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Retry binaries that failed, timed out or ran out of memory in an earlier run"
+    )
+    
+    args = parser.parse_args()
+    
+    if args.memory_limit and resource is None:
+        logger.warning("Per-worker memory limits are not supported on this platform")
+    
+    paths = find_binaries(args.inputs, args.pattern)
+    runner = BatchRunner(
+        args.output,
+        workers=max(args.workers, 1),
+        timeout=args.timeout,
+        memory_limit=args.memory_limit * 1024 * 1024,
+        hlil=not args.no_hlil,
+        retry_failed=args.retry_failed
+    )
+    outcomes = runner.run(paths)
+    logger.info("Finished: " + (", ".join(f"{count} {status}" for status, count in sorted(outcomes.items())) or "nothing to do"))
+    sys.exit(1 if set(outcomes) - {"done"} else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Binary Ninja MCP benchmark
+Load-tests the plugin's HTTP server, and the bridge's MCP tools on top of it,
+against a synthetic BinaryView (see fake_binaryninja.py), so no Binary Ninja
+license or real binary is needed.
+
+Reports p50/p90/p99 latency and throughput per endpoint and per tool under
+concurrent load, and can save the results as JSON and compare them with a
+previous run to catch regressions.
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import logging
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import quote
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.dirname(HERE)
+sys.path.insert(0, HERE)
+sys.path.insert(0, REPO)
+
+import fake_binaryninja
+
+fake_binaryninja.install()
+# The plugin logs every request through bn.log_info; keep that out of the measurements
+logging.getLogger("fake_binaryninja").setLevel(logging.WARNING)
+
+import binaryninja_mcp_plugin as plugin  # noqa: E402  (needs the fake installed first)
+
+
+def pick_function(context, rng):
+    return rng.choice(context["names"])
+
+
+def pick_hot_function(context, rng):
+    return rng.choice(context["hot_names"])
+
+
+# Plugin endpoints: scenario -> function(context, rng) returning (method, path, body)
+DIRECT_SCENARIOS = {
+    "health": lambda c, r: ("GET", "/health", None),
+    "list_functions": lambda c, r: ("GET", f"/functions?offset={r.randrange(c['functions'])}&limit=100", None),
+    "list_strings": lambda c, r: ("GET", f"/strings?offset={r.randrange(max(c['strings'], 1))}&limit=100", None),
+    "function_table": lambda c, r: ("GET", "/functions/table?format=npz", None),
+    "search": lambda c, r: ("GET", f"/search?q={r.choice(fake_binaryninja.WORDS)}&limit=50", None),
+    "xrefs": lambda c, r: ("GET", f"/xrefs?name={quote(pick_function(c, r))}", None),
+    "callers": lambda c, r: ("GET", f"/callers?name={quote(pick_function(c, r))}&depth=2", None),
+    "similar": lambda c, r: ("GET", f"/similar?name={quote(pick_function(c, r))}&limit=10", None),
+    "decompile": lambda c, r: ("POST", "/decompile", pick_function(c, r)),
+    "decompile_hot": lambda c, r: ("POST", "/decompile", pick_hot_function(c, r)),
+    "decompile_page": lambda c, r: ("GET", f"/decompile/lines?name={quote(pick_hot_function(c, r))}&offset=100&limit=50", None),
+    "decompile_batch": lambda c, r: (
+        "POST", "/decompile/batch", json.dumps([pick_function(c, r) for _ in range(10)])
+    ),
+}
+
+# Bridge tools: scenario -> function(context, rng) returning (tool, arguments)
+BRIDGE_SCENARIOS = {
+    "list_functions": lambda c, r: ("list_functions", {"offset": r.randrange(c["functions"]), "limit": 100}),
+    "list_strings": lambda c, r: ("list_strings", {"offset": r.randrange(max(c["strings"], 1)), "limit": 100}),
+    "search": lambda c, r: ("search", {"query": r.choice(fake_binaryninja.WORDS), "limit": 50}),
+    "get_cross_references": lambda c, r: ("get_cross_references", {"name": pick_function(c, r)}),
+    "get_callers": lambda c, r: ("get_callers", {"name": pick_function(c, r), "depth": 2}),
+    "decompile_function": lambda c, r: ("decompile_function", {"name": pick_function(c, r)}),
+    "decompile_hot": lambda c, r: ("decompile_function", {"name": pick_hot_function(c, r)}),
+    "decompile_functions": lambda c, r: (
+        "decompile_functions", {"names": [pick_function(c, r) for _ in range(10)]}
+    ),
+}
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection to a server listening on a Unix domain socket"""
+    
+    def __init__(self, path, timeout=60):
+        super().__init__("localhost", timeout=timeout)
+        self.path = path
+    
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+def connect(args):
+    """A connection to the plugin server, over TCP or its Unix socket"""
+    if args.unix_socket:
+        return UnixHTTPConnection(args.unix_socket, timeout=60)
+    return http.client.HTTPConnection("127.0.0.1", args.port, timeout=60)
+
+
+def summarize(latencies, errors, rejected, wall):
+    """Latency percentiles (ms) and throughput for one scenario"""
+    latencies = sorted(latencies)
+    count = len(latencies)
+    
+    def percentile(p):
+        if not latencies:
+            return None
+        return round(latencies[min(count - 1, int(p / 100 * count))] * 1000, 3)
+    
+    return {
+        "requests": count,
+        "errors": errors,
+        "rejected": rejected,
+        "seconds": round(wall, 3),
+        "throughput": round(count / wall, 1) if wall else None,
+        "mean_ms": round(sum(latencies) / count * 1000, 3) if count else None,
+        "p50_ms": percentile(50),
+        "p90_ms": percentile(90),
+        "p99_ms": percentile(99),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else None,
+    }
+
+
+def run_direct(scenario, context, args):
+    """Hammer one plugin endpoint from `concurrency` threads, each on its own keep-alive connection"""
+    make_request = DIRECT_SCENARIOS[scenario]
+    remaining = [args.requests]
+    lock = threading.Lock()
+    latencies = []
+    counts = {"errors": 0, "rejected": 0}
+    headers = {"Accept-Encoding": args.accept_encoding} if args.accept_encoding else {}
+    
+    def worker(seed):
+        rng = random.Random(seed)
+        connection = connect(args)
+        mine = []
+        errors = rejected = 0
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    break
+                remaining[0] -= 1
+            method, path, body = make_request(context, rng)
+            started = time.perf_counter()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = connect(args)
+                errors += 1
+                continue
+            mine.append(time.perf_counter() - started)
+            if status == 429:
+                rejected += 1
+            elif status >= 400:
+                errors += 1
+        connection.close()
+        with lock:
+            latencies.extend(mine)
+            counts["errors"] += errors
+            counts["rejected"] += rejected
+    
+    threads = [threading.Thread(target=worker, args=(args.seed + i,)) for i in range(args.concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, counts["errors"], counts["rejected"], time.perf_counter() - started)
+
+
+def tool_result(result):
+    """What a bridge tool returned, decoded from FastMCP's call_tool content"""
+    if isinstance(result, tuple):  # (content, structured output) in newer FastMCP releases
+        result = result[0]
+    texts = [getattr(item, "text", "") for item in result]
+    if len(texts) != 1:
+        return texts
+    try:
+        return json.loads(texts[0])
+    except ValueError:
+        return texts[0]
+
+
+async def run_bridge(scenario, context, args):
+    """Call one bridge tool through FastMCP from `concurrency` concurrent tasks"""
+    import bridge_mcp_binaryninja as bridge
+    
+    make_call = BRIDGE_SCENARIOS[scenario]
+    remaining = [args.requests]
+    latencies = []
+    errors = 0
+    
+    async def worker(seed):
+        nonlocal errors
+        rng = random.Random(seed)
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            tool, arguments = make_call(context, rng)
+            started = time.perf_counter()
+            try:
+                result = await bridge.mcp.call_tool(tool, arguments)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            # Tools report backend failures in their result rather than by raising
+            if bridge.is_error(tool_result(result)):
+                errors += 1
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(args.seed + i) for i in range(args.concurrency)))
+    return summarize(latencies, errors, 0, time.perf_counter() - started)
+
+
+def wait_ready(args, path, timeout=600):
+    """Poll an endpoint until it stops answering 503 (index still building); returns seconds waited"""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        connection = connect(args)
+        try:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            if response.status != 503:
+                return round(time.perf_counter() - started, 3)
+        except OSError:
+            pass
+        finally:
+            connection.close()
+        time.sleep(0.05)
+    raise RuntimeError(f"{path} still not ready after {timeout}s")
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, tolerance):
+    """List scenarios whose p50/p99 latency grew, or throughput fell, by more than `tolerance`"""
+    regressions = []
+    for mode, scenarios in results.items():
+        for scenario, current in scenarios.items():
+            previous = baseline.get("results", {}).get(mode, {}).get(scenario)
+            if not previous:
+                continue
+            for metric in ("p50_ms", "p99_ms"):
+                if previous.get(metric) and current.get(metric) and current[metric] > previous[metric] * (1 + tolerance):
+                    regressions.append(f"{mode}/{scenario}: {metric} {previous[metric]} -> {current[metric]}")
+            if previous.get("throughput") and current.get("throughput") and \
+                    current["throughput"] < previous["throughput"] * (1 - tolerance):
+                regressions.append(
+                    f"{mode}/{scenario}: throughput {previous['throughput']} -> {current['throughput']}"
+                )
+    return regressions
+
+
+def print_table(mode, scenarios):
+    print(f"\n{mode}")
+    print(f"{'scenario':<22}{'req/s':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}{'errors':>8}{'429s':>6}")
+    for scenario, stats in scenarios.items():
+        print(
+            f"{scenario:<22}{stats['throughput'] or 0:>10}{stats['p50_ms'] or 0:>10}{stats['p90_ms'] or 0:>10}"
+            f"{stats['p99_ms'] or 0:>10}{stats['max_ms'] or 0:>10}{stats['errors']:>8}{stats['rejected']:>6}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Binary Ninja MCP plugin and bridge on a synthetic binary")
+    workload = parser.add_argument_group("synthetic binary")
+    workload.add_argument("--functions", type=int, default=10000, help="Number of functions (default: 10000)")
+    workload.add_argument("--strings", type=int, default=50000, help="Number of strings (default: 50000)")
+    workload.add_argument("--imports", type=int, default=500, help="Number of imports (default: 500)")
+    workload.add_argument("--data-vars", type=int, default=2000, help="Number of data variables (default: 2000)")
+    workload.add_argument("--calls", type=int, default=4, help="Calls made by each function, i.e. xref density (default: 4)")
+    workload.add_argument("--hlil-lines", type=int, default=200, help="Lines of HLIL per function (default: 200)")
+    workload.add_argument("--render-delay", type=float, default=0.002, help="Simulated seconds to render one function (default: 0.002)")
+    workload.add_argument("--seed", type=int, default=0, help="Random seed for the workload and request mix (default: 0)")
+    
+    load = parser.add_argument_group("load")
+    load.add_argument("--mode", choices=["direct", "bridge", "both"], default="both",
+                      help="Drive the plugin over HTTP, the bridge tools, or both (default: both)")
+    load.add_argument("--scenarios", default="", help="Comma-separated scenarios to run (default: all)")
+    load.add_argument("--requests", type=int, default=1000, help="Requests per scenario (default: 1000)")
+    load.add_argument("--concurrency", type=int, default=8, help="Concurrent clients (default: 8)")
+    load.add_argument("--accept-encoding", default="gzip", help="Accept-Encoding for direct requests (default: gzip; '' for none)")
+    load.add_argument("--bridge-cache-ttl", type=float, default=None, help="Override the bridge's response cache TTL")
+    
+    server = parser.add_argument_group("plugin server")
+    server.add_argument("--port", type=int, default=18080, help="Port for the plugin server (default: 18080)")
+    server.add_argument("--unix-socket", help="Serve on this Unix domain socket instead of --port")
+    server.add_argument("--workers", type=int, default=4, help="Plugin worker threads (default: 4)")
+    server.add_argument("--queue-depth", type=int, default=64, help="Plugin request queue depth (default: 64)")
+    
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Compare with a previous JSON result and exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Relative slowdown tolerated by --compare (default: 0.25)")
+    args = parser.parse_args()
+    
+    selected = {name.strip() for name in args.scenarios.split(",") if name.strip()}
+    
+    started = time.perf_counter()
+    view = fake_binaryninja.SyntheticBinaryView(
+        functions=args.functions, strings=args.strings, imports=args.imports, data_vars=args.data_vars,
+        calls=args.calls, hlil_lines=args.hlil_lines, render_delay=args.render_delay, seed=args.seed
+    )
+    meta = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "args": vars(args),
+        "view_build_seconds": round(time.perf_counter() - started, 3),
+    }
+    print(f"Synthetic view: {args.functions} functions, {args.strings} strings ({meta['view_build_seconds']}s)")
+    
+    names = [func.name for func in view.functions]
+    context = {
+        "functions": args.functions,
+        "strings": args.strings,
+        "names": names,
+        "hot_names": random.Random(args.seed).sample(names, min(20, len(names))),
+    }
+    
+    mcp_server = plugin.BinaryNinjaMCPServer(
+        port=args.port, workers=args.workers, queue_depth=args.queue_depth, socket_path=args.unix_socket
+    )
+    started = time.perf_counter()
+    mcp_server.start(view)
+    if not mcp_server.server:
+        sys.exit(f"Could not start the plugin server on {mcp_server.url}")
+    meta["server_start_seconds"] = round(time.perf_counter() - started, 3)
+    meta["search_index_seconds"] = wait_ready(args, "/search?q=main")
+    meta["call_graph_seconds"] = wait_ready(args, "/callers?name=main")
+    meta["similarity_index_seconds"] = wait_ready(args, "/similar?name=main")
+    
+    results = {}
+    try:
+        if args.mode in ("direct", "both"):
+            results["direct"] = {}
+            for scenario in DIRECT_SCENARIOS:
+                if selected and scenario not in selected:
+                    continue
+                results["direct"][scenario] = run_direct(scenario, context, args)
+            print_table("direct (HTTP to plugin)", results["direct"])
+        
+        if args.mode in ("bridge", "both"):
+            import bridge_mcp_binaryninja as bridge
+            bridge.set_server(mcp_server.url if args.unix_socket else f"http://127.0.0.1:{args.port}")
+            bridge.configure_client(pool_size=args.concurrency, concurrency=args.concurrency)
+            if args.bridge_cache_ttl is not None:
+                bridge.cache_ttl = args.bridge_cache_ttl
+            
+            async def run_all():
+                scenarios = {}
+                for scenario in BRIDGE_SCENARIOS:
+                    if selected and scenario not in selected:
+                        continue
+                    scenarios[scenario] = await run_bridge(scenario, context, args)
+                return scenarios
+            
+            results["bridge"] = asyncio.run(run_all())
+            print_table("bridge (MCP tools end to end)", results["bridge"])
+    finally:
+        mcp_server.stop()
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nRegressions against {args.compare}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
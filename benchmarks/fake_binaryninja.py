@@ -0,0 +1,464 @@
+"""
+Synthetic stand-in for the parts of the Binary Ninja API the MCP plugin uses
+
+Lets the plugin be loaded and driven without a Binary Ninja license or a real
+binary. SyntheticBinaryView generates a deterministic workload of any size:
+functions with call graphs and cross-references, imports, exports, data
+variables, strings, types and HLIL bodies of a configurable length. Rendering
+cost and analysis time can be simulated with sleeps, which release the GIL
+the way Binary Ninja's native code does.
+
+Call install() before importing binaryninja_mcp_plugin.
+"""
+
+import bisect
+import enum
+import logging
+import random
+import sys
+import time
+import types
+
+logger = logging.getLogger("fake_binaryninja")
+
+WORDS = (
+    "parse", "init", "read", "write", "alloc", "free", "hash", "decode", "encode", "handle",
+    "dispatch", "send", "recv", "lock", "unlock", "open", "close", "config", "buffer", "socket",
+    "crypto", "update", "verify", "table", "string", "list", "node", "tree", "state", "error"
+)
+
+
+class SymbolType(enum.IntEnum):
+    FunctionSymbol = 0
+    ImportAddressSymbol = 1
+    ImportedFunctionSymbol = 2
+    DataSymbol = 3
+    ImportedDataSymbol = 4
+    ExternalSymbol = 5
+
+
+class SymbolBinding(enum.IntEnum):
+    NoBinding = 0
+    LocalBinding = 1
+    GlobalBinding = 2
+    WeakBinding = 3
+
+
+class AnalysisState(enum.IntEnum):
+    InitialState = 0
+    HoldState = 1
+    IdleState = 2
+    DisassembleState = 3
+    AnalyzeState = 4
+    ExtendedAnalyzeState = 5
+
+
+class InstructionTextTokenType(enum.IntEnum):
+    TextToken = 0
+    InstructionToken = 1
+    RegisterToken = 5
+    IntegerToken = 6
+    PossibleAddressToken = 7
+
+
+class MessageBoxButtonSet(enum.IntEnum):
+    OKButtonSet = 0
+
+
+class MessageBoxIcon(enum.IntEnum):
+    InformationIcon = 0
+
+
+class Symbol:
+    __slots__ = ("type", "address", "name", "binding", "auto")
+    
+    def __init__(self, sym_type, addr, short_name, full_name=None, raw_name=None, binding=None, namespace=None, ordinal=0):
+        self.type = sym_type
+        self.address = addr
+        self.name = short_name
+        self.binding = SymbolBinding.GlobalBinding if binding is None else binding
+        self.auto = False
+
+
+class BinaryDataNotification:
+    def __init__(self, notifications=None):
+        pass
+
+
+class PluginCommand:
+    @staticmethod
+    def register(name, description, action, is_valid=None):
+        pass
+
+
+class ReferenceSource:
+    __slots__ = ("function", "address")
+    
+    def __init__(self, function, address):
+        self.function = function
+        self.address = address
+
+
+class StringReference:
+    __slots__ = ("start", "value", "length")
+    
+    def __init__(self, start, value):
+        self.start = start
+        self.value = value
+        self.length = len(value)
+
+
+class DataVariable:
+    __slots__ = ("address",)
+    
+    def __init__(self, address):
+        self.address = address
+
+
+class BasicBlock:
+    __slots__ = ("start", "end", "instruction_count", "outgoing_edges")
+    
+    def __init__(self, start, end, instruction_count, outgoing_edges):
+        self.start = start
+        self.end = end
+        self.instruction_count = instruction_count
+        self.outgoing_edges = outgoing_edges
+
+
+class InstructionTextToken:
+    __slots__ = ("type", "text", "value")
+    
+    def __init__(self, token_type, text, value=0):
+        self.type = token_type
+        self.text = text
+        self.value = value
+
+
+class DisassemblyTextLine:
+    __slots__ = ("address", "text")
+    
+    def __init__(self, address, text):
+        self.address = address
+        self.text = text
+    
+    def __str__(self):
+        return self.text
+
+
+class SyntheticIL:
+    """HLIL/MLIL stand-in: renders `lines` lines of pseudo-C, taking `delay` seconds
+    
+    Body lines are mapped to addresses that increase through the function,
+    four bytes apart and wrapping within it; the braces have no address.
+    """
+    
+    def __init__(self, function, lines, delay):
+        self.function = function
+        self.lines = lines
+        self.delay = delay
+    
+    def __bool__(self):
+        return True
+    
+    @property
+    def root(self):
+        return types.SimpleNamespace(lines=self._render())
+    
+    def _render(self):
+        if self.delay:
+            time.sleep(self.delay)
+        func = self.function
+        size = func.view.FUNCTION_SIZE
+        body = [
+            DisassemblyTextLine(None, f"int64_t {func.name}(int64_t arg1, int64_t arg2)"),
+            DisassemblyTextLine(None, "{")
+        ]
+        callees = func.view._callees[func.index]
+        for i in range(self.lines):
+            address = func.start + i * 4 % size
+            if callees and i % 7 == 0:
+                callee = func.view._functions[callees[i // 7 % len(callees)]]
+                body.append(DisassemblyTextLine(address, f"    int64_t var_{i:x} = {callee.name}(arg1, {i});"))
+            else:
+                body.append(DisassemblyTextLine(
+                    address, f"    arg{i % 2 + 1} = (arg1 ^ 0x{i * 0x9e37:x}) + *(uint64_t*)(arg2 + 0x{i * 8:x});"
+                ))
+        body.append(DisassemblyTextLine(func.start + size - 4, "    return arg1;"))
+        body.append(DisassemblyTextLine(None, "}"))
+        return body
+    
+    def __str__(self):
+        return "\n".join(str(line) for line in self._render())
+
+
+class Function:
+    __slots__ = ("view", "index", "start", "_name")
+    
+    def __init__(self, view, index, start, name):
+        self.view = view
+        self.index = index
+        self.start = start
+        self._name = name
+    
+    @property
+    def name(self):
+        return self._name
+    
+    @name.setter
+    def name(self, value):
+        self.view.define_user_symbol(Symbol(SymbolType.FunctionSymbol, self.start, value))
+    
+    @property
+    def symbol(self):
+        symbol = Symbol(SymbolType.FunctionSymbol, self.start, self._name)
+        symbol.auto = self._name == f"sub_{self.start:x}"
+        return symbol
+    
+    @property
+    def total_bytes(self):
+        return self.view.FUNCTION_SIZE
+    
+    @property
+    def basic_blocks(self):
+        # One block per call plus an exit block, chained, with a loop back on every third
+        count = len(self.view._callees[self.index]) + 1
+        size = self.view.FUNCTION_SIZE // count
+        return [
+            BasicBlock(
+                self.start + i * size, self.start + (i + 1) * size if i + 1 < count else self.start + self.view.FUNCTION_SIZE,
+                4 + self.index * (i + 1) % 5, [None] * ((i + 1 < count) + (i % 3 == 2))
+            )
+            for i in range(count)
+        ]
+    
+    @property
+    def instructions(self):
+        # Functions sharing index % CONSTANT_FAMILIES use the same constants
+        family = self.index % self.view.CONSTANT_FAMILIES
+        for i in range(4):
+            value = 0x1000 + family * 0x111 + i * 0x10000
+            yield [
+                InstructionTextToken(InstructionTextTokenType.InstructionToken, "mov"),
+                InstructionTextToken(InstructionTextTokenType.RegisterToken, "eax"),
+                InstructionTextToken(InstructionTextTokenType.IntegerToken, f"0x{value:x}", value),
+            ], self.start + i * 4
+    
+    @property
+    def call_sites(self):
+        return [
+            ReferenceSource(self, self.start + 0x10 * (slot + 1))
+            for slot in range(len(self.view._callees[self.index]))
+        ]
+    
+    @property
+    def hlil(self):
+        return SyntheticIL(self, self.view.hlil_lines, self.view.render_delay)
+    
+    @property
+    def mlil(self):
+        return SyntheticIL(self, self.view.hlil_lines, self.view.render_delay)
+
+
+class SyntheticBinaryView:
+    """A BinaryView-shaped workload generator
+    
+    Functions are FUNCTION_SIZE bytes apart from BASE; each makes `calls`
+    calls to random other functions (so every function has `calls` incoming
+    references on average), a `named` fraction of them have word-based names
+    instead of sub_XXXX, and one in ten is exported.
+    """
+    
+    BASE = 0x400000
+    FUNCTION_SIZE = 0x100
+    CONSTANT_FAMILIES = 50
+    
+    def __init__(self, functions=1000, strings=5000, imports=200, data_vars=1000, types_count=500,
+                 calls=4, hlil_lines=50, render_delay=0.0, analysis_seconds=0.0, named=0.3, seed=0):
+        rng = random.Random(seed)
+        self.file = types.SimpleNamespace(filename=f"synthetic-{functions}f-{strings}s.bin")
+        self.hlil_lines = hlil_lines
+        self.render_delay = render_delay
+        self.analysis_seconds = analysis_seconds
+        self._notifications = []
+        
+        self._functions = []
+        self._by_start = {}
+        for i in range(functions):
+            start = self.BASE + i * self.FUNCTION_SIZE
+            if i == 0:
+                name = "main"
+            elif rng.random() < named:
+                name = f"{rng.choice(WORDS)}_{rng.choice(WORDS)}_{i}"
+            else:
+                name = f"sub_{start:x}"
+            func = Function(self, i, start, name)
+            self._functions.append(func)
+            self._by_start[start] = func
+        self._starts = [func.start for func in self._functions]
+        
+        # Call graph: function index -> callee indices, and callee start -> [(caller index, slot)]
+        self._callees = [
+            [rng.randrange(functions) for _ in range(calls)] if functions > 1 else []
+            for _ in range(functions)
+        ]
+        self._callers = {}
+        for caller, callees in enumerate(self._callees):
+            for slot, callee in enumerate(callees):
+                self._callers.setdefault(self._starts[callee], []).append((caller, slot))
+        
+        self._exports = {self._starts[i] for i in range(0, functions, 10)}
+        
+        extern_base = self.BASE + functions * self.FUNCTION_SIZE + 0x100000
+        self._imports = [
+            Symbol(SymbolType.ImportedFunctionSymbol, extern_base + i * 8, f"{rng.choice(WORDS)}_{i}@IMPORT")
+            for i in range(imports)
+        ]
+        
+        data_base = extern_base + imports * 8 + 0x100000
+        self._data = {}
+        self._data_symbols = {}
+        for i in range(data_vars):
+            addr = data_base + i * 8
+            self._data[addr] = DataVariable(addr)
+            self._data_symbols[addr] = Symbol(SymbolType.DataSymbol, addr, f"g_{rng.choice(WORDS)}_{i}")
+        
+        string_base = data_base + data_vars * 8 + 0x100000
+        self.strings = [
+            StringReference(string_base + i * 0x40, f"{rng.choice(WORDS)} {rng.choice(WORDS)} failed: code %d ({i})")
+            for i in range(strings)
+        ]
+        self._strings_by_start = {string.start: string for string in self.strings}
+        # Each string is referenced from one function, at its first instruction
+        self._string_refs = {
+            string.start: self._starts[i % functions] for i, string in enumerate(self.strings)
+        } if functions else {}
+        
+        self.types = {f"struct_{rng.choice(WORDS)}_{i}": None for i in range(types_count)}
+        self.entry_point = self.BASE
+        self.start = self.BASE
+        self.end = string_base + strings * 0x40
+        self.analysis_progress = types.SimpleNamespace(state=AnalysisState.IdleState, count=0, total=0)
+    
+    @property
+    def functions(self):
+        return list(self._functions)
+    
+    @property
+    def entry_function(self):
+        return self._functions[0] if self._functions else None
+    
+    @property
+    def data_vars(self):
+        return dict(self._data)
+    
+    def get_function_at(self, addr):
+        return self._by_start.get(addr)
+    
+    def get_functions_containing(self, addr):
+        index = bisect.bisect_right(self._starts, addr) - 1
+        if index >= 0 and addr < self._starts[index] + self.FUNCTION_SIZE:
+            return [self._functions[index]]
+        return []
+    
+    def get_data_var_at(self, addr):
+        return self._data.get(addr)
+    
+    def get_symbol_at(self, addr):
+        func = self._by_start.get(addr)
+        if func:
+            binding = SymbolBinding.GlobalBinding if addr in self._exports else SymbolBinding.LocalBinding
+            return Symbol(SymbolType.FunctionSymbol, addr, func.name, binding=binding)
+        return self._data_symbols.get(addr)
+    
+    def get_symbols_of_type(self, sym_type):
+        if sym_type == SymbolType.FunctionSymbol:
+            return [self.get_symbol_at(start) for start in self._starts]
+        if sym_type == SymbolType.ImportedFunctionSymbol:
+            return list(self._imports)
+        if sym_type == SymbolType.DataSymbol:
+            return list(self._data_symbols.values())
+        return []
+    
+    def get_symbols_by_name(self, name):
+        found = [self.get_symbol_at(func.start) for func in self._functions if func.name == name]
+        found += [symbol for symbol in self._imports if symbol.name == name]
+        found += [symbol for symbol in self._data_symbols.values() if symbol.name == name]
+        return found
+    
+    def get_string_at(self, addr):
+        return self._strings_by_start.get(addr)
+    
+    def get_code_refs(self, addr):
+        if addr in self._string_refs:
+            func = self._by_start[self._string_refs[addr]]
+            return [ReferenceSource(func, func.start)]
+        return [
+            ReferenceSource(self._functions[caller], self._starts[caller] + 0x10 * (slot + 1))
+            for caller, slot in self._callers.get(addr, ())
+        ]
+    
+    def get_callees(self, addr, func=None):
+        func = func or (self.get_functions_containing(addr) or [None])[0]
+        if func is None:
+            return []
+        slot = (addr - func.start) // 0x10 - 1
+        callees = self._callees[func.index]
+        return [self._starts[callees[slot]]] if 0 <= slot < len(callees) else []
+    
+    def define_user_symbol(self, symbol):
+        func = self._by_start.get(symbol.address)
+        if func:
+            func._name = symbol.name
+        elif symbol.address in self._data_symbols:
+            self._data_symbols[symbol.address] = symbol
+        self.notify("symbol_updated", symbol)
+        if func:
+            self.notify("function_updated", func)
+    
+    def register_notification(self, notification):
+        self._notifications.append(notification)
+    
+    def unregister_notification(self, notification):
+        self._notifications.remove(notification)
+    
+    def notify(self, callback, *args):
+        """Deliver a BinaryDataNotification callback to every registered listener"""
+        for notification in list(self._notifications):
+            getattr(notification, callback)(self, *args)
+    
+    def update_analysis(self):
+        pass
+    
+    def update_analysis_and_wait(self):
+        self.analysis_progress.state = AnalysisState.AnalyzeState
+        if self.analysis_seconds:
+            time.sleep(self.analysis_seconds)
+        self.analysis_progress.state = AnalysisState.IdleState
+
+
+def log_debug(message):
+    logger.debug(message)
+
+
+def log_info(message):
+    logger.info(message)
+
+
+def log_warn(message):
+    logger.warning(message)
+
+
+def log_error(message):
+    logger.error(message)
+
+
+def show_message_box(title, text, buttons=None, icon=None):
+    pass
+
+
+def install():
+    """Register this module as `binaryninja` so the plugin imports it"""
+    module = sys.modules[__name__]
+    module.BinaryView = SyntheticBinaryView
+    sys.modules["binaryninja"] = module
+    return module
@@ -3,116 +3,3625 @@ Binary Ninja MCP Plugin
 Exposes Binary Ninja functionality via HTTP API for MCP integration
 """
 
+import base64
+import bisect
+import errno
+import hashlib
+import heapq
+import io
 import json
+import math
+import operator
+import os
+import queue
+import re
+import selectors
+import socket
+import stat
+import sys
 import threading
+import time
+import uuid
+import zipfile
+import zlib
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager, nullcontext
 from http.server import BaseHTTPRequestHandler, HTTPServer
+from itertools import islice
 from urllib.parse import urlparse, parse_qs
 import binaryninja as bn
 from binaryninja import PluginCommand
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # zstd responses are offered only when the module is installed
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:
+    pyarrow = None  # format=arrow function tables need it; npz and JSON don't
+
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None  # The persistent store is unavailable without it
+
+
+def negotiate_encoding(accept_encoding):
+    """Pick the response Content-Encoding from an Accept-Encoding header (None for identity)"""
+    accepted = set()
+    for token in (accept_encoding or '').split(','):
+        coding, _, params = token.strip().partition(';')
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                if float(params[2:] or 0) == 0:
+                    continue
+            except ValueError:
+                continue  # A malformed q-value: ignore that coding
+        accepted.add(coding.strip().lower())
+    if zstandard is not None and 'zstd' in accepted:
+        return 'zstd'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+class ResponseEncoder:
+    """Incremental gzip/zstd (or pass-through) encoder for one response body"""
+    
+    def __init__(self, encoding):
+        self.encoding = encoding
+        if encoding == 'gzip':
+            self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        elif encoding == 'zstd':
+            self._compressor = zstandard.ZstdCompressor(level=3).compressobj()
+        else:
+            self._compressor = None
+    
+    def compress(self, data):
+        return self._compressor.compress(data) if self._compressor else data
+    
+    def flush(self):
+        """Emit everything compressed so far so the client can decode it now"""
+        if self.encoding == 'gzip':
+            return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        if self.encoding == 'zstd':
+            return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return b''
+    
+    def finish(self):
+        return self._compressor.flush() if self._compressor else b''
+
+
+class Metrics:
+    """Thread-safe counters, gauges and histograms, rendered in the Prometheus text format
+    
+    `definitions` maps each metric name to (type, help); samples are keyed by
+    their label values, given as keyword arguments.
+    """
+    
+    BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+    
+    def __init__(self, prefix, definitions):
+        self.prefix = prefix
+        self.definitions = definitions
+        self._lock = threading.Lock()
+        self._values = {name: {} for name in definitions}  # name -> {labels: value or histogram}
+    
+    def inc(self, name, amount=1, **labels):
+        """Add to a counter or gauge"""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            samples = self._values[name]
+            samples[key] = samples.get(key, 0) + amount
+    
+    def observe(self, name, value, **labels):
+        """Record a histogram observation"""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            samples = self._values[name]
+            histogram = samples.get(key)
+            if histogram is None:
+                # Per-bucket counts, then sum and count
+                histogram = samples[key] = [0] * len(self.BUCKETS) + [0.0, 0]
+            index = bisect.bisect_left(self.BUCKETS, value)
+            if index < len(self.BUCKETS):
+                histogram[index] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+    
+    @staticmethod
+    def _labels(key, extra=()):
+        pairs = list(key) + list(extra)
+        if not pairs:
+            return ''
+        escape = lambda value: str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in pairs) + '}'
+    
+    def render(self, collected=()):
+        """Prometheus exposition text; `collected` adds (name, type, help, [(labels, value)])
+        metrics sampled at scrape time"""
+        with self._lock:
+            values = {
+                name: {key: list(value) if isinstance(value, list) else value for key, value in samples.items()}
+                for name, samples in self._values.items()
+            }
+        
+        lines = []
+        metrics = [(name, kind, text, values[name]) for name, (kind, text) in self.definitions.items()]
+        metrics += [(name, kind, text, {tuple(sorted(labels.items())): value for labels, value in samples})
+                    for name, kind, text, samples in collected]
+        for name, kind, text, samples in metrics:
+            full_name = f"{self.prefix}_{name}"
+            lines.append(f"# HELP {full_name} {text}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            for key, value in sorted(samples.items()):
+                if kind != 'histogram':
+                    lines.append(f"{full_name}{self._labels(key)} {value}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.BUCKETS, value):
+                    cumulative += count
+                    lines.append(f"{full_name}_bucket{self._labels(key, [('le', bound)])} {cumulative}")
+                lines.append(f"{full_name}_bucket{self._labels(key, [('le', '+Inf')])} {value[-1]}")
+                lines.append(f"{full_name}_sum{self._labels(key)} {value[-2]}")
+                lines.append(f"{full_name}_count{self._labels(key)} {value[-1]}")
+        return '\n'.join(lines) + '\n'
+
+
+class PersistentStore:
+    """SQLite file keeping rendered HLIL, name indexes, call graph edges and listings across restarts
+    
+    Rows are grouped by view key (see ViewStore), so one file holds every
+    binary; only the KEEP_KEYS most recently used keys of a binary are kept.
+    A kind of rows is either partial (rendered functions, filled lazily) or
+    a complete table written in one go and marked complete.
+    """
+    
+    KEEP_KEYS = 4
+    
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS views (
+                view_key TEXT PRIMARY KEY, file_hash TEXT NOT NULL, last_used REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                view_key TEXT NOT NULL, kind TEXT NOT NULL, item INTEGER NOT NULL, value TEXT NOT NULL,
+                PRIMARY KEY (view_key, kind, item)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS complete (
+                view_key TEXT NOT NULL, kind TEXT NOT NULL, PRIMARY KEY (view_key, kind)
+            ) WITHOUT ROWID;
+        ''')
+    
+    def open_view(self, view_key, file_hash):
+        """Mark a key used and prune old keys of the same binary; returns (complete kinds, {kind: items})"""
+        with self._lock:
+            db = self._db
+            db.execute('BEGIN')
+            try:
+                db.execute(
+                    'INSERT OR REPLACE INTO views (view_key, file_hash, last_used) VALUES (?, ?, ?)',
+                    (view_key, file_hash, time.time())
+                )
+                stale = db.execute(
+                    'SELECT view_key FROM views WHERE file_hash = ? ORDER BY last_used DESC LIMIT -1 OFFSET ?',
+                    (file_hash, self.KEEP_KEYS)
+                ).fetchall()
+                for (old_key,) in stale:
+                    for table in ('entries', 'complete', 'views'):
+                        db.execute(f'DELETE FROM {table} WHERE view_key = ?', (old_key,))
+                db.execute('COMMIT')
+            except Exception:
+                db.execute('ROLLBACK')
+                raise
+            complete = {kind for (kind,) in db.execute('SELECT kind FROM complete WHERE view_key = ?', (view_key,))}
+            items = {}
+            for kind, item in db.execute('SELECT kind, item FROM entries WHERE view_key = ?', (view_key,)):
+                if kind not in complete:
+                    items.setdefault(kind, set()).add(item)
+            return complete, items
+    
+    def get(self, view_key, kind, item):
+        with self._lock:
+            row = self._db.execute(
+                'SELECT value FROM entries WHERE view_key = ? AND kind = ? AND item = ?', (view_key, kind, item)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def put(self, view_key, kind, item, value):
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO entries (view_key, kind, item, value) VALUES (?, ?, ?, ?)',
+                (view_key, kind, item, json.dumps(value))
+            )
+    
+    def delete(self, view_key, kind, item):
+        with self._lock:
+            self._db.execute('DELETE FROM entries WHERE view_key = ? AND kind = ? AND item = ?', (view_key, kind, item))
+    
+    def load(self, view_key, kind):
+        """Every row of a kind as {item: value}"""
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT item, value FROM entries WHERE view_key = ? AND kind = ?', (view_key, kind)
+            ).fetchall()
+        return {item: json.loads(value) for item, value in rows}
+    
+    def save(self, view_key, kind, items):
+        """Replace every row of a kind and mark it complete"""
+        rows = [(view_key, kind, item, json.dumps(value)) for item, value in items.items()]
+        with self._lock:
+            db = self._db
+            db.execute('BEGIN')
+            try:
+                db.execute('DELETE FROM entries WHERE view_key = ? AND kind = ?', (view_key, kind))
+                db.executemany('INSERT INTO entries (view_key, kind, item, value) VALUES (?, ?, ?, ?)', rows)
+                db.execute('INSERT OR REPLACE INTO complete (view_key, kind) VALUES (?, ?)', (view_key, kind))
+                db.execute('COMMIT')
+            except Exception:
+                db.execute('ROLLBACK')
+                raise
+    
+    def drop(self, view_key, kind):
+        """Delete every row of a kind"""
+        with self._lock:
+            db = self._db
+            db.execute('BEGIN')
+            try:
+                db.execute('DELETE FROM entries WHERE view_key = ? AND kind = ?', (view_key, kind))
+                db.execute('DELETE FROM complete WHERE view_key = ? AND kind = ?', (view_key, kind))
+                db.execute('COMMIT')
+            except Exception:
+                db.execute('ROLLBACK')
+                raise
+    
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class ViewStore:
+    """One view's rows in the PersistentStore, keyed by file hash and saved-edit state
+    
+    The key combines the binary's SHA-256, the database snapshot it was
+    opened from (each save of a .bndb is a new snapshot) and the Binary
+    Ninja version, so a reopened binary finds what was stored for exactly
+    that state. Rows are only written while the view has no unsaved edits;
+    once it has, a change drops the whole table it touches instead of
+    updating it, since the stored state could no longer be reopened. Saving
+    the view moves it to a new snapshot, and to that snapshot's key.
+    """
+    
+    def __init__(self, store, bv, file_hash):
+        self.store = store
+        self.bv = bv
+        self.file_hash = file_hash
+        self._core_version = getattr(bn, 'core_version', lambda: '')()
+        self._state = self._edit_state(bv)
+        self.key = f"{file_hash}:{self._state}:{self._core_version}"
+        self._lock = threading.Lock()
+        self._complete, self._items = store.open_view(self.key, file_hash)
+        self.failed = False  # Set on the first storage error; the view then runs without the store
+        self.hits = {}  # kind -> rows served from the store
+        self.misses = {}
+        self.writes = 0
+    
+    @staticmethod
+    def _edit_state(bv):
+        """Which saved edits the view was opened with: its database snapshot, or 'raw' for a bare binary"""
+        try:
+            database = getattr(bv.file, 'database', None)
+            snapshot = database.current_snapshot if database else None
+            return f"snapshot-{snapshot.id}" if snapshot else 'raw'
+        except Exception:
+            return 'raw'
+    
+    @property
+    def writable(self):
+        """Rows may be written only while the view matches the saved state its key names"""
+        return (not self.failed and not getattr(self.bv.file, 'modified', False)
+                and self._edit_state(self.bv) == self._state)
+    
+    def _follow_save(self):
+        """Switch to the key of the snapshot the view was saved to, if it was; call with the lock held
+        
+        Rows under the old key describe the state before the save, so nothing
+        may be written there any more. Tables are not carried over: the new
+        key gets whatever was stored for that snapshot, and is filled as
+        tables are rebuilt.
+        """
+        if self.failed or getattr(self.bv.file, 'modified', False):
+            return
+        state = self._edit_state(self.bv)
+        if state == self._state:
+            return
+        self._state = state
+        self.key = f"{self.file_hash}:{state}:{self._core_version}"
+        self._complete, self._items = self.store.open_view(self.key, self.file_hash)
+    
+    @contextmanager
+    def _storage(self):
+        """Hold the lock around store I/O; a failure disables the store for this view"""
+        with self._lock:
+            try:
+                self._follow_save()
+                yield
+            except sqlite3.Error as e:
+                bn.log_error(f"BinaryNinjaMCP: Persistent store failed, no longer using it for this view: {str(e)}")
+                self.failed = True
+                self._complete.clear()
+                self._items.clear()
+    
+    def _count(self, kind, hit):
+        counter = self.hits if hit else self.misses
+        counter[kind] = counter.get(kind, 0) + 1
+    
+    # Partial kinds: rows added one at a time
+    
+    def get(self, kind, item):
+        value = None
+        with self._storage():
+            if item in self._items.get(kind, ()):
+                value = self.store.get(self.key, kind, item)
+            self._count(kind, value is not None)
+        return value
+    
+    def put(self, kind, item, value):
+        with self._storage():
+            if self.writable:
+                self.store.put(self.key, kind, item, value)
+                self._items.setdefault(kind, set()).add(item)
+                self.writes += 1
+    
+    def delete(self, kind, item):
+        with self._storage():
+            items = self._items.get(kind)
+            if items and item in items:
+                self.store.delete(self.key, kind, item)
+                items.discard(item)
+    
+    # Complete kinds: whole tables, updated row by row once saved
+    
+    def has(self, kind):
+        """Whether a whole table of this kind is stored"""
+        return kind in self._complete
+    
+    def load(self, kind):
+        """The saved table of a kind as {item: value}, or None if it isn't stored"""
+        value = None
+        with self._storage():
+            if kind in self._complete:
+                value = self.store.load(self.key, kind)
+            self._count(kind, value is not None)
+        return value
+    
+    def save(self, kind, items, valid=None):
+        """Store a whole table, unless valid() says it went stale while it was being built"""
+        with self._storage():
+            if self.writable and (valid is None or valid()):
+                self.store.save(self.key, kind, items)
+                self._complete.add(kind)
+                self.writes += 1
+    
+    def update(self, kind, item, value):
+        """Write a change to one row of a saved table through (None deletes the row)"""
+        with self._storage():
+            if kind not in self._complete:
+                return
+            if not self.writable:
+                self._complete.discard(kind)
+                self.store.drop(self.key, kind)
+            elif value is None:
+                self.store.delete(self.key, kind, item)
+            else:
+                self.store.put(self.key, kind, item, value)
+                self.writes += 1
+    
+    def drop(self, kind):
+        with self._storage():
+            if kind in self._complete or self._items.pop(kind, None):
+                self._complete.discard(kind)
+                self.store.drop(self.key, kind)
+    
+    def drop_listings(self):
+        """Forget the stored listings, which any change to the view invalidates"""
+        with self._lock:
+            kinds = [kind for kind in self._complete if kind.startswith('listing:')]
+        for kind in kinds:
+            self.drop(kind)
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'path': self.store.path,
+                'key': self.key,
+                'writable': self.writable,
+                'failed': self.failed,
+                'tables': sorted(self._complete),
+                'functions': len(self._items.get('hlil', ())),
+                'hits': dict(self.hits),
+                'misses': dict(self.misses),
+                'writes': self.writes
+            }
+
+
+class SymbolIndex:
+    """Name to (address, kind) index over the functions and data variables of a BinaryView"""
+    
+    def __init__(self, bv, store=None):
+        self.bv = bv
+        self.store = store  # ViewStore to load the index from and write changes through to
+        self._lock = threading.RLock()
+        self._by_name = {}  # name -> {address: kind}
+        self._by_addr = {}  # address -> (name, kind)
+        self.build()
+    
+    def build(self):
+        """Rebuild the whole index from the persistent store or, failing that, the BinaryView"""
+        by_name = {}
+        stored = self.store.load('symbols') if self.store else None
+        if stored is not None:
+            by_addr = {addr: tuple(entry) for addr, entry in stored.items()}
+        else:
+            by_addr = self._scan()
+            if self.store:
+                self.store.save('symbols', {addr: list(entry) for addr, entry in by_addr.items()})
+        
+        for addr, (name, kind) in by_addr.items():
+            by_name.setdefault(name, {})[addr] = kind
+        
+        with self._lock:
+            self._by_name = by_name
+            self._by_addr = by_addr
+    
+    def _scan(self):
+        """Read {address: (name, kind)} for every function and data variable from the BinaryView"""
+        by_addr = {}
+        
+        for func in self.bv.functions:
+            by_addr[func.start] = (func.name, 'function')
+        
+        for var_addr in self.bv.data_vars:
+            if var_addr in by_addr:
+                continue
+            symbol = self.bv.get_symbol_at(var_addr)
+            if symbol:
+                by_addr[var_addr] = (symbol.name, 'data')
+        return by_addr
+    
+    def lookup(self, name):
+        """Return every (address, kind) candidate for a name, functions first"""
+        with self._lock:
+            candidates = list(self._by_name.get(name, {}).items())
+        candidates.sort(key=lambda item: (item[1] != 'function', item[0]))
+        return candidates
+    
+    def lookup_functions(self, name):
+        """Return every function named `name`, ordered by address"""
+        functions = []
+        for addr, kind in self.lookup(name):
+            if kind != 'function':
+                continue
+            func = self.bv.get_function_at(addr)
+            if func:
+                functions.append(func)
+        return functions
+    
+    def remove_address(self, addr):
+        """Drop whatever is indexed at an address"""
+        with self._lock:
+            self._remove(addr)
+            if self.store:
+                self.store.update('symbols', addr, None)
+    
+    def _remove(self, addr):
+        with self._lock:
+            entry = self._by_addr.pop(addr, None)
+            if entry is None:
+                return
+            name, _ = entry
+            addrs = self._by_name.get(name)
+            if addrs is not None:
+                addrs.pop(addr, None)
+                if not addrs:
+                    del self._by_name[name]
+    
+    def update_address(self, addr):
+        """Re-read the function or data variable at an address from the BinaryView"""
+        entry = None
+        func = self.bv.get_function_at(addr)
+        if func:
+            entry = (func.name, 'function')
+        elif self.bv.get_data_var_at(addr) is not None:
+            symbol = self.bv.get_symbol_at(addr)
+            if symbol:
+                entry = (symbol.name, 'data')
+        
+        with self._lock:
+            self._remove(addr)
+            if entry is not None:
+                name, kind = entry
+                self._by_addr[addr] = entry
+                self._by_name.setdefault(name, {})[addr] = kind
+            if self.store:
+                self.store.update('symbols', addr, list(entry) if entry else None)
+
+
+class DecompileCache:
+    """Byte-budgeted LRU of rendered decompilations keyed by function start and analysis generation
+    
+    Every function has a generation counter that is bumped whenever analysis,
+    a rename or a retype touches it, so stale renderings are never served.
+    Each rendering keeps the address of every line alongside its text (see
+    render_il_lines). With a ViewStore, misses fall through to it and
+    renderings are written through; invalidations delete the stored rows
+    under the same lock.
+    """
+    
+    def __init__(self, bv, max_bytes=64 * 1024 * 1024, store=None):
+        self.bv = bv
+        self.max_bytes = max_bytes
+        self.store = store
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (start, epoch, generation) -> (text, line addresses or None)
+        self._generations = {}  # start -> generation
+        self._epoch = 0  # Bumped to invalidate every function at once
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def generation(self, start):
+        """Current cache key for the function starting at `start`"""
+        with self._lock:
+            return (start, self._epoch, self._generations.get(start, 0))
+    
+    def get(self, key, count=True):
+        """Return the cached (or stored) text for a key, or None; count=False leaves the hit/miss stats alone"""
+        entry = self.get_lines(key, count, need_addresses=False)
+        return entry[0] if entry else None
+    
+    def get_lines(self, key, count=True, need_addresses=True):
+        """Return (text, line addresses) for a key, or None; a rendering stored without
+        addresses counts as missing unless need_addresses is False"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[1] is not None or not need_addresses):
+                self._entries.move_to_end(key)
+                self.hits += count
+                return entry
+            self.misses += count
+        
+        if self.store is None:
+            return None
+        value = self.store.get('hlil', key[0])
+        if value is None:
+            return None
+        # Stores written before line addresses were kept hold the bare text
+        entry = (value[0], line_addresses(value[1])) if isinstance(value, list) else (value, None)
+        if entry[1] is None and need_addresses:
+            return None
+        self._add(key, entry, persist=False)
+        return entry
+    
+    def put(self, key, text, addresses=None):
+        """Cache text rendered for `key`, unless the function changed while it was rendering"""
+        self._add(key, (text, addresses), persist=True)
+    
+    @staticmethod
+    def _size(entry):
+        text, addresses = entry
+        return sys.getsizeof(text) + (addresses.itemsize * len(addresses) if addresses is not None else 0)
+    
+    def _add(self, key, entry, persist):
+        size = self._size(entry)
+        with self._lock:
+            start, epoch, generation = key
+            if epoch != self._epoch or generation != self._generations.get(start, 0):
+                return
+            previous = self._entries.get(key)
+            if previous is not None:
+                if previous[1] is not None or entry[1] is None:
+                    return
+                # Replace a rendering that came without line addresses
+                del self._entries[key]
+                self.bytes -= self._size(previous)
+            if persist and self.store:
+                text, addresses = entry
+                self.store.put('hlil', start, [text, addresses.tolist()] if addresses is not None else text)
+            if size > self.max_bytes:
+                return
+            
+            self._entries[key] = entry
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= self._size(evicted)
+                self.evictions += 1
+    
+    def invalidate(self, start):
+        """Forget the rendering of the function starting at `start`"""
+        with self._lock:
+            generation = self._generations.get(start, 0)
+            self._generations[start] = generation + 1
+            entry = self._entries.pop((start, self._epoch, generation), None)
+            if entry is not None:
+                self.bytes -= self._size(entry)
+            if self.store:
+                self.store.delete('hlil', start)
+    
+    def invalidate_references(self, addr):
+        """Forget the function at `addr` and every function whose output names it"""
+        self.invalidate(addr)
+        for ref in self.bv.get_code_refs(addr):
+            if ref.function:
+                self.invalidate(ref.function.start)
+    
+    def invalidate_all(self):
+        """Forget every rendering, e.g. after a type change"""
+        with self._lock:
+            self._epoch += 1
+            self._generations.clear()
+            self._entries.clear()
+            self.bytes = 0
+            if self.store:
+                self.store.drop('hlil')
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None
+            }
+
+
+class ViewGeneration:
+    """Monotonic counter bumped on every analysis or user change to a BinaryView"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+        # Distinguishes counters across server restarts, which start again from 0
+        self.instance = uuid.uuid4().hex[:12]
+    
+    def bump(self):
+        with self._lock:
+            self.value += 1
+            return self.value
+    
+    def etag(self):
+        """Entity tag for responses computed at the current generation"""
+        return f'"{self.instance}-{self.value}"'
+
+
+class ChangeFeed:
+    """Bounded log of the changes behind each generation bump, for clients that sync incrementally
+    
+    Each event records the generation it produced. Repeats of the same change
+    (analysis updates one function many times in a row) collapse into the
+    newest. Once the buffer wraps, a client asking for changes since an
+    evicted generation is told it has to re-list instead.
+    """
+    
+    def __init__(self, generation, capacity=4096):
+        self.generation = generation
+        self._cond = threading.Condition()
+        self._events = deque(maxlen=capacity)  # (generation, kind, address, name)
+        self._evicted = 0  # Newest generation no longer in the buffer
+    
+    def record(self, kind=None, address=None, name=None):
+        """Bump the generation, logging the change that caused it if it has a kind"""
+        with self._cond:
+            generation = self.generation.bump()
+            if kind is None:
+                return generation
+            events = self._events
+            if events and events[-1][1:] == (kind, address, name):
+                events.pop()
+            elif len(events) == events.maxlen:
+                self._evicted = events[0][0]
+            events.append((generation, kind, address, name))
+            self._cond.notify_all()
+            return generation
+    
+    def since(self, generation, limit):
+        """(events after `generation`, at most `limit`; whether none were evicted; current generation)"""
+        with self._cond:
+            current = self.generation.value
+            complete = self._evicted <= generation <= current
+            start = len(self._events)
+            # Newest first until we reach the client's generation
+            while start and self._events[start - 1][0] > generation:
+                start -= 1
+            return list(islice(self._events, start, start + limit)), complete, current
+    
+    def wait(self, generation, timeout):
+        """Block until an event newer than `generation` is logged; False on timeout"""
+        with self._cond:
+            return self._cond.wait_for(lambda: bool(self._events) and self._events[-1][0] > generation, timeout)
+    
+    @staticmethod
+    def to_dict(event):
+        generation, kind, address, name = event
+        return {
+            'generation': generation,
+            'kind': kind,
+            'address': f"0x{address:x}" if address is not None else None,
+            'name': name
+        }
+
+
+def collect_listing(bv, kind):
+    """Materialize the items of a listing: functions, types, imports, exports or strings"""
+    if kind == 'functions':
+        return list(bv.functions)
+    if kind == 'types':
+        return list(bv.types.keys())
+    if kind == 'imports':
+        return list(bv.get_symbols_of_type(bn.SymbolType.ImportedFunctionSymbol))
+    if kind == 'exports':
+        return [
+            symbol
+            for symbol_type in (bn.SymbolType.FunctionSymbol, bn.SymbolType.DataSymbol)
+            for symbol in bv.get_symbols_of_type(symbol_type)
+            if symbol.binding == bn.SymbolBinding.GlobalBinding
+        ]
+    if kind == 'strings':
+        return list(bv.strings)
+    raise ValueError(f"Unknown listing '{kind}'")
+
+
+# Line address of HLIL lines that come from no instruction
+NO_LINE_ADDRESS = 0xFFFFFFFFFFFFFFFF
+
+
+def line_addresses(values):
+    """An array('Q') of line addresses; None (and -1, as older stores wrote it) become NO_LINE_ADDRESS"""
+    return array('Q', (NO_LINE_ADDRESS if value is None or value < 0 else value for value in values))
+
+
+def render_il(func):
+    """Render a function as HLIL, falling back to MLIL"""
+    return render_il_lines(func)[0]
+
+
+def render_il_lines(func):
+    """Render a function as HLIL, falling back to MLIL; returns (text, address of each line)
+    
+    Addresses are an array('Q') with one entry per line of the text,
+    NO_LINE_ADDRESS where a line has none (braces, declarations, the MLIL
+    fallback).
+    """
+    # Use HLIL (High Level IL) as decompiled output, one line per DisassemblyTextLine
+    hlil = func.hlil
+    if hlil:
+        root = getattr(hlil, 'root', None)
+        if root is None:
+            text = str(hlil)
+            return text, array('Q', [NO_LINE_ADDRESS]) * (text.count('\n') + 1)
+        lines = list(root.lines)
+        text = '\n'.join(str(line) for line in lines)
+        addresses = line_addresses(line.address for line in lines)
+        if text.count('\n') + 1 != len(addresses):
+            addresses = array('Q', [NO_LINE_ADDRESS]) * (text.count('\n') + 1)
+        return text, addresses
+    
+    decompiled = "// HLIL not available for this function\n"
+    # Fall back to MLIL
+    mlil = func.mlil
+    if mlil:
+        decompiled += str(mlil)
+    else:
+        decompiled += "// No intermediate representation available"
+    return decompiled, array('Q', [NO_LINE_ADDRESS]) * (decompiled.count('\n') + 1)
+
+
+class CursorExpired(Exception):
+    """The snapshot a listing cursor points into has been discarded"""
+
+
+class ListingSnapshots:
+    """Point-in-time copies of the listing endpoints, so pages are served by cursor in O(limit)
+    
+    A snapshot is taken once per listing and listing generation, which only
+    changes() moves: re-analysis of a function or a data variable leaves
+    every listing as it was, so it doesn't cost a new O(N) copy. Offset
+    requests and cursors both slice into the snapshot. Cursors keep
+    resolving against their own snapshot after the generation moves on,
+    until it is evicted.
+    With a ViewStore, listings are saved already formatted and the first
+    snapshot after a restart is read back from it.
+    """
+    
+    # How each listing renders one item; items are formatted only when paged out
+    FORMATTERS = {
+        'functions': lambda func: func.name,
+        'types': lambda name: str(name),
+        'imports': lambda symbol: symbol.name,
+        'exports': lambda symbol: symbol.name,
+        'strings': lambda string: f"0x{string.start:x}: {string.value}"
+    }
+    # ChangeFeed kinds that can't change what any listing contains
+    UNLISTED_CHANGES = ('function_updated', 'data_var_added', 'data_var_removed', 'data_var_updated')
+    
+    def __init__(self, bv, generation, max_snapshots=16, store=None):
+        self.bv = bv
+        self.generation = generation  # The view's, reported with each page
+        self.listing_generation = ViewGeneration()  # Keys the snapshots
+        self.max_snapshots = max_snapshots
+        self.store = store
+        self._lock = threading.Lock()
+        self._build_locks = {kind: threading.Lock() for kind in self.FORMATTERS}
+        self._snapshots = OrderedDict()  # snapshot id -> (kind, generation, items, formatter or None if formatted)
+        self._current = {}  # (kind, listing generation) -> snapshot id
+    
+    def changed(self, kind=None):
+        """Note a change to the view (a ChangeFeed kind, None if unknown); new snapshots are taken if it matters"""
+        if kind not in self.UNLISTED_CHANGES:
+            self.listing_generation.bump()
+    
+    def _snapshot(self, kind):
+        """Return (snapshot id, items, formatter) for the current listing generation, taking it if needed"""
+        generation = self.listing_generation.value
+        with self._build_locks[kind]:
+            with self._lock:
+                snapshot_id = self._current.get((kind, generation))
+                if snapshot_id in self._snapshots:
+                    self._snapshots.move_to_end(snapshot_id)
+                    _, _, items, formatter = self._snapshots[snapshot_id]
+                    return snapshot_id, items, formatter
+            
+            stored = self.store.load(f'listing:{kind}') if self.store else None
+            if stored is not None:
+                items, formatter = stored[0], None
+            else:
+                items, formatter = collect_listing(self.bv, kind), self.FORMATTERS[kind]
+                if self.store and self.store.writable:
+                    threading.Thread(
+                        target=self._save,
+                        args=(kind, generation, items),
+                        name=f"BinaryNinjaMCP-save-{kind}",
+                        daemon=True
+                    ).start()
+            snapshot_id = uuid.uuid4().hex[:16]
+            with self._lock:
+                self._snapshots[snapshot_id] = (kind, generation, items, formatter)
+                self._current[(kind, generation)] = snapshot_id
+                while len(self._snapshots) > self.max_snapshots:
+                    old_id, (old_kind, old_generation, _, _) = self._snapshots.popitem(last=False)
+                    if self._current.get((old_kind, old_generation)) == old_id:
+                        del self._current[(old_kind, old_generation)]
+            return snapshot_id, items, formatter
+    
+    def _save(self, kind, generation, items):
+        """Format a whole listing and store it, unless the view changed in the meantime"""
+        try:
+            lines = list(map(self.FORMATTERS[kind], items))
+            self.store.save(f'listing:{kind}', {0: lines}, valid=lambda: self.listing_generation.value == generation)
+        except Exception as e:
+            bn.log_error(f"BinaryNinjaMCP: Failed to store the {kind} listing: {str(e)}")
+    
+    @staticmethod
+    def _encode_cursor(snapshot_id, generation, position):
+        raw = json.dumps([snapshot_id, generation, position]).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+    
+    @staticmethod
+    def _decode_cursor(cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            snapshot_id, generation, position = json.loads(raw)
+            return str(snapshot_id), int(generation), int(position)
+        except (ValueError, TypeError):
+            raise ValueError('Invalid cursor')
+    
+    def page(self, kind, offset=0, limit=100, cursor=None):
+        """Return (lazy lines, total, next cursor or None, generation) for one page of a listing"""
+        if cursor:
+            snapshot_id, generation, offset = self._decode_cursor(cursor)
+            with self._lock:
+                snapshot = self._snapshots.get(snapshot_id)
+                if snapshot:
+                    self._snapshots.move_to_end(snapshot_id)
+            if not snapshot:
+                raise CursorExpired('Cursor expired, restart the listing without a cursor')
+            snapshot_kind, generation, items, formatter = snapshot
+            if snapshot_kind != kind:
+                raise ValueError(f"Cursor belongs to the {snapshot_kind} listing")
+        else:
+            generation = self.generation.value
+            snapshot_id, items, formatter = self._snapshot(kind)
+        
+        offset = max(offset, 0)
+        page = items[offset:offset + max(limit, 0)]
+        lines = map(formatter, page) if formatter else iter(page)
+        
+        end = offset + len(page)
+        next_cursor = self._encode_cursor(snapshot_id, generation, end) if end < len(items) else None
+        return lines, len(items), next_cursor, generation
+
+
+class BackgroundIndex:
+    """Base for indexes built lazily on a background thread, then updated incrementally
+    
+    Changes reported while the build is running are queued and replayed once
+    it finishes; changes before the first build are dropped since the build
+    will see them anyway.
+    """
+    
+    description = 'index'  # For thread names and log messages
+    
+    def __init__(self, bv):
+        self.bv = bv
+        self._lock = threading.RLock()
+        self._built = threading.Event()
+        self._build_thread = None
+        self._pending = []  # Changes seen while building, replayed afterwards
+    
+    @property
+    def ready(self):
+        return self._built.is_set()
+    
+    def ensure_built(self, timeout):
+        """Start building on first use; return True once the index is ready"""
+        with self._lock:
+            if self._build_thread is None:
+                self._build_thread = threading.Thread(
+                    target=self._build,
+                    name=f"BinaryNinjaMCP-{self.description.replace(' ', '-')}",
+                    daemon=True
+                )
+                self._build_thread.start()
+        return self._built.wait(max(timeout, 0))
+    
+    def _build(self):
+        try:
+            count = self._populate()
+            with self._lock:
+                pending, self._pending = self._pending, None
+                for change in pending:
+                    change()
+            bn.log_info(f"BinaryNinjaMCP: {self.description.capitalize()} built ({count} entries)")
+        except Exception as e:
+            bn.log_error(f"BinaryNinjaMCP: Failed to build {self.description}: {str(e)}")
+            with self._lock:
+                self._pending = None
+        finally:
+            self._built.set()
+    
+    def _populate(self):
+        """Fill the index from the BinaryView; returns the number of entries"""
+        raise NotImplementedError
+    
+    def _after_change(self):
+        """Hook run after each incremental change, under the lock"""
+    
+    def _apply(self, change):
+        """Run a change now, or after the build if one is in progress; False if not built yet"""
+        with self._lock:
+            if self._build_thread is None:
+                return False  # The build will see the change
+            if self._pending is not None:
+                self._pending.append(change)
+                return True
+            change()
+            self._after_change()
+            return True
+
+
+class SearchIndex(BackgroundIndex):
+    """Trigram and prefix index over function, import, export, type and string names
+    
+    A changed document gets a new id and the old one is tombstoned; postings
+    are compacted once tombstones pile up.
+    """
+    
+    description = 'search index'
+    
+    KINDS = ('functions', 'imports', 'exports', 'types', 'strings')
+    MODES = ('substring', 'prefix', 'regex')
+    
+    # Matches collected per query before ranking; more than this marks the result truncated
+    MAX_MATCHES = 10000
+    
+    def __init__(self, bv):
+        super().__init__(bv)
+        self._reset()
+    
+    def _reset(self):
+        self._docs = {}  # doc id -> (kind, key, text, address)
+        self._keys = {}  # (kind, key) -> doc id
+        self._trigrams = {}  # trigram -> array of doc ids
+        self._prefixes = []  # sorted [(lowercased text, doc id)]
+        self._dead = set()  # Tombstoned doc ids still present in postings
+        self._next_id = 0
+    
+    # Building and updating
+    
+    def _populate(self):
+        documents = []
+        for func in self.bv.functions:
+            documents.append(('functions', func.start, func.name, func.start))
+        for symbol in self.bv.get_symbols_of_type(bn.SymbolType.ImportedFunctionSymbol):
+            documents.append(('imports', symbol.address, symbol.name, symbol.address))
+        for symbol_type in (bn.SymbolType.FunctionSymbol, bn.SymbolType.DataSymbol):
+            for symbol in self.bv.get_symbols_of_type(symbol_type):
+                if symbol.binding == bn.SymbolBinding.GlobalBinding:
+                    documents.append(('exports', symbol.address, symbol.name, symbol.address))
+        for name in self.bv.types.keys():
+            documents.append(('types', str(name), str(name), None))
+        for string in self.bv.strings:
+            documents.append(('strings', string.start, string.value, string.start))
+        
+        with self._lock:
+            for kind, key, text, address in documents:
+                self._add(kind, key, text, address)
+            self._prefixes.sort()
+        return len(documents)
+    
+    def _add(self, kind, key, text, address, sort=False):
+        doc_id = self._next_id
+        self._next_id += 1
+        self._docs[doc_id] = (kind, key, text, address)
+        self._keys[(kind, key)] = doc_id
+        lowered = text.lower()
+        for trigram in {lowered[i:i + 3] for i in range(len(lowered) - 2)}:
+            postings = self._trigrams.get(trigram)
+            if postings is None:
+                postings = self._trigrams[trigram] = array('I')
+            postings.append(doc_id)
+        if sort:
+            bisect.insort(self._prefixes, (lowered, doc_id))
+        else:
+            self._prefixes.append((lowered, doc_id))
+    
+    def _remove(self, kind, key):
+        doc_id = self._keys.pop((kind, key), None)
+        if doc_id is not None:
+            del self._docs[doc_id]
+            self._dead.add(doc_id)
+    
+    def _after_change(self):
+        """Rebuild postings from live documents once tombstones outnumber a quarter of them"""
+        if not self._dead or len(self._dead) * 4 < len(self._docs):
+            return
+        documents = list(self._docs.values())
+        self._reset()
+        for kind, key, text, address in documents:
+            self._add(kind, key, text, address)
+        self._prefixes.sort()
+    
+    def _set(self, kind, key, text, address):
+        existing = self._keys.get((kind, key))
+        if existing is not None and self._docs[existing][2] == text:
+            return
+        self._remove(kind, key)
+        if text is not None:
+            self._add(kind, key, text, address, sort=True)
+    
+    def update_address(self, addr):
+        """Refresh the function, import and export names at an address"""
+        def change():
+            func = self.bv.get_function_at(addr)
+            self._set('functions', addr, func.name if func else None, addr)
+            symbol = self.bv.get_symbol_at(addr)
+            is_import = symbol is not None and symbol.type == bn.SymbolType.ImportedFunctionSymbol
+            is_export = (
+                symbol is not None
+                and symbol.type in (bn.SymbolType.FunctionSymbol, bn.SymbolType.DataSymbol)
+                and symbol.binding == bn.SymbolBinding.GlobalBinding
+            )
+            self._set('imports', addr, symbol.name if is_import else None, addr)
+            self._set('exports', addr, symbol.name if is_export else None, addr)
+        self._apply(change)
+    
+    def update_type(self, name, defined):
+        name = str(name)
+        self._apply(lambda: self._set('types', name, name if defined else None, None))
+    
+    def update_string(self, addr, found):
+        def change():
+            string = self.bv.get_string_at(addr) if found else None
+            self._set('strings', addr, string.value if string else None, addr)
+        self._apply(change)
+    
+    # Querying
+    
+    @staticmethod
+    def _required_literal(pattern):
+        """Longest literal every match of a regex must contain, or '' if none is certain"""
+        runs = []
+        current = ''
+        depth = 0
+        i = 0
+        while i < len(pattern):
+            char = pattern[i]
+            if char == '\\':
+                runs.append(current)
+                current = ''
+                i += 2
+                continue
+            if char == '[':
+                runs.append(current)
+                current = ''
+                # Skip the class: a ']' right after '[' or '[^' is a member, and '\]' doesn't close it
+                i += 1
+                if pattern.startswith('^', i):
+                    i += 1
+                if pattern.startswith(']', i):
+                    i += 1
+                while i < len(pattern) and pattern[i] != ']':
+                    i += 2 if pattern[i] == '\\' else 1
+                i += 1
+                continue
+            if char == '|' and depth == 0:
+                return ''
+            if char in '()':
+                depth += 1 if char == '(' else -1
+                runs.append(current)
+                current = ''
+            elif depth == 0 and char in '?*{':
+                # The preceding character is optional
+                runs.append(current[:-1])
+                current = ''
+                if char == '{':
+                    close = pattern.find('}', i)
+                    i = len(pattern) if close < 0 else close + 1
+                    continue
+            elif depth == 0 and char not in '.^$+':
+                current += char
+            else:
+                runs.append(current)
+                current = ''
+            i += 1
+        runs.append(current)
+        return max(runs, key=len)
+    
+    def _candidates(self, literal):
+        """Doc ids that may contain `literal` (lowercased), or None if every doc must be checked"""
+        if len(literal) < 3:
+            return None
+        postings = [self._trigrams.get(literal[i:i + 3]) for i in range(len(literal) - 2)]
+        if any(p is None for p in postings):
+            return []
+        return min(postings, key=len)
+    
+    def search(self, query, mode='substring', kinds=None, case_sensitive=False, time_limit=2.0):
+        """Return (ranked matches, truncated) where each match is (kind, text, address)"""
+        deadline = time.monotonic() + time_limit
+        kinds = set(kinds or self.KINDS)
+        lowered = query.lower()
+        
+        if mode == 'regex':
+            matcher = re.compile(query, 0 if case_sensitive else re.IGNORECASE)
+            literal = self._required_literal(query).lower()
+        else:
+            literal = lowered
+        
+        with self._lock:
+            if mode == 'prefix':
+                candidates = self._with_prefix(lowered)
+            else:
+                candidates = self._candidates(literal)
+                if candidates is None:
+                    candidates = list(self._docs)
+                else:
+                    candidates = list(candidates)
+            docs = self._docs
+        
+        matches = []
+        truncated = False
+        for count, doc_id in enumerate(candidates):
+            if count % 256 == 0 and time.monotonic() > deadline:
+                truncated = True
+                break
+            doc = docs.get(doc_id)
+            if doc is None or doc[0] not in kinds:
+                continue
+            kind, _, text, address = doc
+            if mode == 'regex':
+                match = matcher.search(text)
+                if not match:
+                    continue
+                rank = (match.start(), len(text), text)
+            else:
+                haystack = text if case_sensitive else text.lower()
+                needle = query if case_sensitive else lowered
+                position = haystack.find(needle)
+                if position < 0 or (mode == 'prefix' and position != 0):
+                    continue
+                if haystack == needle:
+                    quality = 0
+                elif position == 0:
+                    quality = 1
+                elif not haystack[position - 1].isalnum():
+                    quality = 2  # Starts at a word boundary
+                else:
+                    quality = 3
+                rank = (quality, len(text), text)
+            matches.append((rank, kind, text, address))
+            if len(matches) >= self.MAX_MATCHES:
+                truncated = True
+                break
+        
+        matches.sort(key=lambda match: match[0])
+        return [(kind, text, address) for _, kind, text, address in matches], truncated
+    
+    def _with_prefix(self, prefix):
+        """Doc ids whose lowercased text starts with `prefix`, from the sorted prefix list"""
+        doc_ids = []
+        prefixes = self._prefixes
+        for i in range(bisect.bisect_left(prefixes, (prefix, -1)), len(prefixes)):
+            text, doc_id = prefixes[i]
+            if not text.startswith(prefix):
+                break
+            doc_ids.append(doc_id)
+        return doc_ids
+
+
+class CallGraph(BackgroundIndex):
+    """Caller/callee adjacency with call-site addresses for every function
+    
+    Nodes are addresses: function starts, plus call targets that aren't
+    functions (e.g. import address table entries).
+    """
+    
+    description = 'call graph'
+    
+    def __init__(self, bv, store=None):
+        super().__init__(bv)
+        self.store = store  # ViewStore to load the edges from and write changes through to
+        self._callees = {}  # caller start -> {callee address: [call site addresses]}
+        self._callers = {}  # callee address -> {caller start: [call site addresses]}
+    
+    def _edges_of(self, func):
+        edges = {}
+        for site in func.call_sites:
+            for callee in self.bv.get_callees(site.address, func):
+                edges.setdefault(callee, []).append(site.address)
+        return edges
+    
+    def _set_edges(self, start, edges):
+        for callee in self._callees.pop(start, {}):
+            callers = self._callers.get(callee)
+            if callers is not None:
+                callers.pop(start, None)
+                if not callers:
+                    del self._callers[callee]
+        if edges:
+            self._callees[start] = edges
+            for callee, sites in edges.items():
+                self._callers.setdefault(callee, {})[start] = sites
+    
+    def _populate(self):
+        stored = self.store.load('calls') if self.store else None
+        if stored is not None:
+            edges = [(start, {callee: sites for callee, sites in outgoing}) for start, outgoing in stored.items()]
+        else:
+            edges = [(func.start, self._edges_of(func)) for func in self.bv.functions]
+        with self._lock:
+            for start, outgoing in edges:
+                self._set_edges(start, outgoing)
+        if stored is None and self.store:
+            self.store.save('calls', {start: list(outgoing.items()) for start, outgoing in edges if outgoing})
+        return len(edges)
+    
+    def _change_edges(self, start, edges):
+        self._set_edges(start, edges)
+        if self.store:
+            self.store.update('calls', start, list(edges.items()) if edges else None)
+    
+    def update_function(self, func):
+        """Recompute the outgoing edges of a re-analyzed function"""
+        start = func.start
+        if not self._apply(lambda: self._change_edges(start, self._edges_of(func))):
+            # Not built yet, but the build would load these edges from the store
+            if self.store and self.store.has('calls'):
+                self.store.update('calls', start, list(self._edges_of(func).items()) or None)
+    
+    def remove_function(self, start):
+        if not self._apply(lambda: self._change_edges(start, {})) and self.store:
+            self.store.update('calls', start, None)
+    
+    def neighbors(self, addr, direction):
+        """{neighbor address: [call sites]} for callers or callees of an address"""
+        adjacency = self._callers if direction == 'callers' else self._callees
+        with self._lock:
+            return {other: list(sites) for other, sites in adjacency.get(addr, {}).items()}
+    
+    def walk(self, roots, direction, depth, max_nodes, max_edges):
+        """Breadth-first walk up to `depth` hops; returns (nodes {addr: hops}, edges, truncated)"""
+        adjacency = self._callers if direction == 'callers' else self._callees
+        nodes = {root: 0 for root in roots}
+        edges = []
+        frontier = deque(roots)
+        truncated = False
+        with self._lock:
+            while frontier:
+                addr = frontier.popleft()
+                hops = nodes[addr]
+                if hops >= depth:
+                    continue
+                for other, sites in adjacency.get(addr, {}).items():
+                    if other not in nodes:
+                        if len(nodes) >= max_nodes:
+                            truncated = True
+                            continue
+                        nodes[other] = hops + 1
+                        frontier.append(other)
+                    if len(edges) >= max_edges:
+                        truncated = True
+                        continue
+                    caller, callee = (other, addr) if direction == 'callers' else (addr, other)
+                    edges.append((caller, callee, list(sites)))
+        return nodes, edges, truncated
+    
+    def paths(self, sources, targets, max_depth, max_paths):
+        """Shortest call paths from any source to any target; returns (paths, truncated)"""
+        targets = set(targets)
+        parents = {source: [] for source in sources}
+        frontier = list(sources)
+        found = [addr for addr in frontier if addr in targets]
+        with self._lock:
+            for _ in range(max_depth):
+                if found or not frontier:
+                    break
+                next_frontier = []
+                level = {}
+                for addr in frontier:
+                    for callee in self._callees.get(addr, {}):
+                        if callee in parents:
+                            continue
+                        if callee not in level:
+                            level[callee] = []
+                            next_frontier.append(callee)
+                        level[callee].append(addr)
+                parents.update(level)
+                frontier = next_frontier
+                found = [addr for addr in frontier if addr in targets]
+        
+        # Walk parent links back from each target reached, capping the number of paths
+        paths = []
+        truncated = False
+        stack = [(addr, [addr]) for addr in found]
+        while stack:
+            addr, path = stack.pop()
+            if not parents[addr]:
+                if len(paths) >= max_paths:
+                    truncated = True
+                    break
+                paths.append(path[::-1])
+                continue
+            for parent in parents[addr]:
+                stack.append((parent, path + [parent]))
+        return paths, truncated
+
+
+class SimilarityIndex(BackgroundIndex):
+    """MinHash signatures of every function, for finding near-duplicates within and across binaries
+    
+    A function's features are the imports it calls, the integer constants
+    in its instructions, the strings it references and the shape of its
+    control flow graph. Local callees only count as 'local' so signatures
+    don't depend on names. Features are hashed with a stable hash into
+    BINS values (one permutation hashing), kept in one array of BINS
+    entries per function and bucketed by BANDS bands of the signature for
+    candidate lookup. Signatures from another binary, or another Binary
+    Ninja instance, compare directly.
+    """
+    
+    description = 'similarity index'
+    
+    BINS = 64
+    BANDS = 16  # Of BINS // BANDS rows each: pairs above ~0.5 similarity share a band
+    # Bands this common hold only features most functions have; lookups skip them
+    MAX_BUCKET = 256
+    EMPTY = 0xFFFFFFFF
+    # Functions with fewer features (thunks, stubs) match too much to be useful
+    MIN_FEATURES = 4
+    # Constants this small are loop bounds, flags and offsets, common to everything
+    MIN_CONSTANT = 0x100
+    IMPORT_SYMBOLS = ('ImportedFunctionSymbol', 'ImportAddressSymbol', 'ExternalSymbol')
+    
+    def __init__(self, bv, call_graph):
+        super().__init__(bv)
+        self.call_graph = call_graph
+        self._signatures = array('I')  # BINS values per row
+        self._rows = {}  # function start -> row
+        self._free_rows = []
+        self._buckets = [{} for _ in range(self.BANDS)]  # band values -> {function start}
+        self._strings = {}  # function start -> strings it references, collected once by the build
+    
+    @classmethod
+    def signature(cls, features):
+        """Signature of a feature set, as a list of BINS values"""
+        bins = [cls.EMPTY] * cls.BINS
+        for feature in features:
+            digest = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+            slot = digest % cls.BINS
+            value = digest >> 32
+            if value < bins[slot]:
+                bins[slot] = value
+        # Fill empty bins from the next filled one, offset by the distance, so every bin compares
+        filled = [i for i, value in enumerate(bins) if value != cls.EMPTY]
+        if filled and len(filled) < cls.BINS:
+            signature = list(bins)
+            for i in range(cls.BINS):
+                if bins[i] == cls.EMPTY:
+                    distance = next(d for d in range(1, cls.BINS) if bins[(i + d) % cls.BINS] != cls.EMPTY)
+                    signature[i] = (bins[(i + distance) % cls.BINS] + distance * 0x9E3779B1) & 0xFFFFFFFE
+            return signature
+        return bins
+    
+    @classmethod
+    def similarity(cls, a, b):
+        """Estimated Jaccard similarity of the feature sets behind two signatures"""
+        return sum(map(operator.eq, a, b)) / cls.BINS
+    
+    def _features(self, func):
+        features = []
+        
+        # Import callees by name, other callees anonymously; repeats count
+        calls = {}
+        for callee in self.call_graph.neighbors(func.start, 'callees'):
+            symbol = self.bv.get_symbol_at(callee)
+            if symbol is not None and symbol.type.name in self.IMPORT_SYMBOLS:
+                name = symbol.name
+            else:
+                name = 'local'
+            calls[name] = calls.get(name, 0) + 1
+        features += [f"call:{name}#{i}" for name, count in calls.items() for i in range(count)]
+        
+        constants = set()
+        for tokens, _ in func.instructions:
+            for token in tokens:
+                # Addresses inside the binary move between builds, so they aren't features
+                if (token.type == bn.InstructionTextTokenType.IntegerToken and token.value >= self.MIN_CONSTANT
+                        and not self.bv.start <= token.value < self.bv.end):
+                    constants.add(token.value)
+        features += [f"const:{value:x}" for value in constants]
+        
+        features += [f"str:{value}" for value in self._strings.get(func.start, ())]
+        
+        blocks = list(func.basic_blocks)
+        edges = sum(len(block.outgoing_edges) for block in blocks)
+        instructions = sum(block.instruction_count for block in blocks)
+        features.append(f"cfg:{len(blocks)}:{edges}")
+        features.append(f"size:{instructions.bit_length()}")
+        shapes = {}
+        for block in blocks:
+            shape = f"{len(block.outgoing_edges)}:{block.instruction_count.bit_length()}"
+            shapes[shape] = shapes.get(shape, 0) + 1
+        features += [f"block:{shape}#{i}" for shape, count in shapes.items() for i in range(count)]
+        return features
+    
+    def _set_signature(self, start, signature):
+        """Store or replace (None: drop) a function's signature; call with the lock held"""
+        row = self._rows.pop(start, None)
+        if row is not None:
+            old = self._signatures[row * self.BINS:(row + 1) * self.BINS]
+            for band, key in enumerate(self._band_keys(old)):
+                members = self._buckets[band].get(key)
+                if members is not None:
+                    members.discard(start)
+                    if not members:
+                        del self._buckets[band][key]
+            self._free_rows.append(row)
+        if signature is None:
+            return
+        
+        if self._free_rows:
+            row = self._free_rows.pop()
+            self._signatures[row * self.BINS:(row + 1) * self.BINS] = array('I', signature)
+        else:
+            row = len(self._signatures) // self.BINS
+            self._signatures.extend(signature)
+        self._rows[start] = row
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(key, set()).add(start)
+    
+    def _band_keys(self, signature):
+        rows = self.BINS // self.BANDS
+        return [tuple(signature[band * rows:(band + 1) * rows]) for band in range(self.BANDS)]
+    
+    def _signature_of(self, func):
+        features = self._features(func)
+        return self.signature(features) if len(features) >= self.MIN_FEATURES else None
+    
+    def _populate(self):
+        while not self.call_graph.ensure_built(60.0):
+            pass
+        strings = {}
+        for string in self.bv.strings:
+            for ref in self.bv.get_code_refs(string.start):
+                if ref.function:
+                    strings.setdefault(ref.function.start, []).append(string.value)
+        self._strings = strings  # Changes are queued until the build ends, so nothing else reads it yet
+        signatures = [(func.start, self._signature_of(func)) for func in self.bv.functions]
+        with self._lock:
+            for start, signature in signatures:
+                self._set_signature(start, signature)
+            return len(self._rows)
+    
+    def update_function(self, func):
+        """Recompute the signature of a re-analyzed function (its strings are the ones the build saw)"""
+        self._apply(lambda: self._set_signature(func.start, self._signature_of(func)))
+    
+    def remove_function(self, start):
+        self._apply(lambda: self._set_signature(start, None))
+    
+    def get(self, start):
+        """The signature of a function, or None if it has too few features"""
+        with self._lock:
+            row = self._rows.get(start)
+            return self._signatures[row * self.BINS:(row + 1) * self.BINS] if row is not None else None
+    
+    def similar(self, signature, threshold, limit, exclude=None):
+        """[(similarity, start)] of the functions whose signatures are at least `threshold` alike, best first"""
+        with self._lock:
+            buckets = [self._buckets[band].get(key, ()) for band, key in enumerate(self._band_keys(signature))]
+            candidates = set()
+            for members in buckets:
+                if len(members) <= self.MAX_BUCKET:
+                    candidates.update(members)
+            if not candidates:
+                candidates.update(min(buckets, key=len))
+            candidates.discard(exclude)
+            scored = []
+            for start in candidates:
+                row = self._rows[start]
+                score = self.similarity(signature, self._signatures[row * self.BINS:(row + 1) * self.BINS])
+                if score >= threshold:
+                    scored.append((score, start))
+        return heapq.nlargest(limit, scored)
+    
+    def export(self):
+        """[(start, signature bytes, little-endian uint32)] of every indexed function"""
+        with self._lock:
+            rows = sorted(self._rows.items())
+            signatures = array('I', self._signatures)
+        if sys.byteorder == 'big':
+            signatures.byteswap()
+        size = self.BINS * signatures.itemsize
+        raw = signatures.tobytes()
+        return [(start, raw[row * size:(row + 1) * size]) for start, row in rows]
+    
+    @classmethod
+    def decode(cls, raw):
+        """A signature from export()'s bytes"""
+        signature = array('I')
+        signature.frombytes(raw)
+        if sys.byteorder == 'big':
+            signature.byteswap()
+        if len(signature) != cls.BINS:
+            raise ValueError(f"Signatures must have {cls.BINS} values")
+        return signature
+
+
+def npy_bytes(values, typecode, descr):
+    """Serialize a 1-D array.array as a NumPy .npy file (format 1.0, little-endian)"""
+    data = array(typecode, values)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': ({len(data)},), }}"
+    # Magic, version and length take 10 bytes; pad the header so the data starts 64-byte aligned
+    header += ' ' * (-(10 + len(header) + 1) % 64) + '\n'
+    return b'\x93NUMPY\x01\x00' + len(header).to_bytes(2, 'little') + header.encode('latin1') + data.tobytes()
+
+
+class FunctionTable:
+    """Per-function metadata as columns, computed on a background thread for the newest generation asked for
+    
+    One build runs at a time, under the view's read lock. Requests for a
+    newer generation than the table's wait a little for it, then get the most
+    recent finished table (or nothing yet); when a build ends and a newer
+    generation has been asked for meanwhile, the next build starts. The
+    encoded forms of a table are cached with it.
+    """
+    
+    # (column, array typecode, NumPy dtype); names are sent separately
+    NUMERIC_COLUMNS = (
+        ('address', 'Q', '<u8'),
+        ('size', 'Q', '<u8'),
+        ('blocks', 'I', '<u4'),
+        ('instructions', 'I', '<u4'),
+        ('complexity', 'I', '<u4'),
+        ('in_degree', 'I', '<u4'),
+        ('out_degree', 'I', '<u4'),
+    )
+    
+    def __init__(self, bv, generation, call_graph, view_lock):
+        self.bv = bv
+        self.generation = generation
+        self.call_graph = call_graph
+        self.view_lock = view_lock  # ReadWriteLock of the view, read-held while walking its functions
+        self._lock = threading.Lock()
+        self._table = None  # (generation, {column: list}, {format: encoded bytes})
+        self._requested = -1  # Newest generation a request asked for
+        self._done = None  # Event set when the running build ends, None if none is running
+    
+    def get(self, timeout):
+        """Return (generation, columns, encodings) of the freshest table, building one for the
+        current generation if needed; None if there has never been one"""
+        generation = self.generation.value
+        with self._lock:
+            if self._table and self._table[0] == generation:
+                return self._table
+            self._requested = max(self._requested, generation)
+            if self._done is None:
+                self._done = threading.Event()
+                threading.Thread(target=self._run, name='BinaryNinjaMCP-function-table', daemon=True).start()
+            done = self._done
+        done.wait(max(timeout, 0))
+        with self._lock:
+            return self._table
+    
+    def _run(self):
+        """Build until the table is at least as new as every request so far"""
+        while True:
+            generation = self._build()
+            with self._lock:
+                done = self._done
+                if generation is None or generation >= self._requested:
+                    self._done = None
+                    done.set()
+                    return
+                self._done = threading.Event()
+            done.set()  # Waiters for this round get its table; later ones wait for the next
+    
+    def _build(self):
+        """Compute the table for the current generation; returns that generation, or None on failure"""
+        try:
+            while not self.call_graph.ensure_built(60.0):
+                pass
+            columns = {name: [] for name, _, _ in self.NUMERIC_COLUMNS}
+            columns['name'] = []
+            with self.view_lock.read():
+                # Read under the lock, so edits made while walking count as newer
+                generation = self.generation.value
+                for func in self.bv.functions:
+                    blocks = list(getattr(func, 'basic_blocks', None) or ())
+                    edges = sum(len(block.outgoing_edges) for block in blocks)
+                    columns['address'].append(func.start)
+                    columns['size'].append(getattr(func, 'total_bytes', 0) or 0)
+                    columns['blocks'].append(len(blocks))
+                    columns['instructions'].append(sum(block.instruction_count for block in blocks))
+                    # Cyclomatic complexity of the control flow graph
+                    columns['complexity'].append(max(edges - len(blocks) + 2, 1) if blocks else 0)
+                    columns['in_degree'].append(len(self.call_graph.neighbors(func.start, 'callers')))
+                    columns['out_degree'].append(len(self.call_graph.neighbors(func.start, 'callees')))
+                    columns['name'].append(func.name)
+            with self._lock:
+                if not self._table or self._table[0] < generation:
+                    self._table = (generation, columns, {})
+            bn.log_info(f"BinaryNinjaMCP: Function table built ({len(columns['name'])} functions)")
+            return generation
+        except Exception as e:
+            bn.log_error(f"BinaryNinjaMCP: Failed to build the function table: {str(e)}")
+            return None
+    
+    @classmethod
+    def encode(cls, table, fmt):
+        """The table as JSON, .npz or Arrow IPC stream bytes, cached per table"""
+        generation, columns, encodings = table
+        if fmt in encodings:
+            return encodings[fmt]
+        if fmt == 'json':
+            body = json.dumps({'count': len(columns['name']), 'generation': generation, 'columns': columns})
+            encoded = body.encode('utf-8')
+        elif fmt == 'npz':
+            names = [name.encode('utf-8') for name in columns['name']]
+            offsets = [0]
+            for name in names:
+                offsets.append(offsets[-1] + len(name))
+            members = [(name, npy_bytes(columns[name], typecode, descr)) for name, typecode, descr in cls.NUMERIC_COLUMNS]
+            members.append(('name_offsets', npy_bytes(offsets, 'Q', '<u8')))
+            members.append(('name_data', npy_bytes(b''.join(names), 'B', '|u1')))
+            buffer = io.BytesIO()
+            # Stored, not deflated: the HTTP layer compresses per Accept-Encoding
+            with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as archive:
+                for name, data in members:
+                    archive.writestr(f"{name}.npy", data)
+            encoded = buffer.getvalue()
+        else:
+            sink = pyarrow.BufferOutputStream()
+            arrays = {
+                name: pyarrow.array(columns[name], pyarrow.uint64() if typecode == 'Q' else pyarrow.uint32())
+                for name, typecode, _ in cls.NUMERIC_COLUMNS
+            }
+            arrays['name'] = pyarrow.array(columns['name'], pyarrow.string())
+            arrow_table = pyarrow.table(arrays)
+            with pyarrow.ipc.new_stream(sink, arrow_table.schema) as writer:
+                writer.write_table(arrow_table)
+            encoded = sink.getvalue().to_pybytes()
+        encodings[fmt] = encoded
+        return encoded
+
+
+class MCPViewNotification(bn.BinaryDataNotification):
+    """Keeps the plugin's indexes and caches in sync with Binary Ninja analysis and symbol changes"""
+    
+    def __init__(self, index, decompile_cache, changes, listings, search_index, call_graph, similarity_index, store=None):
+        super().__init__()
+        self.index = index
+        self.decompile_cache = decompile_cache
+        self.changes = changes
+        self.listings = listings
+        self.search_index = search_index
+        self.call_graph = call_graph
+        self.similarity_index = similarity_index
+        self.store = store
+    
+    def _changed(self, kind=None, address=None, name=None):
+        """Bump the generation and publish the change; each callback calls this last, once
+        the indexes and caches are updated, so a request tagged with the new
+        generation (or a client woken by the event) never reads them stale"""
+        if self.store:
+            self.store.drop_listings()
+        self.listings.changed(kind)
+        self.changes.record(kind, address, name)
+    
+    def function_added(self, view, func):
+        self.index.update_address(func.start)
+        self.search_index.update_address(func.start)
+        self.call_graph.update_function(func)
+        self.similarity_index.update_function(func)
+        self._changed('function_added', func.start, func.name)
+    
+    def function_removed(self, view, func):
+        self.index.remove_address(func.start)
+        self.decompile_cache.invalidate(func.start)
+        self.search_index.update_address(func.start)
+        self.call_graph.remove_function(func.start)
+        self.similarity_index.remove_function(func.start)
+        self._changed('function_removed', func.start, func.name)
+    
+    def function_updated(self, view, func):
+        self.index.update_address(func.start)
+        self.decompile_cache.invalidate(func.start)
+        self.search_index.update_address(func.start)
+        self.call_graph.update_function(func)
+        self.similarity_index.update_function(func)
+        self._changed('function_updated', func.start, func.name)
+    
+    def data_var_added(self, view, var):
+        self.index.update_address(var.address)
+        self._changed('data_var_added', var.address)
+    
+    def data_var_removed(self, view, var):
+        self.index.remove_address(var.address)
+        self.decompile_cache.invalidate_references(var.address)
+        self._changed('data_var_removed', var.address)
+    
+    def data_var_updated(self, view, var):
+        self.decompile_cache.invalidate_references(var.address)
+        self._changed('data_var_updated', var.address)
+    
+    def symbol_added(self, view, sym):
+        self.index.update_address(sym.address)
+        self.decompile_cache.invalidate_references(sym.address)
+        self.search_index.update_address(sym.address)
+        self._changed('symbol_added', sym.address, sym.name)
+    
+    def symbol_updated(self, view, sym):
+        self.index.update_address(sym.address)
+        self.decompile_cache.invalidate_references(sym.address)
+        self.search_index.update_address(sym.address)
+        self._changed('symbol_updated', sym.address, sym.name)
+    
+    def symbol_removed(self, view, sym):
+        self.index.update_address(sym.address)
+        self.decompile_cache.invalidate_references(sym.address)
+        self.search_index.update_address(sym.address)
+        self._changed('symbol_removed', sym.address, sym.name)
+    
+    def type_defined(self, view, name, type):
+        self.decompile_cache.invalidate_all()
+        self.search_index.update_type(name, True)
+        self._changed('type_defined', name=str(name))
+    
+    def type_undefined(self, view, name, type):
+        self.decompile_cache.invalidate_all()
+        self.search_index.update_type(name, False)
+        self._changed('type_undefined', name=str(name))
+    
+    def string_found(self, view, string_type, offset, length):
+        self.search_index.update_string(offset, True)
+        self._changed()
+    
+    def string_removed(self, view, string_type, offset, length):
+        self.search_index.update_string(offset, False)
+        self._changed()
+
+
+class ReadWriteLock:
+    """Lock allowing many concurrent readers or a single writer; waiting writers block new readers"""
+    
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+    
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+    
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            try:
+                while self._writer or self._readers:
+                    self._cond.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+class WorkerPoolHTTPServer(HTTPServer):
+    """HTTPServer that serves requests on a bounded pool of worker threads
+    
+    Accepted connections wait in a queue of at most `queue_depth` entries; once
+    it is full new connections get an immediate 429 with Retry-After instead of
+    waiting for a free worker. Workers handle one request at a time: idle
+    keep-alive connections are parked on a selector and only go back on the
+    queue once the client sends its next request, so they never pin a worker.
+    """
+    
+    request_queue_size = 64
+    
+    def __init__(self, server_address, handler_class, workers=4, queue_depth=32, retry_after=1, keepalive_timeout=15):
+        self.retry_after = retry_after
+        self.keepalive_timeout = keepalive_timeout
+        self.rejected = 0  # Connections turned away with 429
+        self._requests = queue.Queue(maxsize=queue_depth)
+        self._workers = []
+        for i in range(workers):
+            worker = threading.Thread(target=self._worker_loop, name=f"BinaryNinjaMCP-worker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        
+        # Idle keep-alive connections, watched for their next request
+        self._idle = selectors.DefaultSelector()
+        self._idle_pending = queue.SimpleQueue()
+        self._wake_recv, self._wake_send = socket.socketpair()
+        self._wake_recv.setblocking(False)
+        self._idle.register(self._wake_recv, selectors.EVENT_READ)
+        self._closing = False
+        self._idle_thread = threading.Thread(target=self._idle_loop, name="BinaryNinjaMCP-keepalive", daemon=True)
+        self._idle_thread.start()
+        # Bind last: if it fails, server_close() stops the threads started above
+        super().__init__(server_address, handler_class)
+    
+    def process_request(self, request, client_address):
+        try:
+            self._requests.put_nowait((request, client_address))
+        except queue.Full:
+            self._reject(request)
+    
+    def finish_request(self, request, client_address):
+        """Handle a single request; returns True if the connection should be kept open"""
+        handler = self.RequestHandlerClass(request, client_address, self)
+        return not handler.close_connection
+    
+    def _worker_loop(self):
+        while True:
+            item = self._requests.get()
+            if item is None:
+                return
+            request, client_address = item
+            keep_alive = False
+            try:
+                keep_alive = self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                if keep_alive and not self._closing:
+                    self._park(request, client_address)
+                else:
+                    self.shutdown_request(request)
+    
+    def _park(self, request, client_address):
+        """Hand a keep-alive connection to the idle watcher"""
+        self._idle_pending.put((request, client_address))
+        self._wake()
+    
+    def _idle_loop(self):
+        deadlines = {}
+        while not self._closing:
+            for key, _ in self._idle.select(timeout=1.0):
+                if key.fileobj is self._wake_recv:
+                    try:
+                        self._wake_recv.recv(4096)
+                    except OSError:
+                        pass
+                    continue
+                # The client sent its next request (or hung up): back to the workers
+                self._idle.unregister(key.fileobj)
+                deadlines.pop(key.fileobj, None)
+                self.process_request(key.fileobj, key.data)
+            
+            while True:
+                try:
+                    request, client_address = self._idle_pending.get_nowait()
+                except queue.Empty:
+                    break
+                self._idle.register(request, selectors.EVENT_READ, client_address)
+                deadlines[request] = time.monotonic() + self.keepalive_timeout
+            
+            now = time.monotonic()
+            for request in [r for r, deadline in deadlines.items() if deadline <= now]:
+                self._idle.unregister(request)
+                del deadlines[request]
+                self.shutdown_request(request)
+        
+        for request in deadlines:
+            self.shutdown_request(request)
+        self._idle.close()
+        self._wake_recv.close()
+        self._wake_send.close()
+    
+    @property
+    def closing(self):
+        """Whether server_close() has been called, for long-lived responses to wind down"""
+        return self._closing
+    
+    @property
+    def queue_depth(self):
+        """Connections waiting for a worker"""
+        return self._requests.qsize()
+    
+    def _reject(self, request):
+        """Answer a connection with 429 without handing it to a worker"""
+        self.rejected += 1
+        body = json.dumps({
+            'error': 'Server busy',
+            'queue_depth': self._requests.qsize(),
+            'retry_after': self.retry_after
+        }).encode('utf-8')
+        response = (
+            "HTTP/1.1 429 Too Many Requests\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Retry-After: {self.retry_after}\r\n"
+            "Connection: close\r\n\r\n"
+        ).encode('ascii') + body
+        try:
+            # Never block the accept thread: drain only what the client already sent, so
+            # closing doesn't reset the connection, and the small response fits the send buffer
+            request.setblocking(False)
+            try:
+                for _ in range(16):
+                    if not request.recv(65536):
+                        break
+            except OSError:
+                pass
+            request.send(response)
+        except OSError:
+            pass
+        finally:
+            self.shutdown_request(request)
+    
+    def server_close(self):
+        super().server_close()
+        self._closing = True
+        self._wake()
+        for _ in self._workers:
+            self._requests.put(None)
+        self._workers = []
+    
+    def _wake(self):
+        """Interrupt the idle watcher's select()"""
+        try:
+            self._wake_send.send(b'\0')
+        except OSError:
+            pass
+
+
+class UnixWorkerPoolHTTPServer(WorkerPoolHTTPServer):
+    """WorkerPoolHTTPServer listening on a Unix domain socket instead of a TCP port
+    
+    The socket file is made owner-only and removed on close. A stale file left
+    by a server that crashed is replaced, but not one another server is still
+    listening on.
+    """
+    
+    address_family = getattr(socket, 'AF_UNIX', None)
+    
+    def server_bind(self):
+        path = self.server_address
+        if os.path.exists(path):
+            if not stat.S_ISSOCK(os.stat(path).st_mode):
+                raise OSError(errno.EEXIST, f"{path} exists and is not a socket")
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(path)
+            except OSError:
+                os.unlink(path)
+            else:
+                raise OSError(errno.EADDRINUSE, f"Another server is listening on {path}")
+            finally:
+                probe.close()
+        self.socket.bind(path)
+        self._bound_path = path
+        os.chmod(path, 0o600)
+        self.server_name = 'localhost'
+        self.server_port = 0
+    
+    def get_request(self):
+        request, _ = self.socket.accept()
+        # Unix sockets have no peer address; handlers expect a (host, port) pair
+        return request, ('local', 0)
+    
+    def server_close(self):
+        super().server_close()
+        path = getattr(self, '_bound_path', None)
+        if path:
+            self._bound_path = None
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+def analysis_progress(bv):
+    """Snapshot of Binary Ninja's own analysis progress"""
+    try:
+        progress = bv.analysis_progress
+        return {
+            'state': getattr(progress.state, 'name', str(progress.state)),
+            'count': progress.count,
+            'total': progress.total
+        }
+    except Exception:
+        return None
+
+
+@contextmanager
+def undo_group(bv):
+    """Record the edits made inside as a single undo action, reverting them if the block raises"""
+    state = bv.begin_undo_actions()  # An id since Binary Ninja 4.0, None before
+    try:
+        yield
+    except BaseException:
+        if hasattr(bv, 'revert_undo_actions'):
+            bv.revert_undo_actions(state)
+        else:
+            bv.commit_undo_actions()
+            bv.undo()
+        raise
+    if state is None:
+        bv.commit_undo_actions()
+    else:
+        bv.commit_undo_actions(state)
+
+
+class AnalysisJob:
+    """A background update_analysis_and_wait() run"""
+    
+    def __init__(self, bv):
+        self.bv = bv
+        self.id = uuid.uuid4().hex
+        self.state = 'queued'
+        self.error = None
+        self.requests = 1  # Number of /analyze calls served by this job
+        self.created_at = time.time()
+        self._started = None
+        self._finished = None
+        self.done = threading.Event()
+    
+    def run(self):
+        self.state = 'running'
+        self._started = time.monotonic()
+        try:
+            self.bv.update_analysis_and_wait()
+            self.state = 'completed'
+        except Exception as e:
+            bn.log_error(f"BinaryNinjaMCP: Analysis job {self.id} failed: {str(e)}")
+            self.error = str(e)
+            self.state = 'failed'
+        finally:
+            self._finished = time.monotonic()
+            self.done.set()
+    
+    @property
+    def elapsed(self):
+        if self._started is None:
+            return 0.0
+        return (self._finished or time.monotonic()) - self._started
+    
+    def to_dict(self):
+        result = {
+            'job_id': self.id,
+            'state': self.state,
+            'elapsed': round(self.elapsed, 3),
+            'requests': self.requests,
+            'created_at': self.created_at
+        }
+        if self.error:
+            result['error'] = self.error
+        if not self.done.is_set():
+            result['progress'] = analysis_progress(self.bv)
+        return result
+
+
+class AnalysisJobManager:
+    """Runs analysis updates in the background, coalescing requests onto the running job"""
+    
+    def __init__(self, bv, history=32):
+        self.bv = bv
+        self.history = history  # Finished jobs kept around for polling
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._current = None
+    
+    def submit(self):
+        """Start an analysis job, or join the one already running; returns (job, coalesced)"""
+        with self._lock:
+            if self._current and not self._current.done.is_set():
+                self._current.requests += 1
+                return self._current, True
+            
+            job = AnalysisJob(self.bv)
+            self._jobs[job.id] = job
+            self._current = job
+            while len(self._jobs) > self.history:
+                del self._jobs[next(iter(self._jobs))]
+        
+        threading.Thread(target=job.run, name=f"BinaryNinjaMCP-analysis-{job.id}", daemon=True).start()
+        return job, False
+    
+    def get(self, job_id=None):
+        """Look up a job by id, or the most recent one"""
+        with self._lock:
+            if job_id is None:
+                return self._current
+            return self._jobs.get(job_id)
+
+
+class ForegroundActivity:
+    """Count of requests being served, so background work can stay out of their way"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = 0
+        self._idle = threading.Event()
+        self._idle.set()
+    
+    @contextmanager
+    def serving(self):
+        with self._lock:
+            self._active += 1
+            self._idle.clear()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active -= 1
+                if not self._active:
+                    self._idle.set()
+    
+    def wait_idle(self, timeout):
+        """Return True once no request is being served, False if still busy after timeout"""
+        return self._idle.wait(timeout)
+
+
+class DecompileWarmer:
+    """Pre-renders the functions an agent is likely to ask for first into the decompile cache
+    
+    Functions are ranked by inbound call sites, size and call distance from
+    the entry point, using the call graph. One function is rendered at a
+    time, under the view's read lock, and only while no request is being
+    served; the warmer stops once it has filled its share of the cache.
+    """
+    
+    # Score = CALLERS * log2(1 + call sites) + SIZE * log2(1 + bytes) + ENTRY / (1 + hops from the entry point)
+    CALLERS_WEIGHT = 2.0
+    SIZE_WEIGHT = 0.5
+    ENTRY_WEIGHT = 4.0
+    MAX_ENTRY_HOPS = 6
+    # Share of the decompile cache budget warm renderings may fill
+    CACHE_SHARE = 0.5
+    
+    def __init__(self, state, activity, limit):
+        self.state = state
+        self.activity = activity
+        self.limit = limit  # Functions to warm at most
+        self.status = 'queued'
+        self.total = 0
+        self.done = 0
+        self.rendered = 0  # Functions rendered, rather than found in the cache or the persistent store
+        self.error = None
+        self._started = None
+        self._finished = None
+        self._stop = threading.Event()
+    
+    def start(self):
+        threading.Thread(target=self._run, name=f"BinaryNinjaMCP-warmup-{self.state.id}", daemon=True).start()
+    
+    def stop(self):
+        self._stop.set()
+    
+    def _run(self):
+        self._started = time.monotonic()
+        try:
+            self.status = 'ranking'
+            while not self.state.call_graph.ensure_built(0.5):
+                if self._stop.is_set():
+                    return
+            ranked = self.rank()
+            self.total = len(ranked)
+            
+            cache = self.state.decompile_cache
+            for func in ranked:
+                if cache.bytes >= cache.max_bytes * self.CACHE_SHARE:
+                    break
+                self.status = 'running'
+                while not self.activity.wait_idle(0.1):
+                    self.status = 'yielding'
+                    if self._stop.is_set():
+                        return
+                if self._stop.is_set():
+                    return
+                self.status = 'running'
+                with self.state.lock.read():
+                    key = cache.generation(func.start)
+                    if cache.get(key, count=False) is None:
+                        cache.put(key, *render_il_lines(func))
+                        self.rendered += 1
+                self.done += 1
+            self.status = 'completed'
+        except Exception as e:
+            bn.log_error(f"BinaryNinjaMCP: Decompile warm-up failed: {str(e)}")
+            self.error = str(e)
+            self.status = 'failed'
+        finally:
+            if self._stop.is_set():
+                self.status = 'stopped'
+            self._finished = time.monotonic()
+    
+    def rank(self):
+        """The `limit` functions most worth warming, best first"""
+        bv = self.state.bv
+        graph = self.state.call_graph
+        
+        # Call distance from the entry point and main
+        roots = [func.start for func in self.state.index.lookup_functions('main')]
+        if bv.entry_function:
+            roots.append(bv.entry_function.start)
+        hops = {root: 0 for root in roots}
+        frontier = deque(roots)
+        while frontier:
+            addr = frontier.popleft()
+            if hops[addr] >= self.MAX_ENTRY_HOPS:
+                continue
+            for callee in graph.neighbors(addr, 'callees'):
+                if callee not in hops:
+                    hops[callee] = hops[addr] + 1
+                    frontier.append(callee)
+        
+        scored = []
+        for func in bv.functions:
+            call_sites = sum(len(sites) for sites in graph.neighbors(func.start, 'callers').values())
+            size = getattr(func, 'total_bytes', 0) or 0
+            score = self.CALLERS_WEIGHT * math.log2(1 + call_sites) + self.SIZE_WEIGHT * math.log2(1 + size)
+            if func.start in hops:
+                score += self.ENTRY_WEIGHT / (1 + hops[func.start])
+            scored.append((score, -func.start, func))
+        return [func for _, _, func in heapq.nlargest(self.limit, scored, key=lambda item: item[:2])]
+    
+    def to_dict(self):
+        result = {
+            'state': self.status,
+            'done': self.done,
+            'total': self.total,
+            'rendered': self.rendered,
+            'elapsed': round((self._finished or time.monotonic()) - self._started, 3) if self._started else 0.0
+        }
+        if self.error:
+            result['error'] = self.error
+        return result
+
+
+class ViewState:
+    """Everything the plugin keeps for one served BinaryView: its indexes, caches and lock"""
+    
+    def __init__(self, bv, decompile_cache_bytes, store=None):
+        self.bv = bv
+        self.filename = bv.file.filename
+        self.name = os.path.basename(self.filename)
+        self.hash = self._file_hash(bv)
+        self.id = self.hash[:12]  # May get a suffix from ViewRegistry.add if the file is open twice
+        self.store = None
+        if store is not None:
+            if getattr(bv.file, 'modified', False):
+                # Unsaved edits can't be matched to anything stored
+                bn.log_info(f"BinaryNinjaMCP: {self.name} has unsaved changes, not using the persistent store for it")
+            else:
+                try:
+                    self.store = ViewStore(store, bv, self.hash)
+                except sqlite3.Error as e:
+                    bn.log_error(f"BinaryNinjaMCP: Persistent store unavailable for {self.name}: {str(e)}")
+        self.index = SymbolIndex(bv, self.store)
+        self.jobs = AnalysisJobManager(bv)
+        self.decompile_cache = DecompileCache(bv, decompile_cache_bytes, self.store)
+        self.generation = ViewGeneration()
+        self.changes = ChangeFeed(self.generation)
+        self.listings = ListingSnapshots(bv, self.generation, store=self.store)
+        self.search_index = SearchIndex(bv)
+        self.call_graph = CallGraph(bv, self.store)
+        self.lock = ReadWriteLock()  # Readers share bv, mutating endpoints take it exclusively
+        self.function_table = FunctionTable(bv, self.generation, self.call_graph, self.lock)
+        self.similarity_index = SimilarityIndex(bv, self.call_graph)
+        self.warmer = None  # DecompileWarmer, when the server warms the cache
+        # Keeps the indexes current as analysis and the user change the view
+        self.notification = MCPViewNotification(
+            self.index, self.decompile_cache, self.changes, self.listings, self.search_index, self.call_graph,
+            self.similarity_index, self.store
+        )
+    
+    @staticmethod
+    def _file_hash(bv):
+        """SHA-256 of the binary on disk, or of its name if it can't be read"""
+        path = getattr(bv.file, 'original_filename', None) or bv.file.filename
+        digest = hashlib.sha256()
+        try:
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(block)
+        except OSError:
+            digest.update(path.encode('utf-8'))
+        return digest.hexdigest()
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'filename': self.filename,
+            'sha256': self.hash,
+            'functions': len(self.bv.functions),
+            'generation': self.generation.value
+        }
+
+
+class ViewRegistry:
+    """The BinaryViews a server is serving, addressed by id, file hash or file name
+    
+    Requests without a view selector go to the default view: the first one
+    added that is still being served.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = OrderedDict()  # id -> ViewState
+    
+    def add(self, state):
+        with self._lock:
+            base, suffix = state.id, 2
+            while state.id in self._views:
+                state.id = f"{base}-{suffix}"
+                suffix += 1
+            self._views[state.id] = state
+        return state
+    
+    def remove(self, bv):
+        """Stop serving bv; returns its ViewState, or None if it wasn't served"""
+        with self._lock:
+            for view_id, state in self._views.items():
+                if state.bv is bv:
+                    return self._views.pop(view_id)
+        return None
+    
+    def find(self, bv):
+        with self._lock:
+            return next((state for state in self._views.values() if state.bv is bv), None)
+    
+    def get(self, selector=None):
+        """Resolve a view id, file hash (or prefix), file name or path; None if unknown or ambiguous"""
+        with self._lock:
+            if not selector:
+                return next(iter(self._views.values()), None)
+            if selector in self._views:
+                return self._views[selector]
+            matches = [
+                state for state in self._views.values()
+                if selector in (state.name, state.filename)
+                or (len(selector) >= 6 and state.hash.startswith(selector.lower()))
+            ]
+        return matches[0] if len(matches) == 1 else None
+    
+    def all(self):
+        with self._lock:
+            return list(self._views.values())
+    
+    def clear(self):
+        with self._lock:
+            states = list(self._views.values())
+            self._views.clear()
+        return states
+
 
 class BinaryNinjaMCPHandler(BaseHTTPRequestHandler):
     """HTTP request handler for Binary Ninja MCP API"""
     
-    bv = None  # Will be set by the plugin
+    # Persistent connections; every response carries Content-Length or chunked framing
+    protocol_version = 'HTTP/1.1'
+    # Give up on clients that stall mid-request instead of holding a worker
+    timeout = 30
+    # Headers and body go out in separate writes; don't let Nagle hold back the body
+    disable_nagle_algorithm = True
+    
+    views = ViewRegistry()  # Every BinaryView being served, filled by the plugin
+    decompile_pool = None  # ThreadPoolExecutor for batch decompilation, set by the plugin
+    activity = ForegroundActivity()  # Requests being served, which background warm-up yields to
+    change_waiters = threading.BoundedSemaphore(2)  # Requests blocked on a change feed at once, each holding a worker
+    
+    # The view a request selected (see _select_view), bound per request
+    view = None  # ViewState
+    bv = None
+    index = None  # SymbolIndex
+    jobs = None  # AnalysisJobManager
+    decompile_cache = None  # DecompileCache
+    generation = None  # ViewGeneration
+    listings = None  # ListingSnapshots
+    search_index = None  # SearchIndex
+    call_graph = None  # CallGraph
+    view_lock = None  # ReadWriteLock
+    
+    _etag = None  # ETag of the response being served, set per request
+    
+    # Process-wide, so counters keep counting across server restarts
+    metrics = Metrics('binaryninja_mcp', {
+        'requests_total': ('counter', 'HTTP requests served, by method, endpoint and status'),
+        'request_duration_seconds': ('histogram', 'Time from parsed request to last byte written, by method and endpoint'),
+        'requests_in_flight': ('gauge', 'Requests being served, by method'),
+        'response_bytes_total': ('counter', 'Response body bytes written after compression, by endpoint'),
+        'errors_total': ('counter', 'Requests that failed (5xx, aborted stream or client gone), by endpoint and kind'),
+        'lock_wait_seconds': ('histogram', 'Time spent waiting for the view lock, by method'),
+        'render_seconds': ('histogram', 'Time spent rendering HLIL/MLIL text for one function (decompile cache misses)'),
+    })
+    
+    # Result-size caps for call graph and batched xref queries
+    MAX_GRAPH_NODES = 5000
+    MAX_GRAPH_DEPTH = 10
+    MAX_CALL_PATHS = 100
+    MAX_XREFS_PER_NAME = 1000
+    # Seconds a call graph query waits for the initial build before answering 503
+    CALL_GRAPH_WAIT = 2.0
+    # Most events one /changes response returns, and the longest its `wait` may block
+    MAX_CHANGES = 5000
+    MAX_CHANGES_WAIT = 30.0
+    # A /changes/stream connection ends after this many seconds (clients reconnect
+    # with Last-Event-ID), and sends a comment when idle this long
+    CHANGE_STREAM_SECONDS = 300.0
+    CHANGE_STREAM_HEARTBEAT = 15.0
+    # Seconds a similarity query waits for the initial signature build before answering 503
+    SIMILARITY_WAIT = 2.0
+    MAX_SIMILAR = 100
+    # Identifies /signatures exports, so /signatures/match can reject anything else
+    SIGNATURE_FORMAT = 'binaryninja-mcp-signatures'
+    SIGNATURE_VERSION = 1
+    # Seconds /functions/table waits for the current generation's table
+    FUNCTION_TABLE_WAIT = 2.0
+    # /functions/table formats and their content types
+    FUNCTION_TABLE_FORMATS = {
+        'json': 'application/json',
+        'npz': 'application/octet-stream',
+        'arrow': 'application/vnd.apache.arrow.stream'
+    }
+    
+    # Bodies smaller than this are sent uncompressed; larger ones are
+    # compressed if the client accepts it, and streamed in chunks this size
+    MIN_COMPRESS_BYTES = 1024
+    STREAM_CHUNK_BYTES = 64 * 1024
+    
+    # Default and maximum seconds a /search query may run
+    SEARCH_TIME_LIMIT = 2.0
+    MAX_SEARCH_TIME_LIMIT = 10.0
+    
+    # Listing endpoints and the snapshot each one pages through
+    LISTING_ENDPOINTS = {
+        '/methods': 'functions',
+        '/functions': 'functions',
+        '/classes': 'types',
+        '/types': 'types',
+        '/imports': 'imports',
+        '/exports': 'exports',
+        '/strings': 'strings'
+    }
+    
+    # Lines /decompile/lines returns by default and at most
+    DECOMPILE_PAGE_LINES = 200
+    MAX_DECOMPILE_PAGE_LINES = 5000
+    
+    # Maximum number of functions accepted by one /decompile/batch request
+    MAX_BATCH_SIZE = 1000
+    # Operations accepted by /edit/batch
+    EDIT_OPS = ('rename', 'comment', 'type')
+    
+    # Endpoints that modify the BinaryView and must not interleave with reads. /analyze
+    # only starts a job: analysis runs alongside reads, as Binary Ninja's own does
+    MUTATING_ENDPOINTS = ('/rename', '/edit/batch')
+    # Endpoints that don't touch the BinaryView at all
+    UNLOCKED_ENDPOINTS = ('/health', '/jobs', '/cache', '/metrics', '/views', '/resolve', '/changes', '/changes/stream')
+    # Endpoints that may block waiting for changes, which background work need not yield to
+    WAITING_ENDPOINTS = ('/changes', '/changes/stream')
+    
+    def setup(self):
+        # TCP_NODELAY doesn't apply to connections on a Unix domain socket
+        self.disable_nagle_algorithm = self.request.family in (socket.AF_INET, socket.AF_INET6)
+        super().setup()
+    
+    def handle(self):
+        """Serve a single request; WorkerPoolHTTPServer parks the connection until the next one"""
+        self.close_connection = True
+        self.handle_one_request()
+    
+    def send_response(self, code, message=None):
+        self._status = code
+        super().send_response(code, message)
+    
+    def log_message(self, format, *args):
+        """Override to use Binary Ninja logging"""
+        bn.log_info(f"BinaryNinjaMCP: {format % args}")
+    
+    def _send_response(self, data, status=200, headers=None):
+        """Send JSON response"""
+        self._send_body(self._text_chunks(json.dumps(data)), 'application/json', status, headers)
+    
+    def _send_text_response(self, text, status=200, headers=None):
+        """Send plain text response; `text` may also be an iterable of text chunks"""
+        if isinstance(text, str):
+            text = self._text_chunks(text)
+        self._send_body(text, 'text/plain; charset=utf-8', status, headers)
+    
+    def _send_ndjson_stream(self, items, status=200):
+        """Send an iterable of JSON objects as chunked NDJSON, flushing each object as it is produced"""
+        try:
+            self._send_body(
+                (json.dumps(item) + '\n' for item in items), 'application/x-ndjson', status, stream=True
+            )
+        finally:
+            if hasattr(items, 'close'):
+                items.close()
+    
+    def _text_chunks(self, text):
+        """Slice a string so it is encoded a chunk at a time rather than all at once"""
+        size = self.STREAM_CHUNK_BYTES
+        return (text[i:i + size] for i in range(0, len(text), size))
+    
+    @staticmethod
+    def _join_lines(lines, batch=1024):
+        """Lazily '\n'.join an iterable of lines, a batch of lines at a time"""
+        lines = iter(lines)
+        separator = ''
+        while True:
+            chunk = list(islice(lines, batch))
+            if not chunk:
+                return
+            yield separator + '\n'.join(chunk)
+            separator = '\n'
+    
+    def _send_body(self, chunks, content_type, status=200, headers=None, stream=False):
+        """Send a body produced as str/bytes chunks, compressed per Accept-Encoding
+        
+        A body that fits in one STREAM_CHUNK_BYTES buffer is sent with a
+        Content-Length; anything larger (or any `stream` body, which is
+        flushed chunk by chunk) goes out with chunked transfer encoding so the
+        whole payload never sits in memory at once.
+        """
+        chunks = (chunk.encode('utf-8') if isinstance(chunk, str) else chunk for chunk in chunks)
+        pending = []
+        size = 0
+        complete = False
+        if not stream:
+            for chunk in chunks:
+                pending.append(chunk)
+                size += len(chunk)
+                if size >= self.STREAM_CHUNK_BYTES:
+                    break
+            else:
+                complete = True
+        
+        encoding = None
+        if not complete or size >= self.MIN_COMPRESS_BYTES:
+            encoding = negotiate_encoding(self.headers.get('Accept-Encoding'))
+        encoder = ResponseEncoder(encoding)
+        
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Vary', 'Accept-Encoding')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if self._etag and status == 200:
+            self.send_header('ETag', self._etag)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        
+        if complete:
+            body = encoder.compress(b''.join(pending)) + encoder.finish()
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            self._bytes_sent += len(body)
+            return
+        
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        
+        def write_chunk(data):
+            if data:
+                self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+                self._bytes_sent += len(data)
+        
+        try:
+            for chunk in chunks:
+                if stream:
+                    write_chunk(encoder.compress(chunk) + encoder.flush())
+                    self.wfile.flush()
+                    continue
+                pending.append(chunk)
+                size += len(chunk)
+                if size >= self.STREAM_CHUNK_BYTES:
+                    write_chunk(encoder.compress(b''.join(pending)))
+                    pending = []
+                    size = 0
+            write_chunk(encoder.compress(b''.join(pending)) + encoder.finish())
+            self.wfile.write(b"0\r\n\r\n")
+        except ConnectionError:
+            # The client stopped reading (e.g. its time budget ran out)
+            self.close_connection = True
+            self._failure = 'client_disconnected'
+            bn.log_info(f"BinaryNinjaMCP: Client closed {self.path} stream early")
+        except Exception as e:
+            # Headers are already out: drop the connection without the final
+            # chunk so the client sees a truncated body rather than a short one
+            self.close_connection = True
+            self._failure = 'stream_aborted'
+            bn.log_error(f"BinaryNinjaMCP: Error streaming {self.path}: {str(e)}")
+    
+    def _find_functions(self, target):
+        """Resolve a function name or hex address to every matching function"""
+        if target.lower().startswith('0x'):
+            try:
+                addr = int(target, 16)
+            except ValueError:
+                return []
+            func = self.bv.get_function_at(addr)
+            return [func] if func else self.bv.get_functions_containing(addr)
+        return self.index.lookup_functions(target)
+    
+    def _resolve_addresses(self, names):
+        """Map names or hex addresses to graph nodes; returns (addresses, unresolved names)"""
+        addresses = []
+        unresolved = []
+        for name in names:
+            if not isinstance(name, str):
+                unresolved.append(name)
+                continue
+            if name.lower().startswith('0x'):
+                try:
+                    addresses.append(int(name, 16))
+                    continue
+                except ValueError:
+                    pass
+            found = [addr for addr, _ in self.index.lookup(name)]
+            if not found:
+                # Imports and externs aren't functions or data variables
+                found = [symbol.address for symbol in self.bv.get_symbols_by_name(name)]
+            if found:
+                addresses.extend(addr for addr in found if addr not in addresses)
+            else:
+                unresolved.append(name)
+        return addresses, unresolved
+    
+    def _node(self, addr, **extra):
+        """Describe a call graph node"""
+        func = self.bv.get_function_at(addr)
+        if func:
+            name = func.name
+        else:
+            symbol = self.bv.get_symbol_at(addr)
+            name = symbol.name if symbol else None
+        return dict({'address': f"0x{addr:x}", 'name': name}, **extra)
+    
+    def _similarity_ready(self, state):
+        """Wait briefly for a view's signatures; answers 503 and returns False if they are still being computed"""
+        if state.similarity_index.ensure_built(self.SIMILARITY_WAIT):
+            return True
+        self._send_response({'error': 'Similarity index is still being built, retry shortly'}, 503, {'Retry-After': '1'})
+        return False
+    
+    def _threshold(self, value):
+        """A similarity threshold from a request as a float in [0, 1]; answers 400 and returns None if it isn't one"""
+        try:
+            threshold = float(value)
+        except (TypeError, ValueError):
+            threshold = None
+        if threshold is None or not 0 <= threshold <= 1:
+            self._send_response({'error': f"threshold must be a number from 0 to 1, not {value!r}"}, 400)
+            return None
+        return threshold
+    
+    def _export_signatures(self, state, include_auto):
+        """A view's signatures in the /signatures format; auto-named functions only if include_auto"""
+        functions = []
+        for start, raw in state.similarity_index.export():
+            func = state.bv.get_function_at(start)
+            if func is None or (func.symbol.auto and not include_auto):
+                continue
+            functions.append({
+                'name': func.name,
+                'address': f"0x{start:x}",
+                'signature': base64.b64encode(raw).decode('ascii')
+            })
+        return {
+            'format': self.SIGNATURE_FORMAT,
+            'version': self.SIGNATURE_VERSION,
+            'bins': SimilarityIndex.BINS,
+            'binary': state.name,
+            'hash': state.hash,
+            'functions': functions
+        }
+    
+    def _match_signatures(self, entries, threshold):
+        """Best local match for each exported function; a match is ambiguous if another
+        local function scores the same, or another exported function matched it too"""
+        matches = []
+        unmatched = 0
+        for entry in entries:
+            signature = SimilarityIndex.decode(base64.b64decode(entry['signature']))
+            found = self.view.similarity_index.similar(signature, threshold, 2)
+            if not found:
+                unmatched += 1
+                continue
+            score, start = found[0]
+            matches.append([entry.get('name'), start, score, len(found) > 1 and found[1][0] == score])
+        
+        targets = {}
+        for match in matches:
+            targets[match[1]] = targets.get(match[1], 0) + 1
+        results = []
+        for name, start, score, ambiguous in matches:
+            func = self.bv.get_function_at(start)
+            if func is None:
+                continue
+            results.append({
+                'name': name,
+                'address': f"0x{start:x}",
+                'local_name': func.name,
+                'auto': func.symbol.auto,
+                'similarity': round(score, 3),
+                'ambiguous': ambiguous or targets[start] > 1
+            })
+        return results, unmatched
+    
+    def _call_graph_ready(self):
+        """Wait briefly for the call graph; answers 503 and returns False if it is still building"""
+        if self.call_graph.ensure_built(self.CALL_GRAPH_WAIT):
+            return True
+        self._send_response({'error': 'Call graph is still being built, retry shortly'}, 503, {'Retry-After': '1'})
+        return False
+    
+    @staticmethod
+    def _encode_line_cursor(start, key, offset, stop):
+        raw = json.dumps([start, [key[1], key[2]], offset, stop]).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+    
+    @staticmethod
+    def _decode_line_cursor(cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            start, version, offset, stop = json.loads(raw)
+            return int(start), [int(part) for part in version], int(offset), int(stop)
+        except (ValueError, TypeError):
+            raise ValueError('Invalid cursor')
+    
+    @staticmethod
+    def _line_window(func, addresses, params):
+        """The [first, stop) lines a /decompile/lines request selects
+        
+        `offset` counts lines from the top; `address` starts at the first line
+        for that address (or the closest one after it); `start`/`end` and
+        `block` (any address in a basic block) select the lines spanning an
+        address range. Raises LookupError if nothing matches.
+        """
+        def address_param(name):
+            value = params.get(name, [None])[0]
+            return int(value, 16) if value else None
+        
+        total = len(addresses)
+        offset = min(max(int(params.get('offset', [0])[0]), 0), total)
+        at, low, high, block = (address_param(name) for name in ('address', 'start', 'end', 'block'))
+        
+        if block is not None:
+            for basic_block in func.basic_blocks:
+                if basic_block.start <= block < basic_block.end:
+                    low, high = basic_block.start, basic_block.end
+                    break
+            else:
+                raise LookupError(f"No basic block of {func.name} contains 0x{block:x}")
+        
+        if low is not None or high is not None:
+            low = low if low is not None else 0
+            high = high if high is not None else 1 << 64
+            matches = [i for i, addr in enumerate(addresses) if low <= addr < high and addr != NO_LINE_ADDRESS]
+            if not matches:
+                raise LookupError(f"No lines of {func.name} between 0x{low:x} and 0x{high:x}")
+            return matches[0], matches[-1] + 1
+        
+        if at is not None:
+            candidates = [(addr, i) for i, addr in enumerate(addresses) if at <= addr != NO_LINE_ADDRESS]
+            if not candidates:
+                raise LookupError(f"No lines of {func.name} at or after 0x{at:x}")
+            return min(candidates)[1], total
+        
+        return offset, total
+    
+    def _change_stream(self, since):
+        """Server-sent events for the view's changes after `since`, until CHANGE_STREAM_SECONDS pass"""
+        changes = self.view.changes
+        deadline = time.monotonic() + self.CHANGE_STREAM_SECONDS
+        yield 'retry: 1000\n\n'
+        while True:
+            events, complete, current = changes.since(since, self.MAX_CHANGES)
+            if not complete:
+                yield f"event: reset\nid: {current}\ndata: {json.dumps({'generation': current})}\n\n"
+                since = current
+                continue
+            for event in events:
+                yield f"id: {event[0]}\ndata: {json.dumps(ChangeFeed.to_dict(event))}\n\n"
+            if events:
+                since = events[-1][0]
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self.server.closing:
+                return
+            if not changes.wait(since, min(self.CHANGE_STREAM_HEARTBEAT, remaining)):
+                yield ': keep-alive\n\n'
+    
+    def _resolve_edit_target(self, target):
+        """Resolve an edit's target name or hex address to (address, kind), preferring functions"""
+        if not isinstance(target, str) or not target:
+            raise ValueError('Missing target')
+        if target.lower().startswith('0x'):
+            try:
+                addr = int(target, 16)
+            except ValueError:
+                raise ValueError(f"Invalid address '{target}'")
+            if self.bv.get_function_at(addr):
+                return addr, 'function'
+            if self.bv.get_data_var_at(addr) is not None:
+                return addr, 'data'
+            return addr, 'address'
+        candidates = self.index.lookup(target)
+        if not candidates:
+            raise ValueError(f"Could not find '{target}'")
+        return candidates[0]
     
-    def log_message(self, format, *args):
-        """Override to use Binary Ninja logging"""
-        bn.log_info(f"BinaryNinjaMCP: {format % args}")
+    def _prepare_edit(self, edit):
+        """Validate an edit and resolve its target; returns (address, function applying it)"""
+        if not isinstance(edit, dict):
+            raise ValueError('Edit must be a JSON object')
+        op = edit.get('op', 'rename')
+        if op not in self.EDIT_OPS:
+            raise ValueError(f"Unknown op '{op}', expected one of: {', '.join(self.EDIT_OPS)}")
+        addr, kind = self._resolve_edit_target(edit.get('target'))
+        func = self.bv.get_function_at(addr) if kind == 'function' else None
+        
+        if op == 'rename':
+            new_name = edit.get('new_name')
+            if not new_name or not isinstance(new_name, str):
+                raise ValueError('Missing new_name')
+            if func:
+                return addr, lambda: setattr(func, 'name', new_name)
+            symbol = self.bv.get_symbol_at(addr)
+            if symbol is None:
+                raise ValueError(f"No symbol at 0x{addr:x} to rename")
+            return addr, lambda: self.bv.define_user_symbol(bn.Symbol(symbol.type, addr, new_name))
+        
+        if op == 'comment':
+            comment = edit.get('comment')
+            if not isinstance(comment, str):
+                raise ValueError('Missing comment')
+            if func:
+                return addr, lambda: setattr(func, 'comment', comment)
+            containing = self.bv.get_functions_containing(addr)
+            if containing:
+                return addr, lambda: containing[0].set_comment_at(addr, comment)
+            return addr, lambda: self.bv.set_comment_at(addr, comment)
+        
+        declaration = edit.get('type')
+        if not declaration or not isinstance(declaration, str):
+            raise ValueError('Missing type')
+        if kind == 'address':
+            raise ValueError(f"No function or data variable at 0x{addr:x} to retype")
+        new_type, _ = self.bv.parse_type_string(declaration)
+        if func:
+            return addr, lambda: func.set_user_type(new_type)
+        return addr, lambda: self.bv.define_user_data_var(addr, new_type)
     
-    def _send_response(self, data, status=200):
-        """Send JSON response"""
-        self.send_response(status)
-        self.send_header('Content-Type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(json.dumps(data).encode('utf-8'))
+    def _edit_batch(self, edits, atomic):
+        """Apply edits as one undo action with analysis held; returns (per-edit results, committed)
+        
+        Every target is resolved before anything is applied. In atomic mode a
+        target that can't be resolved means nothing is applied, and a failure
+        while applying reverts the edits already made.
+        """
+        results = []
+        prepared = []
+        for position, edit in enumerate(edits):
+            result = {'index': position}
+            if isinstance(edit, dict):
+                result.update(op=edit.get('op', 'rename'), target=edit.get('target'))
+            try:
+                addr, apply = self._prepare_edit(edit)
+                result['address'] = f"0x{addr:x}"
+                prepared.append((result, addr, apply))
+            except Exception as e:
+                result.update(status='failed', error=str(e))
+            results.append(result)
+        
+        if atomic and len(prepared) < len(edits):
+            for result, _, _ in prepared:
+                result['status'] = 'skipped'
+            return results, False
+        
+        touched = set()
+        committed = True
+        hold = getattr(self.bv, 'set_analysis_hold', None)
+        if hold:
+            hold(True)  # One analysis pass at the end instead of one per edit
+        try:
+            with undo_group(self.bv):
+                for result, addr, apply in prepared:
+                    touched.add(addr)
+                    try:
+                        apply()
+                    except Exception as e:
+                        result.update(status='failed', error=str(e))
+                        if atomic:
+                            raise
+                        continue
+                    result['status'] = 'ok'
+        except Exception:
+            committed = False
+            for result, _, _ in prepared:
+                if result.get('status') == 'ok':
+                    result['status'] = 'rolled_back'
+                elif 'status' not in result:
+                    result['status'] = 'skipped'
+        finally:
+            if hold:
+                hold(False)
+            
+            # Don't wait for the notifications to catch up
+            if touched:
+                if self.view.store:
+                    self.view.store.drop_listings()
+                for addr in touched:
+                    self.index.update_address(addr)
+                    self.decompile_cache.invalidate_references(addr)
+                self.listings.changed()
+                self.generation.bump()  # Last, as in MCPViewNotification
+        return results, committed
     
-    def _send_text_response(self, text, status=200):
-        """Send plain text response"""
-        self.send_response(status)
-        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+    def _decompile_batch(self, targets):
+        """Decompile targets on the batch pool, yielding one result object per function as it completes"""
+        futures = {}
+        errors = 0
+        for target in targets:
+            funcs = self._find_functions(target) if isinstance(target, str) else []
+            if not funcs:
+                errors += 1
+                yield {'name': target, 'error': f"Function '{target}' not found"}
+                continue
+            for func in funcs:
+                futures[self.decompile_pool.submit(self._decompile, func)] = (target, func)
+        
+        try:
+            for future in as_completed(futures):
+                target, func = futures[future]
+                result = {'name': target, 'function': func.name, 'address': f"0x{func.start:x}"}
+                try:
+                    result['decompiled'] = future.result()
+                except Exception as e:
+                    errors += 1
+                    result['error'] = f"Error decompiling function: {str(e)}"
+                yield result
+        finally:
+            # Client went away or something failed: don't keep rendering for nobody
+            for future in futures:
+                future.cancel()
+        
+        yield {'done': True, 'count': len(futures), 'errors': errors}
+    
+    def _decompile(self, func):
+        """Render a function as HLIL, falling back to MLIL, through the decompile cache"""
+        key = self.decompile_cache.generation(func.start)
+        decompiled = self.decompile_cache.get(key)
+        if decompiled is None:
+            decompiled, addresses = self._render(func)
+            self.decompile_cache.put(key, decompiled, addresses)
+        return decompiled
+    
+    def _decompile_lines(self, func):
+        """Like _decompile, with the address of each line; returns (cache key, text, addresses)"""
+        key = self.decompile_cache.generation(func.start)
+        entry = self.decompile_cache.get_lines(key)
+        if entry is None:
+            entry = self._render(func)
+            self.decompile_cache.put(key, *entry)
+        return (key,) + tuple(entry)
+    
+    def _render(self, func):
+        """Render a function as HLIL, falling back to MLIL; returns (text, line addresses)"""
+        started = time.perf_counter()
+        try:
+            return render_il_lines(func)
+        finally:
+            self.metrics.observe('render_seconds', time.perf_counter() - started)
+    
+    def _view_lock_for(self, path):
+        """Pick the view lock mode an endpoint needs"""
+        if path in self.UNLOCKED_ENDPOINTS or not self.view:
+            return nullcontext()
+        if path in self.MUTATING_ENDPOINTS:
+            return self.view_lock.write()
+        return self.view_lock.read()
+    
+    def _not_modified(self, path):
+        """Tag a cacheable response with the view generation; answers 304 and returns True
+        if the client's If-None-Match copy is still current
+        
+        The generation is read before the response is computed, so a change
+        racing with the request can only make the tag older, never newer.
+        """
+        self._etag = None
+        if not self.bv or path in self.UNLOCKED_ENDPOINTS or path in self.MUTATING_ENDPOINTS:
+            return False
+        self._etag = self.generation.etag()
+        
+        candidates = self.headers.get('If-None-Match')
+        if not candidates:
+            return False
+        tags = [tag.strip() for tag in candidates.split(',')]
+        if '*' not in tags and self._etag not in (tag[2:] if tag.startswith('W/') else tag for tag in tags):
+            return False
+        
+        self.send_response(304)
+        self.send_header('ETag', self._etag)
         self.send_header('Access-Control-Allow-Origin', '*')
         self.end_headers()
-        self.wfile.write(text.encode('utf-8'))
+        return True
+    
+    def _select_view(self):
+        """Bind the view named by the `view` query parameter (default view if absent);
+        answers 404 and returns False if there is no such view"""
+        selector = parse_qs(urlparse(self.path).query).get('view', [None])[0]
+        state = self.views.get(selector)
+        if state is None and selector:
+            # The body (if any) hasn't been read, so the connection can't be reused
+            self.close_connection = True
+            self._send_response({
+                'error': f"Unknown or ambiguous view '{selector}'",
+                'views': [view.to_dict() for view in self.views.all()]
+            }, 404)
+            return False
+        
+        self.view = state
+        if state:
+            self.bv = state.bv
+            self.index = state.index
+            self.jobs = state.jobs
+            self.decompile_cache = state.decompile_cache
+            self.generation = state.generation
+            self.listings = state.listings
+            self.search_index = state.search_index
+            self.call_graph = state.call_graph
+            self.view_lock = state.lock
+        return True
+    
+    @contextmanager
+    def _serving(self, method, path):
+        """Select the view, hold the lock the endpoint needs on it and record the request's metrics;
+        yields False if the request was already answered"""
+        self._status = None
+        self._bytes_sent = 0
+        self._failure = None
+        self._endpoint = path  # Replaced for unknown paths to bound label cardinality
+        started = time.perf_counter()
+        self.metrics.inc('requests_in_flight', method=method)
+        try:
+            if not self._select_view():
+                yield False
+                return
+            activity = nullcontext() if path in self.WAITING_ENDPOINTS else self.activity.serving()
+            with activity, self._view_lock_for(path):
+                self.metrics.observe('lock_wait_seconds', time.perf_counter() - started, method=method)
+                yield True
+        finally:
+            self.metrics.inc('requests_in_flight', -1, method=method)
+            endpoint = self._endpoint
+            status = self._status or 500
+            self.metrics.inc('requests_total', method=method, endpoint=endpoint, status=status)
+            self.metrics.observe('request_duration_seconds', time.perf_counter() - started, method=method, endpoint=endpoint)
+            self.metrics.inc('response_bytes_total', self._bytes_sent, endpoint=endpoint)
+            if self._failure or status >= 500:
+                self.metrics.inc('errors_total', endpoint=endpoint, kind=self._failure or 'server_error')
+    
+    def _collected_metrics(self):
+        """Metrics sampled from the server and caches at scrape time"""
+        collected = [
+            ('request_queue_depth', 'gauge', 'Connections waiting for a worker', [({}, self.server.queue_depth)]),
+            ('rejected_connections_total', 'counter', 'Connections turned away with 429 because the queue was full',
+             [({}, self.server.rejected)]),
+        ]
+        views = [(state.id, state.generation.value, state.decompile_cache.stats()) for state in self.views.all()]
+        collected += [
+            ('view_generation', 'gauge', 'Analysis/edit generation of each view',
+             [({'view': view_id}, generation) for view_id, generation, _ in views]),
+            ('decompile_cache_requests_total', 'counter', 'Decompile cache lookups, by view and result',
+             [({'view': view_id, 'result': result}, stats[key])
+              for view_id, _, stats in views for result, key in (('hit', 'hits'), ('miss', 'misses'))]),
+            ('decompile_cache_evictions_total', 'counter', 'Entries evicted from each view\'s decompile cache',
+             [({'view': view_id}, stats['evictions']) for view_id, _, stats in views]),
+            ('decompile_cache_bytes', 'gauge', 'Bytes of rendered text held by each view\'s decompile cache',
+             [({'view': view_id}, stats['bytes']) for view_id, _, stats in views]),
+            ('decompile_cache_entries', 'gauge', 'Functions held by each view\'s decompile cache',
+             [({'view': view_id}, stats['entries']) for view_id, _, stats in views]),
+        ]
+        stores = [(state.id, state.store.stats()) for state in self.views.all() if state.store]
+        collected += [
+            ('store_requests_total', 'counter', 'Persistent store lookups, by view, kind and result',
+             [({'view': view_id, 'kind': kind, 'result': result}, count)
+              for view_id, stats in stores for result, key in (('hit', 'hits'), ('miss', 'misses'))
+              for kind, count in stats[key].items()]),
+            ('store_writes_total', 'counter', 'Rows and tables written to the persistent store, by view',
+             [({'view': view_id}, stats['writes']) for view_id, stats in stores]),
+        ]
+        return collected
     
     def do_GET(self):
         """Handle GET requests"""
+        path = urlparse(self.path).path
+        with self._serving('GET', path) as selected:
+            if selected and not self._not_modified(path):
+                self._handle_get()
+    
+    def do_POST(self):
+        """Handle POST requests"""
+        self._etag = None  # /decompile tags its response once the body is read
+        path = urlparse(self.path).path
+        with self._serving('POST', path) as selected:
+            if selected:
+                self._handle_post()
+    
+    def _handle_get(self):
+        """Dispatch a GET request"""
         parsed = urlparse(self.path)
         path = parsed.path
         params = parse_qs(parsed.query)
         
         # Extract offset and limit for pagination
-        offset = int(params.get('offset', [0])[0])
-        limit = int(params.get('limit', [100])[0])
+        try:
+            offset = int(params.get('offset', [0])[0])
+            limit = int(params.get('limit', [100])[0])
+        except ValueError:
+            self._send_response({'error': 'offset and limit must be integers'}, 400)
+            return
         
         try:
             if path == '/health':
-                self._send_response({'status': 'ok', 'binary': self.bv.file.filename if self.bv else None})
+                self._send_response({
+                    'status': 'ok',
+                    'binary': self.bv.file.filename if self.bv else None,
+                    'view': self.view.id if self.view else None,
+                    'views': len(self.views.all()),
+                    'generation': self.generation.value if self.generation else None,
+                    'etag': self.generation.etag() if self.generation else None,
+                    'warmup': self.view.warmer.to_dict() if self.view and self.view.warmer else None
+                })
+            
+            elif path == '/views':
+                default = self.views.get()
+                self._send_response({'views': [
+                    dict(state.to_dict(), default=state is default) for state in self.views.all()
+                ]})
+            
+            elif path == '/resolve':
+                name = params.get('name', [None])[0]
+                if not name:
+                    self._send_response({'error': 'Missing name parameter'}, 400)
+                    return
+                
+                # Where is this name defined, and which views import it?
+                results = []
+                for state in self.views.all():
+                    with state.lock.read():
+                        for addr, kind in state.index.lookup(name):
+                            results.append({'view': state.id, 'name': state.name, 'address': f"0x{addr:x}", 'kind': kind})
+                        for symbol in state.bv.get_symbols_by_name(name):
+                            if symbol.type == bn.SymbolType.ImportedFunctionSymbol:
+                                results.append({
+                                    'view': state.id, 'name': state.name, 'address': f"0x{symbol.address:x}", 'kind': 'import'
+                                })
+                self._send_response({'name': name, 'results': results})
+            
+            elif path in self.LISTING_ENDPOINTS:
+                if not self.bv:
+                    self._send_response({'error': 'No binary loaded'}, 400)
+                    return
+                
+                cursor = params.get('cursor', [None])[0]
+                try:
+                    lines, total, next_cursor, generation = self.listings.page(
+                        self.LISTING_ENDPOINTS[path], offset, limit, cursor
+                    )
+                except CursorExpired as e:
+                    self._send_response({'error': str(e)}, 410)
+                    return
+                except ValueError as e:
+                    self._send_response({'error': str(e)}, 400)
+                    return
+                
+                # Page metadata travels in headers so the body stays one item per line
+                headers = {'X-Total-Count': str(total), 'X-Generation': str(generation)}
+                if next_cursor:
+                    headers['X-Next-Cursor'] = next_cursor
+                self._send_text_response(self._join_lines(lines), headers=headers)
+            
+            elif path == '/xrefs':
+                if not self.bv:
+                    self._send_response({'error': 'No binary loaded'}, 400)
+                    return
+                
+                name = params.get('name', [None])[0]
+                if not name:
+                    self._send_response({'error': 'Missing name parameter'}, 400)
+                    return
+                
+                # Find every function or data variable with this name
+                candidates = self.index.lookup(name)
+                if not candidates:
+                    self._send_text_response(f"Could not find '{name}'")
+                    return
+                
+                # Get cross-references
+                result = []
+                ref_count = 0
+                for target_addr, kind in candidates:
+                    if len(candidates) > 1:
+                        result.append(f"# {name} @ 0x{target_addr:x} ({kind})")
+                    for ref in self.bv.get_code_refs(target_addr):
+                        ref_count += 1
+                        func = self.bv.get_function_at(ref.address)
+                        if func:
+                            result.append(f"0x{ref.address:x} (in {func.name})")
+                        else:
+                            result.append(f"0x{ref.address:x}")
+                
+                self._send_text_response(self._join_lines(result) if ref_count else f"No cross-references found for '{name}'")
+            
+            elif path == '/jobs':
+                if not self.bv:
+                    self._send_response({'error': 'No binary loaded'}, 400)
+                    return
+                
+                job_id = params.get('id', [None])[0]
+                job = self.jobs.get(job_id)
+                if not job:
+                    self._send_response({'error': f"Unknown analysis job '{job_id}'" if job_id else 'No analysis jobs'}, 404)
+                    return
+                
+                self._send_response(job.to_dict())
             
-            elif path == '/methods' or path == '/functions':
+            elif path in ('/callers', '/callees'):
                 if not self.bv:
                     self._send_response({'error': 'No binary loaded'}, 400)
                     return
                 
-                functions = list(self.bv.functions)
-                total = len(functions)
-                paginated = functions[offset:offset+limit]
+                names = params.get('name', [])
+                if not names:
+                    self._send_response({'error': 'Missing name parameter'}, 400)
+                    return
+                try:
+                    depth = min(max(int(params.get('depth', [1])[0]), 1), self.MAX_GRAPH_DEPTH)
+                    max_nodes = min(max(int(params.get('limit', [500])[0]), 1), self.MAX_GRAPH_NODES)
+                except ValueError:
+                    self._send_response({'error': 'depth and limit must be integers'}, 400)
+                    return
+                
+                if not self._call_graph_ready():
+                    return
                 
-                result = [f.name for f in paginated]
-                self._send_text_response('\n'.join(result))
+                roots, unresolved = self._resolve_addresses(names)
+                nodes, edges, truncated = self.call_graph.walk(
+                    roots, path[1:], depth, max_nodes + len(roots), max_edges=max_nodes * 4
+                )
+                self._send_response({
+                    'direction': path[1:],
+                    'depth': depth,
+                    'roots': [self._node(addr) for addr in roots],
+                    'unresolved': unresolved,
+                    'nodes': [self._node(addr, depth=hops) for addr, hops in nodes.items() if hops > 0],
+                    'edges': [
+                        {'caller': f"0x{caller:x}", 'callee': f"0x{callee:x}", 'call_sites': [f"0x{site:x}" for site in sites]}
+                        for caller, callee, sites in edges
+                    ],
+                    'truncated': truncated
+                })
             
-            elif path == '/classes' or path == '/types':
+            elif path == '/callpath':
                 if not self.bv:
                     self._send_response({'error': 'No binary loaded'}, 400)
                     return
                 
-                types = list(self.bv.types.keys())
-                total = len(types)
-                paginated = types[offset:offset+limit]
+                sources = params.get('from', [])
+                targets = params.get('to', [])
+                if not sources or not targets:
+                    self._send_response({'error': 'Missing from or to parameter'}, 400)
+                    return
+                try:
+                    max_depth = min(max(int(params.get('max_depth', [6])[0]), 1), self.MAX_GRAPH_DEPTH)
+                    max_paths = min(max(int(params.get('max_paths', [10])[0]), 1), self.MAX_CALL_PATHS)
+                except ValueError:
+                    self._send_response({'error': 'max_depth and max_paths must be integers'}, 400)
+                    return
+                
+                if not self._call_graph_ready():
+                    return
                 
-                self._send_text_response('\n'.join(paginated))
+                source_addrs, unresolved = self._resolve_addresses(sources)
+                target_addrs, unresolved_targets = self._resolve_addresses(targets)
+                paths, truncated = self.call_graph.paths(source_addrs, target_addrs, max_depth, max_paths)
+                self._send_response({
+                    'unresolved': unresolved + unresolved_targets,
+                    'paths': [[self._node(addr) for addr in call_path] for call_path in paths],
+                    'truncated': truncated
+                })
             
-            elif path == '/imports':
+            elif path == '/search':
                 if not self.bv:
                     self._send_response({'error': 'No binary loaded'}, 400)
                     return
                 
-                imports = []
-                for symbol in self.bv.symbols.values():
-                    if symbol.type == bn.SymbolType.ImportedFunctionSymbol:
-                        imports.append(symbol.name)
+                query = params.get('q', [''])[0]
+                mode = params.get('mode', ['substring'])[0]
+                kinds = [k for k in params.get('kinds', [''])[0].split(',') if k]
+                case_sensitive = params.get('case_sensitive', ['0'])[0].lower() in ('1', 'true', 'yes')
+                try:
+                    time_limit = float(params.get('time_limit', [self.SEARCH_TIME_LIMIT])[0])
+                    if not (math.isfinite(time_limit) and time_limit > 0):
+                        raise ValueError
+                except ValueError:
+                    self._send_response({'error': 'time_limit must be a positive number of seconds'}, 400)
+                    return
+                time_limit = min(time_limit, self.MAX_SEARCH_TIME_LIMIT)
+                
+                if not query:
+                    self._send_response({'error': 'Missing q parameter'}, 400)
+                    return
+                if mode not in SearchIndex.MODES:
+                    self._send_response({'error': f"Unknown mode '{mode}', expected one of {', '.join(SearchIndex.MODES)}"}, 400)
+                    return
+                unknown = [k for k in kinds if k not in SearchIndex.KINDS]
+                if unknown:
+                    self._send_response({'error': f"Unknown kinds {unknown}, expected some of {', '.join(SearchIndex.KINDS)}"}, 400)
+                    return
+                
+                started = time.monotonic()
+                if not self.search_index.ensure_built(time_limit):
+                    self._send_response(
+                        {'error': 'Search index is still being built, retry shortly'}, 503, {'Retry-After': '1'}
+                    )
+                    return
+                
+                try:
+                    matches, truncated = self.search_index.search(
+                        query, mode, kinds, case_sensitive,
+                        time_limit=time_limit - (time.monotonic() - started)
+                    )
+                except re.error as e:
+                    self._send_response({'error': f'Invalid regex: {str(e)}'}, 400)
+                    return
                 
-                paginated = imports[offset:offset+limit]
-                self._send_text_response('\n'.join(paginated))
+                page = matches[offset:offset + limit]
+                result = {
+                    'query': query,
+                    'mode': mode,
+                    'total': len(matches),
+                    'truncated': truncated,
+                    'results': [
+                        {'kind': kind, 'name': text, 'address': f"0x{address:x}" if address is not None else None}
+                        for kind, text, address in page
+                    ]
+                }
+                if offset + len(page) < len(matches):
+                    result['next_offset'] = offset + len(page)
+                if truncated:
+                    self._etag = None  # A time-limited result may differ on the next run
+                self._send_response(result)
             
-            elif path == '/exports':
+            elif path == '/cache':
                 if not self.bv:
                     self._send_response({'error': 'No binary loaded'}, 400)
                     return
                 
-                exports = []
-                for symbol in self.bv.symbols.values():
-                    if symbol.type in [bn.SymbolType.FunctionSymbol, bn.SymbolType.DataSymbol]:
-                        if symbol.binding == bn.SymbolBinding.GlobalBinding:
-                            exports.append(symbol.name)
+                self._send_response({
+                    'decompile': self.decompile_cache.stats(),
+                    'store': self.view.store.stats() if self.view.store else None
+                })
+            
+            elif path == '/decompile/lines':
+                if not self.bv:
+                    self._send_response({'error': 'No binary loaded'}, 400)
+                    return
+                
+                limit = min(max(int(params.get('limit', [self.DECOMPILE_PAGE_LINES])[0]), 1), self.MAX_DECOMPILE_PAGE_LINES)
+                cursor = params.get('cursor', [None])[0]
+                try:
+                    if cursor:
+                        start, version, offset, stop = self._decode_line_cursor(cursor)
+                        func = self.bv.get_function_at(start)
+                    else:
+                        name = params.get('name', [None])[0]
+                        if not name:
+                            self._send_response({'error': 'Missing name parameter'}, 400)
+                            return
+                        funcs = self._find_functions(name)
+                        func = funcs[0] if funcs else None
+                    if not func:
+                        self._send_response({'error': 'Function not found'}, 410 if cursor else 404)
+                        return
+                    
+                    key, text, addresses = self._decompile_lines(func)
+                    lines = text.split('\n')
+                    if cursor:
+                        if version != [key[1], key[2]]:
+                            self._send_response(
+                                {'error': 'The function changed since the cursor was issued, request it again without a cursor'}, 410
+                            )
+                            return
+                    else:
+                        offset, stop = self._line_window(func, addresses, params)
+                except ValueError as e:
+                    self._send_response({'error': str(e)}, 400)
+                    return
+                except LookupError as e:
+                    self._send_response({'error': str(e)}, 404)
+                    return
                 
-                paginated = exports[offset:offset+limit]
-                self._send_text_response('\n'.join(paginated))
+                end = min(offset + limit, stop)
+                self._send_response({
+                    'function': func.name,
+                    'address': f"0x{func.start:x}",
+                    'total_lines': len(lines),
+                    'offset': offset,
+                    'end': end,
+                    'lines': lines[offset:end],
+                    'addresses': [f"0x{addr:x}" if addr != NO_LINE_ADDRESS else None for addr in addresses[offset:end]],
+                    'next_cursor': self._encode_line_cursor(func.start, key, end, stop) if end < stop else None
+                })
             
-            elif path == '/strings':
+            elif path == '/changes':
                 if not self.bv:
                     self._send_response({'error': 'No binary loaded'}, 400)
                     return
                 
-                strings = []
-                for string in self.bv.strings:
-                    strings.append(f"0x{string.start:x}: {string.value}")
+                try:
+                    since = int(params.get('since', [0])[0])
+                    limit = min(max(int(params.get('limit', [1000])[0]), 1), self.MAX_CHANGES)
+                    wait = float(params.get('wait', [0])[0])
+                    if not math.isfinite(wait):
+                        raise ValueError
+                except ValueError:
+                    self._send_response({'error': 'since and limit must be integers and wait a number of seconds'}, 400)
+                    return
+                wait = min(wait, self.MAX_CHANGES_WAIT)
                 
-                paginated = strings[offset:offset+limit]
-                self._send_text_response('\n'.join(paginated))
+                # Too many requests already waiting: answer right away rather than pin another worker
+                if wait > 0 and self.change_waiters.acquire(blocking=False):
+                    try:
+                        self.view.changes.wait(since, wait)
+                    finally:
+                        self.change_waiters.release()
+                
+                events, complete, current = self.view.changes.since(since, limit)
+                self._send_response({
+                    'instance': self.generation.instance,
+                    'since': since,
+                    'generation': current,
+                    # Older changes were dropped (or the server restarted): re-list to resync
+                    'complete': complete,
+                    'events': [ChangeFeed.to_dict(event) for event in events],
+                    'next': events[-1][0] if len(events) == limit else current
+                })
             
-            elif path == '/xrefs':
+            elif path == '/changes/stream':
+                if not self.bv:
+                    self._send_response({'error': 'No binary loaded'}, 400)
+                    return
+                
+                last = self.headers.get('Last-Event-ID') or params.get('since', [''])[0]
+                try:
+                    since = int(last) if last else self.generation.value
+                except ValueError:
+                    self._send_response({'error': 'Last-Event-ID and since must be generations (integers)'}, 400)
+                    return
+                if not self.change_waiters.acquire(blocking=False):
+                    self._send_response({'error': 'Too many change streams open, retry shortly'}, 503, {'Retry-After': '5'})
+                    return
+                try:
+                    self._send_body(
+                        self._change_stream(since), 'text/event-stream', headers={'Cache-Control': 'no-cache'}, stream=True
+                    )
+                finally:
+                    self.change_waiters.release()
+            
+            elif path == '/functions/table':
+                if not self.bv:
+                    self._send_response({'error': 'No binary loaded'}, 400)
+                    return
+                
+                fmt = params.get('format', ['json'])[0]
+                if fmt not in self.FUNCTION_TABLE_FORMATS:
+                    self._send_response({'error': f"Unknown format '{fmt}', expected one of {', '.join(self.FUNCTION_TABLE_FORMATS)}"}, 400)
+                    return
+                if fmt == 'arrow' and pyarrow is None:
+                    self._send_response({'error': 'format=arrow needs pyarrow in Binary Ninja\'s Python; use format=npz'}, 400)
+                    return
+                
+                table = self.view.function_table.get(self.FUNCTION_TABLE_WAIT)
+                if table is None:
+                    self._send_response(
+                        {'error': 'Function table is still being built, retry shortly'}, 503, {'Retry-After': '1'}
+                    )
+                    return
+                if table[0] != self.generation.value:
+                    self._etag = None  # An older generation's table, served while the new one is computed
+                
+                self._send_body(
+                    [FunctionTable.encode(table, fmt)], self.FUNCTION_TABLE_FORMATS[fmt],
+                    headers={'X-Generation': str(table[0])}
+                )
+            
+            elif path == '/similar':
                 if not self.bv:
                     self._send_response({'error': 'No binary loaded'}, 400)
                     return
@@ -121,46 +3630,74 @@ class BinaryNinjaMCPHandler(BaseHTTPRequestHandler):
                 if not name:
                     self._send_response({'error': 'Missing name parameter'}, 400)
                     return
+                limit = min(max(limit if 'limit' in params else 10, 1), self.MAX_SIMILAR)
+                threshold = self._threshold(params.get('threshold', [0.5])[0])
+                if threshold is None:
+                    return
                 
-                # Find the function or data variable
-                target_addr = None
-                for func in self.bv.functions:
-                    if func.name == name:
-                        target_addr = func.start
-                        break
+                functions = self._find_functions(name)
+                if not functions:
+                    self._send_response({'error': f"Function '{name}' not found"}, 404)
+                    return
+                if not self._similarity_ready(self.view):
+                    return
                 
-                if target_addr is None:
-                    for var in self.bv.data_vars:
-                        symbol = self.bv.get_symbol_at(var)
-                        if symbol and symbol.name == name:
-                            target_addr = var
-                            break
+                func = functions[0]
+                signature = self.view.similarity_index.get(func.start)
+                if signature is None:
+                    self._send_response({'error': f"Function '{func.name}' is too small to compare"}, 422)
+                    return
+                similar = self.view.similarity_index.similar(signature, threshold, limit, exclude=func.start)
+                results = []
+                for score, start in similar:
+                    other = self.bv.get_function_at(start)
+                    if other is not None:
+                        results.append({'name': other.name, 'address': f"0x{start:x}", 'similarity': round(score, 3)})
+                self._send_response({
+                    'function': self._node(func.start),
+                    'threshold': threshold,
+                    'results': results
+                })
+            
+            elif path == '/signatures':
+                if not self.bv:
+                    self._send_response({'error': 'No binary loaded'}, 400)
+                    return
+                if not self._similarity_ready(self.view):
+                    return
                 
-                if target_addr is None:
-                    self._send_text_response(f"Could not find '{name}'")
+                include_auto = params.get('all', ['0'])[0] in ('1', 'true')
+                self._send_response(self._export_signatures(self.view, include_auto))
+            
+            elif path == '/metrics':
+                self._send_text_response(self.metrics.render(self._collected_metrics()))
+            
+            elif path == '/lookup':
+                if not self.bv:
+                    self._send_response({'error': 'No binary loaded'}, 400)
                     return
                 
-                # Get cross-references
-                refs = self.bv.get_code_refs(target_addr)
-                result = []
-                for ref in refs:
-                    func = self.bv.get_function_at(ref.address)
-                    if func:
-                        result.append(f"0x{ref.address:x} (in {func.name})")
-                    else:
-                        result.append(f"0x{ref.address:x}")
+                name = params.get('name', [None])[0]
+                if not name:
+                    self._send_response({'error': 'Missing name parameter'}, 400)
+                    return
                 
-                self._send_text_response('\n'.join(result) if result else f"No cross-references found for '{name}'")
+                candidates = self.index.lookup(name)
+                self._send_response({
+                    'name': name,
+                    'candidates': [{'address': f"0x{addr:x}", 'kind': kind} for addr, kind in candidates]
+                })
             
             else:
+                self._endpoint = 'unknown'
                 self._send_response({'error': f'Unknown endpoint: {path}'}, 404)
         
         except Exception as e:
             bn.log_error(f"BinaryNinjaMCP Error: {str(e)}")
             self._send_response({'error': str(e)}, 500)
     
-    def do_POST(self):
-        """Handle POST requests"""
+    def _handle_post(self):
+        """Dispatch a POST request"""
         parsed = urlparse(self.path)
         path = parsed.path
         
@@ -178,37 +3715,109 @@ class BinaryNinjaMCPHandler(BaseHTTPRequestHandler):
                 if not func_name:
                     self._send_text_response('Missing function name in body', 400)
                     return
+                if self._not_modified(path):
+                    return
                 
                 # Find function by name
-                target_func = None
-                for func in self.bv.functions:
-                    if func.name == func_name:
-                        target_func = func
-                        break
-                
-                if not target_func:
+                target_funcs = self.index.lookup_functions(func_name)
+                if not target_funcs:
                     self._send_text_response(f"Function '{func_name}' not found")
                     return
                 
                 # Get decompiled code
                 try:
-                    # Use HLIL (High Level IL) as decompiled output
-                    hlil = target_func.hlil
-                    if hlil:
-                        decompiled = str(hlil)
+                    if len(target_funcs) == 1:
+                        decompiled = self._decompile(target_funcs[0])
                     else:
-                        decompiled = "// HLIL not available for this function\n"
-                        # Fall back to MLIL
-                        mlil = target_func.mlil
-                        if mlil:
-                            decompiled += str(mlil)
-                        else:
-                            decompiled += "// No intermediate representation available"
+                        # Duplicate names: return every candidate
+                        decompiled = self._join_lines((
+                            f"// {func_name} @ 0x{func.start:x}\n{self._decompile(func)}"
+                            for func in target_funcs
+                        ), batch=1)
                     
                     self._send_text_response(decompiled)
                 except Exception as e:
                     self._send_text_response(f"Error decompiling function: {str(e)}")
             
+            elif path == '/decompile/batch':
+                if not self.bv:
+                    self._send_response({'error': 'No binary loaded'}, 400)
+                    return
+                
+                try:
+                    data = json.loads(body)
+                except json.JSONDecodeError:
+                    self._send_response({'error': 'Invalid JSON in request body'}, 400)
+                    return
+                
+                targets = data.get('functions') if isinstance(data, dict) else data
+                if not isinstance(targets, list) or not targets:
+                    self._send_response({'error': 'Body must be a JSON list of function names or addresses'}, 400)
+                    return
+                if len(targets) > self.MAX_BATCH_SIZE:
+                    self._send_response({'error': f'At most {self.MAX_BATCH_SIZE} functions per batch'}, 400)
+                    return
+                
+                self._send_ndjson_stream(self._decompile_batch(targets))
+            
+            elif path == '/xrefs/batch':
+                if not self.bv:
+                    self._send_response({'error': 'No binary loaded'}, 400)
+                    return
+                
+                try:
+                    data = json.loads(body)
+                except json.JSONDecodeError:
+                    self._send_response({'error': 'Invalid JSON in request body'}, 400)
+                    return
+                
+                names = data.get('names') if isinstance(data, dict) else data
+                if not isinstance(names, list) or not names:
+                    self._send_response({'error': 'Body must be a JSON list of names'}, 400)
+                    return
+                if len(names) > self.MAX_BATCH_SIZE:
+                    self._send_response({'error': f'At most {self.MAX_BATCH_SIZE} names per batch'}, 400)
+                    return
+                try:
+                    per_name = min(int(data.get('limit', 100)) if isinstance(data, dict) else 100, self.MAX_XREFS_PER_NAME)
+                except (TypeError, ValueError):
+                    self._send_response({'error': 'limit must be an integer'}, 400)
+                    return
+                
+                results = {}
+                invalid = []  # Entries that aren't names can't key results, so they are reported by position
+                for position, name in enumerate(names):
+                    if not isinstance(name, str):
+                        invalid.append({
+                            'index': position,
+                            'name': name,
+                            'error': 'Names must be strings (function names or hex addresses)'
+                        })
+                        continue
+                    candidates, _ = self._resolve_addresses([name])
+                    refs = []
+                    truncated = False
+                    for target_addr in candidates:
+                        for ref in self.bv.get_code_refs(target_addr):
+                            if len(refs) >= per_name:
+                                truncated = True
+                                break
+                            func = ref.function or self.bv.get_function_at(ref.address)
+                            refs.append({
+                                'address': f"0x{ref.address:x}",
+                                'function': func.name if func else None,
+                                'target': f"0x{target_addr:x}"
+                            })
+                    results[name] = {
+                        'candidates': [f"0x{addr:x}" for addr in candidates],
+                        'refs': refs,
+                        'truncated': truncated
+                    }
+                response = {'results': results}
+                if invalid:
+                    response['invalid'] = invalid
+                self._send_response(response)
+            
             elif path == '/rename':
                 if not self.bv:
                     self._send_text_response('No binary loaded', 400)
@@ -224,45 +3833,144 @@ class BinaryNinjaMCPHandler(BaseHTTPRequestHandler):
                         self._send_text_response('Missing old_name or new_name', 400)
                         return
                     
-                    # Find and rename the function
-                    renamed = False
-                    for func in self.bv.functions:
-                        if func.name == old_name:
-                            func.name = new_name
-                            renamed = True
-                            break
-                    
-                    if not renamed:
-                        # Try data variables
-                        for var_addr in self.bv.data_vars:
-                            symbol = self.bv.get_symbol_at(var_addr)
-                            if symbol and symbol.name == old_name:
-                                self.bv.define_user_symbol(bn.Symbol(
-                                    symbol.type,
-                                    var_addr,
-                                    new_name
-                                ))
-                                renamed = True
-                                break
+                    # Find the function or data variable, preferring functions
+                    candidates = self.index.lookup(old_name)
+                    if not candidates:
+                        self._send_text_response(f"Could not find '{old_name}'")
+                        return
                     
-                    if renamed:
-                        self._send_text_response(f"Renamed '{old_name}' to '{new_name}'")
+                    target_addr, kind = candidates[0]
+                    if kind == 'function':
+                        func = self.bv.get_function_at(target_addr)
+                        if func is None:
+                            # The index is behind a removal that hasn't been notified yet
+                            self._send_text_response(f"Could not find '{old_name}'")
+                            return
+                        func.name = new_name
                     else:
-                        self._send_text_response(f"Could not find '{old_name}'")
+                        symbol = self.bv.get_symbol_at(target_addr)
+                        if symbol is None:
+                            self._send_text_response(f"Could not find '{old_name}'")
+                            return
+                        self.bv.define_user_symbol(bn.Symbol(
+                            symbol.type,
+                            target_addr,
+                            new_name
+                        ))
+                    
+                    # Don't wait for the symbol notification to catch up
+                    if self.view.store:
+                        self.view.store.drop_listings()
+                    self.index.update_address(target_addr)
+                    self.decompile_cache.invalidate_references(target_addr)
+                    self.listings.changed()
+                    self.generation.bump()  # Last, as in MCPViewNotification
+                    
+                    message = f"Renamed '{old_name}' to '{new_name}'"
+                    if len(candidates) > 1:
+                        others = ', '.join(f"0x{addr:x}" for addr, _ in candidates[1:])
+                        message += f" at 0x{target_addr:x} (other candidates not renamed: {others})"
+                    self._send_text_response(message)
                 
                 except json.JSONDecodeError:
                     self._send_text_response('Invalid JSON in request body', 400)
             
+            elif path == '/edit/batch':
+                if not self.bv:
+                    self._send_response({'error': 'No binary loaded'}, 400)
+                    return
+                
+                try:
+                    data = json.loads(body)
+                except json.JSONDecodeError:
+                    self._send_response({'error': 'Invalid JSON in request body'}, 400)
+                    return
+                
+                edits = data.get('edits') if isinstance(data, dict) else data
+                if not isinstance(edits, list) or not edits:
+                    self._send_response({'error': 'Body must be a JSON list of edits'}, 400)
+                    return
+                if len(edits) > self.MAX_BATCH_SIZE:
+                    self._send_response({'error': f'At most {self.MAX_BATCH_SIZE} edits per batch'}, 400)
+                    return
+                options = data if isinstance(data, dict) else {}
+                atomic = bool(options.get('atomic', False))
+                
+                results, committed = self._edit_batch(edits, atomic)
+                applied = sum(1 for result in results if result['status'] == 'ok')
+                job = None
+                if applied and options.get('analyze', True):
+                    job, _ = self.jobs.submit()
+                self._send_response({
+                    'results': results,
+                    'applied': applied,
+                    'failed': sum(1 for result in results if result['status'] == 'failed'),
+                    'atomic': atomic,
+                    'committed': committed,
+                    'analysis': job.to_dict() if job else None
+                })
+            
+            elif path == '/signatures/match':
+                if not self.bv:
+                    self._send_response({'error': 'No binary loaded'}, 400)
+                    return
+                
+                try:
+                    data = json.loads(body)
+                except json.JSONDecodeError:
+                    self._send_response({'error': 'Invalid JSON in request body'}, 400)
+                    return
+                if not isinstance(data, dict):
+                    self._send_response({'error': 'Body must be a signature export or {"source": view}'}, 400)
+                    return
+                threshold = self._threshold(data.get('threshold', 0.8))
+                if threshold is None:
+                    return
+                
+                if data.get('source'):
+                    source = self.views.get(data['source'])
+                    if source is None:
+                        self._send_response({'error': f"Unknown or ambiguous view '{data['source']}'"}, 404)
+                        return
+                    if not self._similarity_ready(source):
+                        return
+                    data = self._export_signatures(source, bool(data.get('all', False)))
+                elif data.get('format') != self.SIGNATURE_FORMAT or data.get('version') != self.SIGNATURE_VERSION:
+                    self._send_response({'error': 'Not a signature export from /signatures'}, 400)
+                    return
+                elif data.get('bins') != SimilarityIndex.BINS:
+                    self._send_response({'error': f"Signatures have {data.get('bins')} bins, expected {SimilarityIndex.BINS}"}, 400)
+                    return
+                if not self._similarity_ready(self.view):
+                    return
+                
+                try:
+                    matches, unmatched = self._match_signatures(data.get('functions', []), threshold)
+                except (KeyError, TypeError, ValueError) as e:
+                    self._send_response({'error': f'Invalid signature entry: {str(e)}'}, 400)
+                    return
+                self._send_response({
+                    'source': data.get('binary'),
+                    'threshold': threshold,
+                    'total': len(data.get('functions', [])),
+                    'matched': len(matches),
+                    'unmatched': unmatched,
+                    'matches': matches
+                })
+            
             elif path == '/analyze':
                 if not self.bv:
                     self._send_text_response('No binary loaded', 400)
                     return
                 
-                # Trigger analysis update
-                self.bv.update_analysis_and_wait()
-                self._send_text_response('Analysis updated')
+                # Trigger analysis update in the background and hand back a job to poll
+                job, coalesced = self.jobs.submit()
+                result = job.to_dict()
+                result['coalesced'] = coalesced
+                self._send_response(result, 202)
             
             else:
+                self._endpoint = 'unknown'
                 self._send_response({'error': f'Unknown endpoint: {path}'}, 404)
         
         except Exception as e:
@@ -273,34 +3981,109 @@ class BinaryNinjaMCPHandler(BaseHTTPRequestHandler):
 class BinaryNinjaMCPServer:
     """HTTP server for Binary Ninja MCP"""
     
-    def __init__(self, port=8080):
+    def __init__(self, port=8080, workers=4, queue_depth=32, decompile_cache_bytes=64 * 1024 * 1024, batch_workers=4,
+                 store_path=None, warm_functions=256, socket_path=None):
         self.port = port
+        self.socket_path = socket_path  # Listen on this Unix domain socket instead of the TCP port
+        self.batch_workers = batch_workers  # Threads decompiling /decompile/batch items
+        self.decompile_cache_bytes = decompile_cache_bytes  # Memory budget for rendered HLIL, per view
+        self.store_path = store_path  # SQLite file keeping HLIL and indexes across restarts, None to disable
+        self.warm_functions = warm_functions  # Functions pre-rendered per view after it is added, 0 to disable
+        self.store = None
+        self.workers = workers  # Size of the request worker pool
+        self.queue_depth = queue_depth  # Connections allowed to wait for a worker before 429
         self.server = None
         self.thread = None
     
+    @property
+    def url(self):
+        """Where clients reach the server, as the bridge's --binaryninja-server expects it"""
+        if self.socket_path:
+            return f"unix://{os.path.abspath(self.socket_path)}"
+        return f"http://localhost:{self.port}"
+    
     def start(self, bv):
-        """Start the HTTP server"""
-        if self.server:
-            bn.log_warn("BinaryNinjaMCP: Server already running")
-            return
-        
-        # Set the BinaryView for the handler
-        BinaryNinjaMCPHandler.bv = bv
-        
-        try:
-            self.server = HTTPServer(('localhost', self.port), BinaryNinjaMCPHandler)
+        """Start the HTTP server, or add bv to the views it serves if it is already running"""
+        if not self.server:
+            if self.socket_path and UnixWorkerPoolHTTPServer.address_family is None:
+                bn.log_error("BinaryNinjaMCP: Unix domain sockets are not supported on this platform, use the TCP port")
+                return
+            server_class = UnixWorkerPoolHTTPServer if self.socket_path else WorkerPoolHTTPServer
+            try:
+                self.server = server_class(
+                    os.path.abspath(self.socket_path) if self.socket_path else ('localhost', self.port),
+                    BinaryNinjaMCPHandler,
+                    workers=self.workers,
+                    queue_depth=self.queue_depth
+                )
+            except Exception as e:
+                bn.log_error(f"BinaryNinjaMCP: Failed to start server: {str(e)}")
+                return
+            BinaryNinjaMCPHandler.decompile_pool = ThreadPoolExecutor(
+                max_workers=self.batch_workers,
+                thread_name_prefix="BinaryNinjaMCP-decompile"
+            )
             self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
             self.thread.start()
-            bn.log_info(f"BinaryNinjaMCP: HTTP server started on http://localhost:{self.port}")
+            if self.store_path:
+                self._open_store()
+            bn.log_info(f"BinaryNinjaMCP: HTTP server started on {self.url} ({self.workers} workers)")
+        
+        return self.add_view(bv)
+    
+    def _open_store(self):
+        if sqlite3 is None:
+            bn.log_error("BinaryNinjaMCP: The persistent store needs the sqlite3 module")
+            return
+        try:
+            self.store = PersistentStore(self.store_path)
+            bn.log_info(f"BinaryNinjaMCP: Using the persistent store at {self.store_path}")
         except Exception as e:
-            bn.log_error(f"BinaryNinjaMCP: Failed to start server: {str(e)}")
+            bn.log_error(f"BinaryNinjaMCP: Failed to open the persistent store: {str(e)}")
+    
+    def add_view(self, bv):
+        """Serve bv alongside any views already open; returns its ViewState"""
+        state = BinaryNinjaMCPHandler.views.find(bv)
+        if state:
+            bn.log_warn(f"BinaryNinjaMCP: {state.name} is already served as view {state.id}")
+            return state
+        
+        # Index its symbols once, then keep everything current through notifications
+        state = BinaryNinjaMCPHandler.views.add(ViewState(bv, self.decompile_cache_bytes, self.store))
+        bv.register_notification(state.notification)
+        if self.warm_functions:
+            state.warmer = DecompileWarmer(state, BinaryNinjaMCPHandler.activity, self.warm_functions)
+            state.warmer.start()
+        bn.log_info(f"BinaryNinjaMCP: Serving {state.name} as view {state.id}")
+        return state
+    
+    def remove_view(self, bv):
+        """Stop serving bv; the server keeps running for the other views"""
+        state = BinaryNinjaMCPHandler.views.remove(bv)
+        if state:
+            bv.unregister_notification(state.notification)
+            if state.warmer:
+                state.warmer.stop()
+            bn.log_info(f"BinaryNinjaMCP: Stopped serving view {state.id} ({state.name})")
+        return state
     
     def stop(self):
         """Stop the HTTP server"""
         if self.server:
             self.server.shutdown()
+            self.server.server_close()
             self.server = None
             self.thread = None
+            for state in BinaryNinjaMCPHandler.views.clear():
+                state.bv.unregister_notification(state.notification)
+                if state.warmer:
+                    state.warmer.stop()
+            if BinaryNinjaMCPHandler.decompile_pool:
+                BinaryNinjaMCPHandler.decompile_pool.shutdown(wait=False, cancel_futures=True)
+                BinaryNinjaMCPHandler.decompile_pool = None
+            if self.store:
+                self.store.close()
+                self.store = None
             bn.log_info("BinaryNinjaMCP: HTTP server stopped")
 
 
@@ -309,17 +4092,26 @@ mcp_server = BinaryNinjaMCPServer()
 
 
 def start_mcp_server(bv):
-    """Plugin command to start MCP server"""
-    mcp_server.start(bv)
+    """Plugin command to start MCP server, or add this binary to the running one"""
+    state = mcp_server.start(bv)
+    if not state:
+        return
     bn.show_message_box(
         "Binary Ninja MCP",
-        f"MCP server started on http://localhost:8080\n\n"
+        f"MCP server running on {mcp_server.url}\n\n"
+        f"{state.name} is served as view '{state.id}' "
+        f"({len(BinaryNinjaMCPHandler.views.all())} open).\n"
         f"You can now connect Claude Desktop to this Binary Ninja instance.",
         bn.MessageBoxButtonSet.OKButtonSet,
         bn.MessageBoxIcon.InformationIcon
     )
 
 
+def remove_mcp_view(bv):
+    """Plugin command to stop serving this binary, leaving the server up for the others"""
+    mcp_server.remove_view(bv)
+
+
 def stop_mcp_server(bv):
     """Plugin command to stop MCP server"""
     mcp_server.stop()
@@ -334,10 +4126,16 @@ def stop_mcp_server(bv):
 # Register plugin commands
 PluginCommand.register(
     "Binary Ninja MCP\\Start Server",
-    "Start the MCP HTTP server for this binary",
+    "Start the MCP HTTP server for this binary, or add it to the running server",
     start_mcp_server
 )
 
+PluginCommand.register(
+    "Binary Ninja MCP\\Stop Serving This Binary",
+    "Remove this binary from the views the MCP HTTP server serves",
+    remove_mcp_view
+)
+
 PluginCommand.register(
     "Binary Ninja MCP\\Stop Server",
     "Stop the MCP HTTP server",
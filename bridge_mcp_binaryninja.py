@@ -6,203 +6,1235 @@ Connects MCP clients (like Claude Desktop) to Binary Ninja via HTTP
 
 import argparse
 import asyncio
+import bisect
+import functools
+import json
 import logging
-import requests
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
 from typing import Any
 from mcp.server.fastmcp import FastMCP
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("binaryninja-mcp")
+# httpx logs every request at INFO
+logging.getLogger("httpx").setLevel(logging.WARNING)
 
-# Global Binary Ninja server URL
+# Global Binary Ninja server URL, and the Unix domain socket it is reached through if any (see set_server())
 binaryninja_server_url = "http://127.0.0.1:8080"
+binaryninja_socket_path = None
+
+# Shared pooled async HTTP client to Binary Ninja, created on the running event loop by get_client()
+client = None
+_client_loop = None
+_backend_semaphore = None
+
+# Connection pool and backpressure settings, see configure_client()
+client_pool_size = 10  # Keep-alive connections to Binary Ninja
+max_concurrency = 8  # Requests in flight to Binary Ninja at once
+
+# Retry policy for idempotent GETs
+get_retries = 3
+retry_backoff = 0.2  # Base delay in seconds, doubled per attempt and jittered
+RETRY_STATUSES = (429, 502, 503, 504)
+RETRY_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.ReadError, httpx.RemoteProtocolError)
+# Most edits the plugin accepts in one /edit/batch request
+EDIT_BATCH_SIZE = 1000
+
+# Per-tool request timeouts in seconds, overridable with --tool-timeout
+tool_timeouts = {
+    "default": 10.0,
+    "decompile_function": 30.0,
+    "rename_function": 30.0,
+    "batch_edit": 60.0,
+    "export_signatures": 60.0,
+    "match_signatures": 60.0,
+    "update_analysis": 30.0,
+    "check_connection": 5.0,
+}
+
+# Identical requests currently in flight, shared by every caller asking for them
+_inflight = {}
+
+# Responses tagged by the plugin with its view generation (ETag), see cached_fetch()
+cache_ttl = 2.0  # Seconds an entry is served without revalidating
+cache_max_entries = 512
+
+# Directory export_signatures and match_signatures may use, set with --signatures-dir;
+# None keeps the tools away from the filesystem
+signatures_dir = None
+_response_cache = OrderedDict()  # request key -> (etag, value, last validated)
 
 # Initialize FastMCP server
 mcp = FastMCP("binaryninja-mcp")
 
 
-def safe_get(endpoint: str, params: dict = None) -> list:
+class Metrics:
+    """
+    Thread-safe counters, gauges and histograms, rendered in the Prometheus
+    text format. `definitions` maps each metric name to (type, help).
+    """
+    
+    BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+    
+    def __init__(self, prefix: str, definitions: dict):
+        self.prefix = prefix
+        self.definitions = definitions
+        self._lock = threading.Lock()
+        self._values = {name: {} for name in definitions}  # name -> {labels: value or histogram}
+    
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        """Add to a counter or gauge"""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            samples = self._values[name]
+            samples[key] = samples.get(key, 0) + amount
+    
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Record a histogram observation"""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            samples = self._values[name]
+            histogram = samples.get(key)
+            if histogram is None:
+                # Per-bucket counts, then sum and count
+                histogram = samples[key] = [0] * len(self.BUCKETS) + [0.0, 0]
+            index = bisect.bisect_left(self.BUCKETS, value)
+            if index < len(self.BUCKETS):
+                histogram[index] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+    
+    @staticmethod
+    def _labels(key, extra=()) -> str:
+        pairs = list(key) + list(extra)
+        if not pairs:
+            return ""
+        escape = lambda value: str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in pairs) + "}"
+    
+    def render(self) -> str:
+        """Prometheus exposition text"""
+        with self._lock:
+            values = {
+                name: {key: list(value) if isinstance(value, list) else value for key, value in samples.items()}
+                for name, samples in self._values.items()
+            }
+        
+        lines = []
+        for name, (kind, text) in self.definitions.items():
+            full_name = f"{self.prefix}_{name}"
+            lines.append(f"# HELP {full_name} {text}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            for key, value in sorted(values[name].items()):
+                if kind != "histogram":
+                    lines.append(f"{full_name}{self._labels(key)} {value}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.BUCKETS, value):
+                    cumulative += count
+                    lines.append(f"{full_name}_bucket{self._labels(key, [('le', bound)])} {cumulative}")
+                lines.append(f"{full_name}_bucket{self._labels(key, [('le', '+Inf')])} {value[-1]}")
+                lines.append(f"{full_name}_sum{self._labels(key)} {value[-2]}")
+                lines.append(f"{full_name}_count{self._labels(key)} {value[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics("binaryninja_mcp_bridge", {
+    "tool_calls_total": ("counter", "MCP tool calls, by tool and outcome (ok or error)"),
+    "tool_duration_seconds": ("histogram", "MCP tool call duration, by tool"),
+    "tools_in_flight": ("gauge", "MCP tool calls being served, by tool"),
+    "backend_requests_total": ("counter", "Requests sent to Binary Ninja, by method, endpoint and status"),
+    "backend_request_duration_seconds": ("histogram", "Round trip of requests to Binary Ninja, by method and endpoint"),
+    "backend_response_bytes_total": ("counter", "Response bytes received from Binary Ninja (before decompression), by endpoint"),
+    "backend_retries_total": ("counter", "GET requests retried after a connection failure or busy response, by endpoint"),
+    "cache_requests_total": ("counter", "Response cache lookups, by result (hit, revalidated or miss)"),
+    "coalesced_requests_total": ("counter", "Requests that joined an identical one already in flight"),
+})
+
+
+def instrumented(tool):
+    """
+    Record call count, outcome and duration of an MCP tool.
+    """
+    name = tool.__name__
+    
+    @functools.wraps(tool)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        outcome = "error"
+        metrics.inc("tools_in_flight", tool=name)
+        try:
+            result = await tool(*args, **kwargs)
+            if not is_error(result):
+                outcome = "ok"
+            return result
+        finally:
+            metrics.inc("tools_in_flight", -1, tool=name)
+            metrics.inc("tool_calls_total", tool=name, outcome=outcome)
+            metrics.observe("tool_duration_seconds", time.perf_counter() - started, tool=name)
+    
+    return wrapper
+
+
+def is_error(result: Any) -> bool:
+    """
+    Whether a tool result reports a failure, in any of the shapes tools return.
+    """
+    if isinstance(result, dict):
+        return "error" in result or result.get("status") == "error"
+    if isinstance(result, list):
+        result = result[0] if len(result) == 1 else ""
+    return isinstance(result, str) and result.startswith(("Error ", "Error:", "Request failed"))
+
+
+def record_backend(method: str, endpoint: str, response: httpx.Response, started: float) -> None:
+    """
+    Record one request to Binary Ninja once its body has been read.
+    """
+    metrics.inc("backend_requests_total", method=method, endpoint=endpoint, status=response.status_code)
+    metrics.observe("backend_request_duration_seconds", time.perf_counter() - started, method=method, endpoint=endpoint)
+    metrics.inc("backend_response_bytes_total", response.num_bytes_downloaded, endpoint=endpoint)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Serves the bridge's metrics at /metrics for Prometheus to scrape"""
+    
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        logger.debug(f"metrics: {format % args}")
+
+
+def serve_metrics(host: str, port: int) -> ThreadingHTTPServer:
+    """
+    Serve /metrics on a background thread, independent of the MCP transport.
+    """
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
+
+
+def configure_client(pool_size: int = 10, retries: int = 3, concurrency: int = 8) -> None:
+    """
+    Set the connection pool size, GET retries and backend concurrency limit.
+    Takes effect the next time get_client() creates the client.
+    """
+    global client, _client_loop, client_pool_size, max_concurrency, get_retries
+    client_pool_size = pool_size
+    max_concurrency = concurrency
+    get_retries = retries
+    client = None
+    _client_loop = None
+
+
+def set_server(url: str) -> None:
+    """
+    Point the bridge at Binary Ninja: an http:// URL, or unix:///path/to/socket
+    for a plugin listening on a Unix domain socket.
+    Takes effect the next time get_client() creates the client.
+    """
+    global binaryninja_server_url, binaryninja_socket_path, client, _client_loop
+    if url.startswith("unix://"):
+        binaryninja_socket_path = url[len("unix://"):]
+        # The host only fills in the Host header; connections go to the socket
+        binaryninja_server_url = "http://localhost"
+    else:
+        binaryninja_socket_path = None
+        binaryninja_server_url = url.rstrip("/")
+    client = None
+    _client_loop = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Return the pooled keep-alive client for the running event loop.
+    """
+    global client, _client_loop, _backend_semaphore
+    loop = asyncio.get_running_loop()
+    if client is None or _client_loop is not loop:
+        limits = httpx.Limits(
+            max_connections=client_pool_size,
+            max_keepalive_connections=client_pool_size,
+            # Drop idle connections before the plugin's 15s keep-alive timeout does
+            keepalive_expiry=5.0
+        )
+        if binaryninja_socket_path:
+            # A custom transport takes the pool limits itself
+            client = httpx.AsyncClient(transport=httpx.AsyncHTTPTransport(uds=binaryninja_socket_path, limits=limits))
+        else:
+            client = httpx.AsyncClient(limits=limits)
+        _client_loop = loop
+        _backend_semaphore = asyncio.Semaphore(max_concurrency)
+    return client
+
+
+def timeout_for(tool: str) -> float:
+    """
+    Request timeout for a tool.
+    """
+    return tool_timeouts.get(tool, tool_timeouts["default"])
+
+
+async def cached_fetch(key: tuple, fetch) -> Any:
+    """
+    Serve a response from the cache, revalidating it with the plugin once
+    its TTL has passed. fetch(etag) performs the request, conditional on
+    etag when given, and returns (status, etag, value); a 304 keeps the
+    cached value for another TTL.
+    """
+    entry = _response_cache.get(key)
+    if entry and time.monotonic() - entry[2] < cache_ttl:
+        _response_cache.move_to_end(key)
+        metrics.inc("cache_requests_total", result="hit")
+        return entry[1]
+    
+    status, etag, value = await fetch(entry[0] if entry else None)
+    metrics.inc("cache_requests_total", result="revalidated" if status == 304 and entry else "miss")
+    if status == 304 and entry:
+        value = entry[1]
+        etag = entry[0]
+    elif status != 200 or not etag:
+        _response_cache.pop(key, None)
+        return value
+    
+    _response_cache[key] = (etag, value, time.monotonic())
+    _response_cache.move_to_end(key)
+    while len(_response_cache) > cache_max_entries:
+        _response_cache.popitem(last=False)
+    return value
+
+
+def invalidate_cache() -> None:
+    """
+    Drop cached responses after this bridge changed the binary, rather than
+    serving them out for the rest of their TTL.
+    """
+    _response_cache.clear()
+
+
+async def coalesce(key: tuple, factory) -> Any:
+    """
+    Run factory() once for all concurrent callers with the same key.
+    """
+    future = _inflight.get(key)
+    if future is None:
+        future = asyncio.ensure_future(factory())
+        _inflight[key] = future
+        
+        def _forget(done):
+            if _inflight.get(key) is done:
+                del _inflight[key]
+        
+        future.add_done_callback(_forget)
+    else:
+        metrics.inc("coalesced_requests_total")
+    # Shield so one caller being cancelled doesn't cancel the others
+    return await asyncio.shield(future)
+
+
+async def _get_with_retries(endpoint: str, send) -> httpx.Response:
+    """
+    Run send(client, url) until it returns a response worth keeping.
+    Retries connection failures and busy responses (429/5xx) with jittered
+    exponential backoff, honouring Retry-After.
+    """
+    url = f"{binaryninja_server_url}/{endpoint}"
+    http = get_client()
+    for attempt in range(get_retries + 1):
+        delay = retry_backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+        started = time.perf_counter()
+        try:
+            async with _backend_semaphore:
+                response = await send(http, url)
+            record_backend("GET", endpoint, response, started)
+        except RETRY_ERRORS:
+            if attempt == get_retries:
+                raise
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt == get_retries:
+                return response
+            try:
+                delay = float(response.headers.get("Retry-After", "")) + random.uniform(0, retry_backoff)
+            except ValueError:
+                pass
+        metrics.inc("backend_retries_total", endpoint=endpoint)
+        logger.debug(f"Retrying GET /{endpoint} in {delay:.2f}s (attempt {attempt + 1}/{get_retries})")
+        await asyncio.sleep(delay)
+
+
+async def http_get(endpoint: str, params: dict = None, timeout: float = 10) -> httpx.Response:
+    """
+    GET from Binary Ninja server on the shared client, with retries.
+    """
+    return await _get_with_retries(
+        endpoint, lambda http, url: http.get(url, params=params, timeout=timeout)
+    )
+
+
+async def http_get_lines(endpoint: str, params: dict = None, timeout: float = 10, etag: str = None) -> tuple:
+    """
+    GET from Binary Ninja server, with retries, decoding a successful body
+    line by line as its (possibly compressed) chunks arrive.
+    Returns (response, lines); error bodies are left on response.text.
+    """
+    lines = []
+    headers = {"If-None-Match": etag} if etag else None
+    
+    async def send(http, url):
+        lines.clear()
+        async with http.stream("GET", url, params=params, headers=headers, timeout=timeout) as response:
+            if response.is_success:
+                async for line in response.aiter_lines():
+                    lines.append(line)
+            else:
+                await response.aread()
+        return response
+    
+    response = await _get_with_retries(endpoint, send)
+    return response, lines
+
+
+async def http_post(endpoint: str, data: str, timeout: float = 30, etag: str = None, params: dict = None) -> httpx.Response:
+    """
+    POST to Binary Ninja server on the shared client (never retried).
+    """
+    headers = {"Content-Type": "text/plain; charset=utf-8"}
+    if etag:
+        headers["If-None-Match"] = etag
+    http = get_client()
+    started = time.perf_counter()
+    async with _backend_semaphore:
+        response = await http.post(
+            f"{binaryninja_server_url}/{endpoint}",
+            params=params,
+            content=data.encode("utf-8"),
+            headers=headers,
+            timeout=timeout
+        )
+    record_backend("POST", endpoint, response, started)
+    return response
+
+
+async def safe_get(endpoint: str, params: dict = None, timeout: float = None) -> list:
     """
     Perform a GET request to Binary Ninja server.
     Returns response as list of lines.
     """
-    if params is None:
-        params = {}
+    async def fetch(etag):
+        try:
+            response, lines = await http_get_lines(
+                endpoint, params, timeout=timeout or timeout_for("default"), etag=etag
+            )
+            if response.is_success or response.status_code == 304:
+                return response.status_code, response.headers.get("ETag"), lines
+            else:
+                return response.status_code, None, [f"Error {response.status_code}: {response.text.strip()}"]
+        except Exception as e:
+            return None, None, [f"Request failed: {str(e)}"]
     
-    # Build query string
-    query_parts = [f"{k}={v}" for k, v in params.items()]
-    query_string = "&".join(query_parts)
-    url = f"{binaryninja_server_url}/{endpoint}"
-    if query_string:
-        url += "?" + query_string
+    key = ("GET", endpoint, tuple(sorted((params or {}).items())))
+    return list(await coalesce(key, lambda: cached_fetch(key, fetch)))
+
+
+async def safe_get_page(endpoint: str, params: dict = None, timeout: float = None) -> dict:
+    """
+    Perform a GET request to a Binary Ninja listing endpoint.
+    Returns the page as {"items", "total", "next_cursor"}, or an error dict.
+    """
+    async def fetch(etag):
+        try:
+            response, lines = await http_get_lines(
+                endpoint, params, timeout=timeout or timeout_for("default"), etag=etag
+            )
+            if response.status_code == 304:
+                return 304, None, None
+            if not response.is_success:
+                return response.status_code, None, {"error": f"Error {response.status_code}: {response.text.strip()}"}
+            total = response.headers.get("X-Total-Count")
+            return response.status_code, response.headers.get("ETag"), {
+                "items": lines,
+                "total": int(total) if total is not None else None,
+                "next_cursor": response.headers.get("X-Next-Cursor")
+            }
+        except Exception as e:
+            return None, None, {"error": f"Request failed: {str(e)}"}
     
+    params = {k: v for k, v in (params or {}).items() if v not in (None, "")}
+    key = ("PAGE", endpoint, tuple(sorted(params.items())))
+    page = await coalesce(key, lambda: cached_fetch(key, fetch))
+    return dict(page, items=list(page["items"])) if "items" in page else dict(page)
+
+
+async def safe_post(endpoint: str, data: str, timeout: float = 30, idempotent: bool = False, params: dict = None) -> str:
+    """
+    Perform a POST request to Binary Ninja server.
+    Returns response as string. Identical concurrent idempotent POSTs
+    (e.g. decompiling the same function) share one upstream request, and
+    their responses are cached until the binary changes.
+    """
+    async def send(etag=None):
+        try:
+            response = await http_post(endpoint, data, timeout=timeout, etag=etag, params=params)
+            if response.is_success or response.status_code == 304:
+                return response.status_code, response.headers.get("ETag"), response.text.strip()
+            else:
+                return response.status_code, None, f"Error {response.status_code}: {response.text.strip()}"
+        except Exception as e:
+            return None, None, f"Request failed: {str(e)}"
+    
+    if not idempotent:
+        return (await send())[2]
+    key = ("POST", endpoint, tuple(sorted((params or {}).items())), data)
+    return await coalesce(key, lambda: cached_fetch(key, send))
+
+
+async def get_json(endpoint: str, params: dict = None, timeout: float = 10) -> dict:
+    """
+    Perform a GET request to Binary Ninja server.
+    Returns the decoded JSON response, or an error dict.
+    """
     try:
-        response = requests.get(url, timeout=10)
-        response.encoding = 'utf-8'
-        if response.ok:
-            return response.text.splitlines()
-        else:
-            return [f"Error {response.status_code}: {response.text.strip()}"]
+        response = await http_get(endpoint, params, timeout=timeout)
+        try:
+            data = response.json()
+        except ValueError:
+            data = {"status": "error", "message": response.text.strip()}
+        if not response.is_success and "error" not in data:
+            data["error"] = f"HTTP {response.status_code}"
+        return data
     except Exception as e:
-        return [f"Request failed: {str(e)}"]
+        return {"status": "error", "message": str(e)}
 
 
-def safe_post(endpoint: str, data: str) -> str:
+async def post_json(endpoint: str, payload: Any, timeout: float = 30, params: dict = None) -> dict:
     """
-    Perform a POST request to Binary Ninja server.
-    Returns response as string.
+    POST a JSON body to Binary Ninja server.
+    Returns the decoded JSON response, or an error dict.
     """
     try:
-        response = requests.post(
-            f"{binaryninja_server_url}/{endpoint}",
-            data=data.encode("utf-8"),
-            headers={"Content-Type": "text/plain; charset=utf-8"},
-            timeout=30
-        )
-        response.encoding = 'utf-8'
-        if response.ok:
-            return response.text.strip()
-        else:
-            return f"Error {response.status_code}: {response.text.strip()}"
+        response = await http_post(endpoint, json.dumps(payload), timeout=timeout, params=params)
+        try:
+            data = response.json()
+        except ValueError:
+            data = {"status": "error", "message": response.text.strip()}
+        if not response.is_success and "error" not in data:
+            data["error"] = f"HTTP {response.status_code}"
+        return data
     except Exception as e:
-        return f"Request failed: {str(e)}"
+        return {"status": "error", "message": str(e)}
 
 
 @mcp.tool()
-def list_functions(offset: int = 0, limit: int = 100) -> list:
+@instrumented
+async def list_functions(offset: int = 0, limit: int = 100, cursor: str = "", view: str = "") -> dict:
     """
     List all function names in the binary with pagination.
+    Pass the returned next_cursor back as `cursor` to fetch the following
+    page; cursors stay consistent while the binary is being re-analyzed.
     
     Args:
-        offset: Starting index (default: 0)
+        offset: Starting index, ignored when a cursor is given (default: 0)
         limit: Maximum number of results (default: 100)
+        cursor: next_cursor from a previous call (default: start of the listing)
+        view: View id, file hash or file name from list_views (default: the first binary opened)
     
     Returns:
-        List of function names
+        items: List of function names
+        total: Total number of items in the listing
+        next_cursor: Cursor for the next page, or null on the last page
     """
-    return safe_get("functions", {"offset": offset, "limit": limit})
+    params = {"offset": offset, "limit": limit, "cursor": cursor, "view": view}
+    return await safe_get_page("functions", params, timeout_for("list_functions"))
 
 
 @mcp.tool()
-def list_types(offset: int = 0, limit: int = 100) -> list:
+@instrumented
+async def list_types(offset: int = 0, limit: int = 100, cursor: str = "", view: str = "") -> dict:
     """
     List all type names in the binary with pagination.
+    Pass the returned next_cursor back as `cursor` to fetch the following
+    page; cursors stay consistent while the binary is being re-analyzed.
     
     Args:
-        offset: Starting index (default: 0)
+        offset: Starting index, ignored when a cursor is given (default: 0)
         limit: Maximum number of results (default: 100)
+        cursor: next_cursor from a previous call (default: start of the listing)
+        view: View id, file hash or file name from list_views (default: the first binary opened)
     
     Returns:
-        List of type names
+        items: List of type names
+        total: Total number of items in the listing
+        next_cursor: Cursor for the next page, or null on the last page
     """
-    return safe_get("types", {"offset": offset, "limit": limit})
+    params = {"offset": offset, "limit": limit, "cursor": cursor, "view": view}
+    return await safe_get_page("types", params, timeout_for("list_types"))
 
 
 @mcp.tool()
-def list_imports(offset: int = 0, limit: int = 100) -> list:
+@instrumented
+async def list_imports(offset: int = 0, limit: int = 100, cursor: str = "", view: str = "") -> dict:
     """
     List all imported functions in the binary with pagination.
+    Pass the returned next_cursor back as `cursor` to fetch the following
+    page; cursors stay consistent while the binary is being re-analyzed.
     
     Args:
-        offset: Starting index (default: 0)
+        offset: Starting index, ignored when a cursor is given (default: 0)
         limit: Maximum number of results (default: 100)
+        cursor: next_cursor from a previous call (default: start of the listing)
+        view: View id, file hash or file name from list_views (default: the first binary opened)
     
     Returns:
-        List of imported function names
+        items: List of imported function names
+        total: Total number of items in the listing
+        next_cursor: Cursor for the next page, or null on the last page
     """
-    return safe_get("imports", {"offset": offset, "limit": limit})
+    params = {"offset": offset, "limit": limit, "cursor": cursor, "view": view}
+    return await safe_get_page("imports", params, timeout_for("list_imports"))
 
 
 @mcp.tool()
-def list_exports(offset: int = 0, limit: int = 100) -> list:
+@instrumented
+async def list_exports(offset: int = 0, limit: int = 100, cursor: str = "", view: str = "") -> dict:
     """
     List all exported symbols in the binary with pagination.
+    Pass the returned next_cursor back as `cursor` to fetch the following
+    page; cursors stay consistent while the binary is being re-analyzed.
     
     Args:
-        offset: Starting index (default: 0)
+        offset: Starting index, ignored when a cursor is given (default: 0)
         limit: Maximum number of results (default: 100)
+        cursor: next_cursor from a previous call (default: start of the listing)
+        view: View id, file hash or file name from list_views (default: the first binary opened)
     
     Returns:
-        List of exported symbol names
+        items: List of exported symbol names
+        total: Total number of items in the listing
+        next_cursor: Cursor for the next page, or null on the last page
     """
-    return safe_get("exports", {"offset": offset, "limit": limit})
+    params = {"offset": offset, "limit": limit, "cursor": cursor, "view": view}
+    return await safe_get_page("exports", params, timeout_for("list_exports"))
 
 
 @mcp.tool()
-def list_strings(offset: int = 0, limit: int = 100) -> list:
+@instrumented
+async def list_strings(offset: int = 0, limit: int = 100, cursor: str = "", view: str = "") -> dict:
     """
     List strings found in the binary with pagination.
+    Pass the returned next_cursor back as `cursor` to fetch the following
+    page; cursors stay consistent while the binary is being re-analyzed.
+    
+    Args:
+        offset: Starting index, ignored when a cursor is given (default: 0)
+        limit: Maximum number of results (default: 100)
+        cursor: next_cursor from a previous call (default: start of the listing)
+        view: View id, file hash or file name from list_views (default: the first binary opened)
+    
+    Returns:
+        items: List of strings with their addresses
+        total: Total number of items in the listing
+        next_cursor: Cursor for the next page, or null on the last page
+    """
+    params = {"offset": offset, "limit": limit, "cursor": cursor, "view": view}
+    return await safe_get_page("strings", params, timeout_for("list_strings"))
+
+
+@mcp.tool()
+@instrumented
+async def search(
+    query: str,
+    mode: str = "substring",
+    kinds: str = "",
+    offset: int = 0,
+    limit: int = 100,
+    case_sensitive: bool = False,
+    view: str = ""
+) -> dict:
+    """
+    Search names and strings in the binary on the Binary Ninja side, instead
+    of paging through the list_* tools. Results are ranked: exact matches
+    first, then prefix matches, then matches at a word boundary.
     
     Args:
-        offset: Starting index (default: 0)
+        query: Text to look for (a Python regular expression when mode is "regex")
+        mode: "substring", "prefix" or "regex" (default: substring)
+        kinds: Comma-separated subset of functions,imports,exports,types,strings (default: all)
+        offset: Starting index into the ranked results (default: 0)
         limit: Maximum number of results (default: 100)
+        case_sensitive: Match case exactly (default: False)
+        view: View id, file hash or file name from list_views (default: the first binary opened)
     
     Returns:
-        List of strings with their addresses
+        results: Matches with kind, name and address
+        total: Number of matches found
+        truncated: Whether the search hit its time or result limit before finishing
+        next_offset: Offset of the next page, if there is one
     """
-    return safe_get("strings", {"offset": offset, "limit": limit})
+    params = {
+        "q": query,
+        "mode": mode,
+        "kinds": kinds,
+        "offset": offset,
+        "limit": limit,
+        "case_sensitive": int(case_sensitive),
+        "view": view
+    }
+    return await get_json("search", params, timeout_for("search"))
 
 
 @mcp.tool()
-def decompile_function(name: str) -> str:
+@instrumented
+async def decompile_function(
+    name: str, offset: int = 0, limit: int = 0, address: str = "", cursor: str = "", view: str = ""
+) -> str:
     """
     Decompile a specific function by name and return the decompiled code.
+    For very large functions, read it a page at a time: give a `limit`, and
+    optionally an `offset` or the hex `address` to start from, then pass the
+    cursor from the header line to get the next page.
     
     Args:
         name: Name of the function to decompile
+        offset: First line to return when paging (default: 0)
+        limit: Lines per page, at most 5000 (default: 0, the whole function)
+        address: Start the page at the line for this hex address (default: none)
+        cursor: Cursor from a previous page's header to continue from
+        view: View id, file hash or file name from list_views (default: the first binary opened)
     
     Returns:
-        Decompiled function code (High Level IL)
+        Decompiled function code (High Level IL). A page starts with a
+        `//` header giving its line range, the total line count and the
+        cursor for the next page, and each line is prefixed with its address
     """
-    return safe_post("decompile", name)
+    if not (limit or offset or address or cursor):
+        return await safe_post(
+            "decompile", name, timeout_for("decompile_function"), idempotent=True, params={"view": view}
+        )
+    
+    params = {"name": name, "offset": offset, "address": address, "cursor": cursor, "view": view}
+    if limit:
+        params["limit"] = limit
+    page = await get_json("decompile/lines", params, timeout_for("decompile_function"))
+    if "lines" not in page:
+        return f"Error: {page.get('error') or page.get('message')}"
+    header = (
+        f"// {page['function']} @ {page['address']}: lines {page['offset']}-{page['end'] - 1} "
+        f"of {page['total_lines']}"
+    )
+    header += f"; next page: cursor={page['next_cursor']}" if page["next_cursor"] else "; end"
+    width = max((len(addr) for addr in page["addresses"] if addr), default=0)
+    body = [f"{addr or '':<{width}}  {line}" for addr, line in zip(page["addresses"], page["lines"])]
+    return "\n".join([header] + body)
 
 
 @mcp.tool()
-def rename_function(old_name: str, new_name: str) -> str:
+@instrumented
+async def decompile_functions(names: list[str], time_budget: float = 60, view: str = "") -> dict:
+    """
+    Decompile many functions in one request. Binary Ninja decompiles them in
+    parallel and streams each result back as soon as it is ready.
+    
+    Args:
+        names: Function names or hex addresses (e.g. "0x401000") to decompile
+        time_budget: Seconds to collect results before returning what has arrived (default: 60)
+        view: View id, file hash or file name from list_views (default: the first binary opened)
+    
+    Returns:
+        functions: One entry per decompiled function (name, function, address, and decompiled or error)
+        missing: Requested names with no result yet when the time budget ran out
+        complete: Whether every requested function was returned
+    """
+    results = []
+    seen = set()
+    complete = False
+    
+    async def collect():
+        nonlocal complete
+        http = get_client()
+        started = time.perf_counter()
+        async with _backend_semaphore:
+            async with http.stream(
+                "POST",
+                f"{binaryninja_server_url}/decompile/batch",
+                params={"view": view},
+                json={"functions": names},
+                timeout=httpx.Timeout(time_budget, connect=5.0)
+            ) as response:
+                try:
+                    if not response.is_success:
+                        await response.aread()
+                        return f"Error {response.status_code}: {response.text.strip()}"
+                    
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        try:
+                            item = json.loads(line)
+                        except ValueError:
+                            # Truncated or garbled stream: keep what arrived before it
+                            return f"Error: malformed result line from server: {line[:200]}"
+                        if item.get("done"):
+                            complete = True
+                            break
+                        results.append(item)
+                        seen.add(item.get("name"))
+                finally:
+                    record_backend("POST", "decompile/batch", response, started)
+        return None
+    
+    error = None
+    try:
+        error = await asyncio.wait_for(collect(), timeout=time_budget)
+    except (asyncio.TimeoutError, httpx.HTTPError) as e:
+        # Out of time (or connection lost): return what arrived
+        logger.warning(f"decompile_functions stopped early: {str(e) or type(e).__name__}")
+    
+    result = {
+        "functions": results,
+        "missing": [name for name in names if name not in seen],
+        "complete": complete
+    }
+    if error:
+        result["error"] = error
+    return result
+
+
+@mcp.tool()
+@instrumented
+async def rename_function(old_name: str, new_name: str, view: str = "") -> str:
     """
     Rename a function or symbol in the binary.
     
     Args:
         old_name: Current name of the function/symbol
         new_name: New name to assign
+        view: View id, file hash or file name from list_views (default: the first binary opened)
     
     Returns:
         Status message indicating success or failure
     """
-    import json
     data = json.dumps({"old_name": old_name, "new_name": new_name})
-    return safe_post("rename", data)
+    result = await safe_post("rename", data, timeout_for("rename_function"), params={"view": view})
+    invalidate_cache()
+    return result
+
+
+@mcp.tool()
+@instrumented
+async def batch_edit(edits: list[dict], atomic: bool = False, analyze: bool = True, view: str = "") -> dict:
+    """
+    Apply many renames, comments and type changes in one request. They are
+    recorded as a single undo action, and analysis runs once afterwards
+    instead of after every edit. Targets are resolved before any edit is
+    applied, so refer to functions by their names before this batch.
+    
+    Args:
+        edits: Edits applied in order, each one of
+            {"op": "rename", "target": "sub_401000", "new_name": "parse_config"}
+            {"op": "comment", "target": "0x401020", "comment": "checks the magic"}
+            {"op": "type", "target": "parse_config", "type": "int32_t parse_config(char* buf, size_t len)"}
+            where target is a name or hex address
+        atomic: All or nothing: apply no edit if any target can't be resolved,
+            and revert them all if one fails to apply (default: False)
+        analyze: Start one analysis update after the edits (default: True)
+        view: View id, file hash or file name from list_views (default: the first binary opened)
+    
+    Returns:
+        results: Per edit, its resolved address and status (ok, failed,
+        skipped or rolled_back) with an error message; counts of applied and
+        failed edits, whether the batch was committed, and the analysis job
+        to poll with get_analysis_job
+    """
+    result = await post_json(
+        "edit/batch", {"edits": edits, "atomic": atomic, "analyze": analyze}, timeout_for("batch_edit"),
+        params={"view": view}
+    )
+    invalidate_cache()
+    return result
 
 
 @mcp.tool()
-def get_cross_references(name: str) -> list:
+@instrumented
+async def get_cross_references(name: str, view: str = "") -> list:
     """
     Get cross-references (xrefs) to a function or symbol.
     
     Args:
         name: Name of the function/symbol to find references to
+        view: View id, file hash or file name from list_views (default: the first binary opened)
     
     Returns:
         List of addresses that reference the specified function/symbol
     """
-    return safe_get("xrefs", {"name": name})
+    return await safe_get("xrefs", {"name": name, "view": view}, timeout_for("get_cross_references"))
+
+
+@mcp.tool()
+@instrumented
+async def get_cross_references_batch(names: list[str], limit: int = 100, view: str = "") -> dict:
+    """
+    Get cross-references to many functions or symbols in one request.
+    
+    Args:
+        names: Function/symbol names or hex addresses (e.g. "0x401000")
+        limit: Maximum references returned per name (default: 100)
+        view: View id, file hash or file name from list_views (default: the first binary opened)
+    
+    Returns:
+        results: For each name, its candidate addresses, the references
+        (address, containing function, referenced target) and whether
+        the list was truncated
+    """
+    return await post_json(
+        "xrefs/batch", {"names": names, "limit": limit}, timeout_for("get_cross_references_batch"),
+        params={"view": view}
+    )
+
+
+@mcp.tool()
+@instrumented
+async def get_callers(name: str, depth: int = 1, limit: int = 500, view: str = "") -> dict:
+    """
+    Get the functions that call a function, directly or up to `depth` calls away.
+    
+    Args:
+        name: Function name or hex address
+        depth: How many levels of callers to follow (default: 1)
+        limit: Maximum number of functions returned (default: 500)
+        view: View id, file hash or file name from list_views (default: the first binary opened)
+    
+    Returns:
+        nodes: Callers with address, name and depth
+        edges: caller -> callee pairs with their call-site addresses
+        truncated: Whether the limit cut the graph short
+    """
+    params = {"name": name, "depth": depth, "limit": limit, "view": view}
+    return await get_json("callers", params, timeout_for("get_callers"))
+
+
+@mcp.tool()
+@instrumented
+async def get_callees(name: str, depth: int = 1, limit: int = 500, view: str = "") -> dict:
+    """
+    Get the functions a function calls, directly or up to `depth` calls away.
+    
+    Args:
+        name: Function name or hex address
+        depth: How many levels of callees to follow (default: 1)
+        limit: Maximum number of functions returned (default: 500)
+        view: View id, file hash or file name from list_views (default: the first binary opened)
+    
+    Returns:
+        nodes: Callees with address, name and depth
+        edges: caller -> callee pairs with their call-site addresses
+        truncated: Whether the limit cut the graph short
+    """
+    params = {"name": name, "depth": depth, "limit": limit, "view": view}
+    return await get_json("callees", params, timeout_for("get_callees"))
+
+
+@mcp.tool()
+@instrumented
+async def find_call_paths(source: str, target: str, max_depth: int = 6, max_paths: int = 10, view: str = "") -> dict:
+    """
+    Find the shortest chains of calls leading from one function to another.
+    
+    Args:
+        source: Name or hex address of the calling function
+        target: Name or hex address of the function to reach
+        max_depth: Longest chain of calls to consider (default: 6)
+        max_paths: Maximum number of paths returned (default: 10)
+        view: View id, file hash or file name from list_views (default: the first binary opened)
+    
+    Returns:
+        paths: Each path as a list of functions (address, name) from source to target
+        truncated: Whether more paths of the same length exist
+    """
+    params = {"from": source, "to": target, "max_depth": max_depth, "max_paths": max_paths, "view": view}
+    return await get_json("callpath", params, timeout_for("find_call_paths"))
+
+
+@mcp.tool()
+@instrumented
+async def find_similar_functions(name: str, limit: int = 10, threshold: float = 0.5, view: str = "") -> dict:
+    """
+    Find functions that look like near-duplicates of a function: similar
+    imports called, constants, strings referenced and control flow shape.
+    Useful to spot inlined copies, template instances and variants of code
+    you already understand.
+    
+    Args:
+        name: Function name or hex address
+        limit: Maximum number of functions returned, at most 100 (default: 10)
+        threshold: Minimum similarity from 0 to 1 (default: 0.5)
+        view: View id, file hash or file name from list_views (default: the first binary opened)
+    
+    Returns:
+        results: Similar functions (name, address, similarity), most similar first
+    """
+    params = {"name": name, "limit": limit, "threshold": threshold, "view": view}
+    return await get_json("similar", params, timeout_for("find_similar_functions"))
+
+
+def signature_path(name: str) -> str:
+    """
+    Resolve a signature file name to a path inside --signatures-dir.
+    Raises ValueError for anything that isn't a plain file name there.
+    """
+    if not signatures_dir:
+        raise ValueError("Signature files are disabled; start the bridge with --signatures-dir DIR")
+    if not name or name in (".", "..") or os.path.basename(name) != name or "\\" in name:
+        raise ValueError(f"'{name}' is not a file name; signature files live in --signatures-dir")
+    if not name.endswith(".json"):
+        name += ".json"
+    path = os.path.join(signatures_dir, name)
+    # A symlink planted in the directory mustn't lead outside it
+    if os.path.dirname(os.path.realpath(path)) != os.path.realpath(signatures_dir):
+        raise ValueError(f"'{name}' points outside --signatures-dir")
+    return path
 
 
 @mcp.tool()
-def update_analysis() -> str:
+@instrumented
+async def export_signatures(name: str, include_unnamed: bool = False, view: str = "") -> dict:
+    """
+    Save the similarity signatures of a binary's functions to a signature
+    file, for match_signatures to recognize the same code in other binaries.
+    
+    Args:
+        name: File name in the bridge's signatures directory (.json is added
+            if missing); an existing file of that name is replaced
+        include_unnamed: Also export functions with auto-generated names like
+            sub_401000 (default: False, only the named ones are useful to match)
+        view: View id, file hash or file name from list_views (default: the first binary opened)
+    
+    Returns:
+        The file name written, the binary the signatures come from and how
+        many functions were exported
+    """
+    try:
+        path = signature_path(name)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+    params = {"all": 1 if include_unnamed else 0, "view": view}
+    data = await get_json("signatures", params, timeout_for("export_signatures"))
+    if "functions" not in data:
+        return data
+    try:
+        with open(path, "w") as f:
+            json.dump(data, f)
+    except OSError as e:
+        return {"status": "error", "message": f"Cannot write {os.path.basename(path)}: {e}"}
+    return {"name": os.path.basename(path), "binary": data["binary"], "functions": len(data["functions"])}
+
+
+@mcp.tool()
+@instrumented
+async def match_signatures(
+    name: str = "", source_view: str = "", threshold: float = 0.8, rename: bool = False, view: str = ""
+) -> dict:
+    """
+    Match the functions of another binary against this one, to recognize
+    library and previously analyzed code in one pass and skip it or name it.
+    The other binary's signatures come from a file saved by
+    export_signatures, or from another open view.
+    
+    Args:
+        name: Signature file saved by export_signatures, by its file name
+        source_view: Instead of name, a view to take the signatures from
+        threshold: Minimum similarity from 0 to 1 for a match (default: 0.8)
+        rename: Give each unambiguously matched function that still has an
+            auto-generated name the name of its match (default: False)
+        view: View id, file hash or file name from list_views (default: the first binary opened)
+    
+    Returns:
+        matches: Per matched function, the name it had in the other binary,
+        the local address and name, the similarity, and whether the match is
+        ambiguous (another local function or name matched as well); counts
+        of matched and unmatched functions, and with rename the number of
+        functions renamed and any failed renames
+    """
+    if name:
+        try:
+            path = signature_path(name)
+        except ValueError as e:
+            return {"status": "error", "message": str(e)}
+        try:
+            with open(path) as f:
+                payload = json.load(f)
+        except (OSError, ValueError) as e:
+            return {"status": "error", "message": f"Cannot read {os.path.basename(path)}: {e}"}
+        if not isinstance(payload, dict):
+            return {"status": "error", "message": f"{os.path.basename(path)} is not a signature file"}
+    elif source_view:
+        payload = {"source": source_view}
+    else:
+        return {"status": "error", "message": "Give the name of a signature file or a source_view"}
+    payload["threshold"] = threshold
+    
+    result = await post_json("signatures/match", payload, timeout_for("match_signatures"), params={"view": view})
+    if not rename or "matches" not in result:
+        return result
+    
+    edits = [
+        {"op": "rename", "target": match["address"], "new_name": match["name"]}
+        for match in result["matches"]
+        if match["auto"] and not match["ambiguous"] and match["name"] and match["name"] != match["local_name"]
+    ]
+    renamed = 0
+    failed = []
+    for start in range(0, len(edits), EDIT_BATCH_SIZE):
+        batch = await post_json(
+            "edit/batch", {"edits": edits[start:start + EDIT_BATCH_SIZE], "analyze": False},
+            timeout_for("batch_edit"), params={"view": view}
+        )
+        if "results" not in batch:
+            failed.append(batch)
+            break
+        renamed += batch["applied"]
+        failed += [item for item in batch["results"] if item["status"] != "ok"]
+    invalidate_cache()
+    result["renamed"] = renamed
+    result["rename_failures"] = failed
+    return result
+
+
+@mcp.tool()
+@instrumented
+async def update_analysis(wait: bool = True, timeout: float = 300, view: str = "") -> dict:
     """
     Trigger a re-analysis of the binary.
     This is useful after making changes like renaming functions.
+    Analysis runs in the background inside Binary Ninja; a request made
+    while an analysis is already running joins that job.
+    
+    Args:
+        wait: Poll until the analysis job finishes (default: True)
+        timeout: Maximum seconds to wait before returning the job as-is (default: 300)
+        view: View id, file hash or file name from list_views (default: the first binary opened)
+    
+    Returns:
+        Analysis job status (job_id, state, elapsed, progress)
+    """
+    response = await safe_post("analyze", "", timeout_for("update_analysis"), params={"view": view})
+    try:
+        job = json.loads(response)
+    except ValueError:
+        return {"status": "error", "message": response}
+    
+    if not wait or "job_id" not in job:
+        return job
+    
+    # Poll with exponential backoff until the job finishes or we run out of time
+    deadline = time.monotonic() + timeout
+    delay = 0.25
+    while job.get("state") in ("queued", "running"):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * 2, 5.0)
+        status = await get_json("jobs", {"id": job["job_id"], "view": view}, timeout_for("update_analysis"))
+        if "job_id" not in status:
+            return {**job, "poll_error": status.get("error") or status.get("message")}
+        job = status
+    
+    # Re-analysis changed the binary; revalidate rather than serve cached responses
+    invalidate_cache()
+    return job
+
+
+@mcp.tool()
+@instrumented
+async def get_analysis_job(job_id: str = "", view: str = "") -> dict:
+    """
+    Get the status of a background analysis job started by update_analysis.
+    
+    Args:
+        job_id: Job id returned by update_analysis (default: most recent job)
+        view: View id, file hash or file name from list_views (default: the first binary opened)
     
     Returns:
-        Status message
+        Analysis job status (job_id, state, elapsed, progress)
     """
-    return safe_post("analyze", "")
+    return await get_json("jobs", {"id": job_id, "view": view}, timeout_for("get_analysis_job"))
 
 
 @mcp.tool()
-def check_connection() -> dict:
+@instrumented
+async def get_changes(since: int = 0, wait: float = 0, limit: int = 500, view: str = "") -> dict:
+    """
+    Get what changed in the binary since a generation: functions added,
+    removed or re-analyzed, symbols added, renamed or removed, data variables
+    and types defined. Use it to update what you already know instead of
+    listing everything again.
+    
+    Args:
+        since: `next` from a previous call (default: 0, every change still buffered)
+        wait: Seconds to wait for a change if there is none yet, at most 30 (default: 0)
+        limit: Maximum number of changes returned (default: 500)
+        view: View id, file hash or file name from list_views (default: the first binary opened)
+    
+    Returns:
+        events: Changes oldest first, each with generation, kind, address and name
+        next: Generation to pass as `since` on the next call
+        complete: False if older changes were already dropped; list again to resync
+        generation: Current generation of the view
+    """
+    params = {"since": since, "wait": wait, "limit": limit, "view": view}
+    return await get_json("changes", params, timeout_for("get_changes") + min(max(wait, 0), 30))
+
+
+@mcp.tool()
+@instrumented
+async def list_views() -> dict:
+    """
+    List the binaries open in Binary Ninja that can be queried. Pass a view's
+    id (or its file name) as the `view` argument of the other tools.
+    
+    Returns:
+        views: id, name, filename, sha256, function count, generation and
+        whether it is the default view
+    """
+    return await get_json("views", None, timeout_for("list_views"))
+
+
+@mcp.tool()
+@instrumented
+async def resolve_symbol(name: str) -> dict:
+    """
+    Find a function or symbol across every open binary, e.g. to locate the
+    shared library that defines a function the main binary imports.
+    
+    Args:
+        name: Function or symbol name
+    
+    Returns:
+        results: Matches with view id, binary name, address and kind
+        (function, data or import)
+    """
+    return await get_json("resolve", {"name": name}, timeout_for("resolve_symbol"))
+
+
+@mcp.tool()
+@instrumented
+async def check_connection() -> dict:
     """
     Check if the connection to Binary Ninja is working.
     
@@ -210,8 +1242,8 @@ def check_connection() -> dict:
         Status information about the connection
     """
     try:
-        response = requests.get(f"{binaryninja_server_url}/health", timeout=5)
-        if response.ok:
+        response = await http_get("health", timeout=timeout_for("check_connection"))
+        if response.is_success:
             return response.json()
         else:
             return {"status": "error", "message": f"HTTP {response.status_code}"}
@@ -227,7 +1259,7 @@ def main():
     parser.add_argument(
         "--binaryninja-server",
         default="http://127.0.0.1:8080/",
-        help="Binary Ninja HTTP server URL (default: http://127.0.0.1:8080/)"
+        help="Binary Ninja HTTP server URL, or unix:///path/to/socket for a plugin on a Unix domain socket (default: http://127.0.0.1:8080/)"
     )
     parser.add_argument(
         "--transport",
@@ -246,15 +1278,72 @@ def main():
         default=8081,
         help="MCP server port for SSE transport (default: 8081)"
     )
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=10,
+        help="Keep-alive connections to keep open to Binary Ninja (default: 10)"
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=3,
+        help="Retries for idempotent GET requests (default: 3)"
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=8,
+        help="Maximum requests in flight to Binary Ninja at once (default: 8)"
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=2.0,
+        help="Seconds to serve cached listings and decompilations before revalidating them with Binary Ninja (default: 2; 0 always revalidates)"
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=0,
+        help="Serve Prometheus metrics at http://<mcp-host>:PORT/metrics (default: disabled)"
+    )
+    parser.add_argument(
+        "--tool-timeout",
+        action="append",
+        default=[],
+        metavar="TOOL=SECONDS",
+        help="Override the request timeout of a tool, e.g. decompile_function=60 (repeatable; 'default' sets the fallback)"
+    )
+    parser.add_argument(
+        "--signatures-dir",
+        default=None,
+        help="Directory export_signatures writes and match_signatures reads signature files in (default: disabled)"
+    )
     
     args = parser.parse_args()
     
     # Set global server URL
-    global binaryninja_server_url
-    binaryninja_server_url = args.binaryninja_server.rstrip("/")
+    global cache_ttl, signatures_dir
+    set_server(args.binaryninja_server)
+    configure_client(pool_size=args.pool_size, retries=args.retries, concurrency=args.max_concurrency)
+    cache_ttl = args.cache_ttl
+    for override in args.tool_timeout:
+        tool, _, seconds = override.partition("=")
+        try:
+            tool_timeouts[tool.strip()] = float(seconds)
+        except ValueError:
+            parser.error(f"Invalid --tool-timeout '{override}', expected TOOL=SECONDS")
+    if args.signatures_dir:
+        if not os.path.isdir(args.signatures_dir):
+            parser.error(f"--signatures-dir '{args.signatures_dir}' is not a directory")
+        signatures_dir = os.path.abspath(args.signatures_dir)
     
     logger.info(f"Binary Ninja MCP Bridge starting...")
-    logger.info(f"Connecting to Binary Ninja at: {binaryninja_server_url}")
+    if args.metrics_port:
+        serve_metrics(args.mcp_host, args.metrics_port)
+        logger.info(f"Serving metrics on http://{args.mcp_host}:{args.metrics_port}/metrics")
+    logger.info(f"Connecting to Binary Ninja at: {args.binaryninja_server}")
     
     # Run the MCP server
     if args.transport == "stdio":
@@ -0,0 +1,41 @@
+"""Regression tests for the /search regex prefilter"""
+
+import os
+import re
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+sys.path.insert(0, ROOT)
+
+import fake_binaryninja
+
+fake_binaryninja.install()
+
+from binaryninja_mcp_plugin import SearchIndex
+
+
+class RequiredLiteralTests(unittest.TestCase):
+
+    def assert_prefilter_keeps(self, pattern, text):
+        self.assertTrue(re.search(pattern, text))
+        literal = SearchIndex._required_literal(pattern)
+        self.assertIn(literal.lower(), text.lower())
+    
+    def test_escaped_bracket_in_class(self):
+        self.assert_prefilter_keeps(r'[a\]]xyz', 'axyz')
+    
+    def test_leading_bracket_in_negated_class(self):
+        self.assert_prefilter_keeps(r'[^]q]foo', 'zfoo')
+    
+    def test_leading_bracket_in_class(self):
+        self.assert_prefilter_keeps(r'[]a]bcd', 'abcd')
+    
+    def test_literal_after_class(self):
+        self.assertEqual(SearchIndex._required_literal(r'[a\]]xyz'), 'xyz')
+        self.assertEqual(SearchIndex._required_literal(r'[^]q]foo'), 'foo')
+
+
+if __name__ == '__main__':
+    unittest.main()